@@ -1,12 +1,10 @@
 import logging
 from logging import NullHandler
-from logging.config import dictConfig
 
-from .base.config import LOG
+from .base.logs import configure_logging
 from .core.drivers import ChromeDriver
 
-dictConfig(LOG)
-logging.root.setLevel(logging.INFO)
+configure_logging()
 # Set default logging handler to avoid \"No handler found\" warnings.
 logging.getLogger(__name__).addHandler(NullHandler())
 
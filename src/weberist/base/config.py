@@ -1,12 +1,24 @@
 """Configurations for development and maintenance"""
 
+import os
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT_DIR / 'data'
 DOCKER_DIR = ROOT_DIR / 'docker'
 LOCALSTORAGE = DATA_DIR / 'localstorage'
+BUILD_CONTEXT_DIR = DATA_DIR / 'build-contexts'
+RUNTIME_DIR = Path(os.environ.get('WEBERIST_RUNTIME_DIR', DATA_DIR / 'run'))
 DOCKER_CHROME_LOCALSTORAGE = ROOT_DIR / 'localstorage'
+# where remote sessions mount the profile directory, see the Dockerfile
+REMOTE_LOCALSTORAGE = '/usr/data/localstorage'
+# directory of the Selenoid hosts holding one profile directory per profile
+# mounted by remote sessions; the local localstorage (when Selenoid runs on
+# this machine) if unset
+SELENOID_PROFILES_DIR = os.environ.get('WEBERIST_SELENOID_PROFILES_DIR')
+# user and group of the browser in the images, see the Dockerfile
+CONTAINER_UID = 1005
+CONTAINER_GID = 1005
 CHROME_EXTENSIONS = DATA_DIR / 'extensions/chrome'
 DOCKER_FILE_BROWSER = DOCKER_DIR / 'Dockerfile'
 DOCKER_FILE_CHROME = DOCKER_DIR / 'Dockerfile-chrome'
@@ -16,6 +28,10 @@ DOCKER_COMPOSE = 'docker-compose.yml'
 DOCKER_NETWORK = 'weberist'
 CONTAINER_SELENOID = 'weberist-selenoid'
 CONTAINER_SELENOID_UI = 'weberist-selenoid-ui'
+SELENOID_URL = os.environ.get('WEBERIST_SELENOID_URL', 'http://localhost:4444')
+# see weberist.base.logs
+LOG_PROFILE = os.environ.get('WEBERIST_LOG_PROFILE', 'dev')
+LOG_LEVEL = os.environ.get('WEBERIST_LOG_LEVEL', 'INFO').upper()
 DEFAULT_PROFILE = 'Profile 1'
 CHROME_VERSIONS = tuple(str(i) for i in range(48, 128))
 FIREFOX_VERSIONS = tuple(str(i) for i in range(4, 125))
@@ -72,15 +88,15 @@ LOG = {
         }
     },
     "loggers": {
-        "": {"handlers": ["client"], "level": "DEBUG"},
+        "": {"handlers": ["client"], "level": LOG_LEVEL},
         "standard": {
             "handlers": ["standard"],
-            "level": "DEBUG",
+            "level": LOG_LEVEL,
             "propagate": False,
         },
         "debugger": {
             "handlers": ["debug"],
-            "level": "DEBUG",
+            "level": LOG_LEVEL,
             "propagate": False,
         }
     }
@@ -1,8 +1,7 @@
 import gc
 import logging
-import traceback
 from abc import ABC, abstractmethod
-from typing import Any, Callable, List, Dict
+from typing import Any, List, Dict
 from pathlib import Path
 
 from bs4 import BeautifulSoup
@@ -20,6 +19,7 @@ from weberist.generic.types import (
     WebDriverServices,
 )
 from weberist.utils.helpers import Key
+from weberist.utils.reaper import ProcessRegistry, register_driver
 from weberist.utils.javascript import (
     document_query_selector,
     document_query_selector_all,
@@ -28,7 +28,10 @@ from weberist.utils.javascript import (
     DISPATCH_ENTER_SELECTOR,
 )
 from .data import ProfileStorageBackend
-from .managers import WebDriverFactory
+from .managers import WebDriverFactory, apply_stealth
+from .profiling import StartupTrace, STARTUP_STATS
+from .monitor import ResourceMonitor
+from .failures import FailurePolicy, handle_failures
 from .exceptions import (
     EXCEPTIONS,
     WebDriverException,
@@ -39,7 +42,6 @@ from .exceptions import (
 
 
 logger = logging.getLogger('base.drivers')
-logger.setLevel(logging.DEBUG)
 
 
 class BaseDriver(WebDriverFactory):
@@ -53,13 +55,16 @@ class BaseDriver(WebDriverFactory):
                 extensions: List[str | Path] = None,
                 capabilities: Dict = None,
                 quit_on_failure: bool = False,
+                failure_policy: FailurePolicy | str = None,
                 timeout: int = 20,
                 profile: str = None,
                 localstorage: str = None,
+                trace_startup: bool = False,
                 **kwargs,) -> WebDriver:
         
         kwargs['profile'] = profile
         kwargs['localstorage'] = localstorage
+        trace = StartupTrace(enabled=trace_startup)
         
         instance: WebDriver = super().__new__(
             cls,
@@ -70,39 +75,54 @@ class BaseDriver(WebDriverFactory):
             keep_alive=keep_alive,
             extensions=extensions,
             capabilities=capabilities,
+            startup_trace=trace,
             **kwargs,
         )
         
         profile = kwargs['profile'] = kwargs.get('profile', None)
         localstorage = kwargs['localstorage'] = kwargs.get('localstorage', None)
-        cls.__init__(
-            instance,
-            quit_on_failure=quit_on_failure,
-            timeout=timeout,
-            profile=profile,
-            localstorage=localstorage,
-        )
+        with trace.phase('init'):
+            cls.__init__(
+                instance,
+                quit_on_failure=quit_on_failure,
+                failure_policy=failure_policy,
+                timeout=timeout,
+                profile=profile,
+                localstorage=localstorage,
+            )
+        STARTUP_STATS.record(trace)
         return instance
 
 
+    # nesting of `handle_failures` calls, see weberist.base.failures
+    _failure_depth = 0
+
     def __init__(self: WebDriver,
                  quit_on_failure: bool = False,
+                 failure_policy: FailurePolicy | str = None,
                  timeout: int = 20,
                  profile: str = None,
                  localstorage: str = None) -> None:
         
-        self._quit_on_failure = quit_on_failure
+        if failure_policy is None:
+            failure_policy = 'quit' if quit_on_failure else 'raise'
+        self.failure_policy = FailurePolicy.parse(failure_policy)
         self.timeout = timeout
         self.target_path = Path('.')
         self.soup = None
         self.dom = None
         
         if profile and localstorage:
+            trace = getattr(self, 'startup_trace', None)
+            trace = trace or StartupTrace(enabled=False)
             self.target_path = Path(localstorage)
-            self.profile_backend = ProfileStorageBackend(self.target_path)
+            with trace.phase('profile_backend'):
+                self.profile_backend = ProfileStorageBackend(self.target_path)
 
     def __enter__(self):
-        self._quit_on_failure = False
+        # the driver is quit on exit anyway
+        if self.failure_policy.action == 'quit':
+            self.failure_policy = FailurePolicy('raise')
         return self
 
     def __exit__(self, exc_type, exc_value, traceback_):
@@ -112,66 +132,108 @@ class BaseDriver(WebDriverFactory):
     
     @property
     def quit_on_failure(self,):
-        return self._quit_on_failure
-
-    @staticmethod
-    def quitonfailure(method: Callable) -> Callable:
-        """
-        A decorator that ensures the web driver is safely quit to avoid memory
-        leakages in case of exceptions. This method is designed to be used as a
-        decorator for methods that may raise exceptions during web automation
-        tasks.
-
-        Parameters
-        ----------
-        method : Callable
-            The method to be decorated. This method should be a callable that
-            takes an instance of the `BaseCrawler` class as its first argument.
-
-        Returns
-        -------
-        Callable
-            The decorated method, which will now include additional error
-            handling to quit the
-            web driver if an exception is raised.
-
-        Notes
-        -----
-        This method is a static method and should be used as a decorator.
-        """
-        # pylint: disable=W0613
-        def inner(self, *args, **kwargs) -> Callable:
-            try:
-                # pylint: disable=not-callable
-                return method(self, *args, **kwargs)
-            except EXCEPTIONS as err:
-                logger.error(err)
-                logger.error(traceback.format_exc())
-                if self.quit_on_failure:
-                    logger.warning("Closing window and quitting driver.")
-                    self.quit_driver()
-                    logger.warning("Driver quit.")
-                raise err
+        return self.failure_policy.action == 'quit'
 
-        return inner
+    # kept for code decorating its own helpers with it
+    quitonfailure = staticmethod(handle_failures)
 
     def quit_driver(self):
+        failed = False
         try:
             self.quit()
         except EXCEPTIONS as err:
+            failed = True
             logger.error("Error while quitting driver: %s", err)
         finally:
             logger.info("Driver quit successfully.")
-            self._cleanup()
+            self._cleanup(kill=failed)
 
-    def _cleanup(self):
+    def _cleanup(self, kill: bool = False):
         if hasattr(self, 'service') and self.service:
             try:
                 self.service.stop()
             except EXCEPTIONS as err:
                 logger.error("Error while stopping service: %s", err)
+        if getattr(self, 'registry_entry', None):
+            # processes left behind by a failed quit are killed right away
+            if kill:
+                ProcessRegistry().release(self.registry_entry)
+            else:
+                ProcessRegistry().unregister(self.registry_entry)
+            self.registry_entry = None
+        if getattr(self, '_release_profile', None) is not None:
+            # the finalizer runs at most once, so a collected driver never
+            # releases the lease of a later session
+            self._release_profile()
+            self._release_profile = None
+            self.profile_volume = None
         gc.collect()
 
+    def recycle(self) -> None:
+        """
+        Restarts the browser in place: quits the current session (and the
+        driver service, if local), starts a new session with the options the
+        driver was launched with and applies stealth again.
+
+        The driver object is kept, so callers holding a reference to it
+        keep working, but everything bound to the old session (tabs,
+        elements, cookies not persisted to the profile) is lost. Use it to
+        release memory leaked by long-running browsers.
+        """
+        logger.warning("Recycling driver session %s", self.session_id)
+        try:
+            self.quit()
+        except EXCEPTIONS as err:
+            logger.error("Error while quitting driver: %s", err)
+        if getattr(self, 'service', None) is not None:
+            self.service.start()
+        self.start_session(self.launch_options.to_capabilities())
+        if getattr(self, 'registry_entry', None):
+            self.registry_entry = register_driver(
+                self, entry_id=self.registry_entry
+            )
+        if self.stealth_kwargs is not None:
+            apply_stealth(self, **self.stealth_kwargs)
+        self.soup = None
+        self.dom = None
+
+    @handle_failures
+    def close_other_tabs(self, keep: int = 0) -> int:
+        """
+        Closes every tab but the one at index `keep` and switches to it.
+
+        Returns
+        -------
+        int
+            The number of tabs closed.
+        """
+        tabs = self.tabs()
+        if len(tabs) <= 1:
+            return 0
+        kept = tabs[keep]
+        for handle in tabs:
+            if handle == kept:
+                continue
+            self.switch_to.window(handle)
+            self.close()
+        self.switch_to.window(kept)
+        return len(tabs) - 1
+
+    @handle_failures
+    def collect_garbage(self) -> None:
+        """
+        Forces a garbage collection in the JavaScript heap of the current tab
+        through the Chrome Devtools Protocol.
+        """
+        self.execute_cdp_cmd('HeapProfiler.collectGarbage', {})
+
+    def resource_monitor(self, **kwargs) -> ResourceMonitor:
+        """
+        Returns a `ResourceMonitor` of this driver's process tree. Keyword
+        arguments are passed to `ResourceMonitor`.
+        """
+        return ResourceMonitor(self, **kwargs)
+
     def is_running(self,) -> bool:
         """
         Checks if the web driver is currently running.
@@ -191,11 +253,11 @@ class BaseDriver(WebDriverFactory):
         except (WebDriverException, InvalidSessionIdException):
             return False
 
-    @quitonfailure
+    @handle_failures
     def base_url(self,):
         return extract_base_url(self.current_url)
 
-    @quitonfailure
+    @handle_failures
     def tab_handle(self):
         """
         Retrieves the handle of the current window (tab) of the web driver.
@@ -207,7 +269,7 @@ class BaseDriver(WebDriverFactory):
         """
         return self.current_window_handle
 
-    @quitonfailure
+    @handle_failures
     def tabs(self):
         """
         Retrieves a list of handles for all open windows (tabs) of the web
@@ -220,7 +282,7 @@ class BaseDriver(WebDriverFactory):
         """
         return self.window_handles
 
-    @quitonfailure
+    @handle_failures
     def switch_to_tab(self, index: int):
         """
         Switches the web driver's focus to the tab at the specified index.
@@ -244,6 +306,7 @@ class BaseDriver(WebDriverFactory):
             )
         else:
             self.switch_to.window(tabs[index])
+            self.active_context = None
 
     def wait(
         self,
@@ -276,7 +339,7 @@ class BaseDriver(WebDriverFactory):
             self, timeout, poll_frequency, ignored_exceptions
         )
 
-    @quitonfailure
+    @handle_failures
     def close_tab(self):
         """
         Attempts to close the current tab of the web driver. If the current
@@ -322,7 +385,7 @@ class BaseDriver(WebDriverFactory):
         if quit_driver:
             self.quit()
     
-    @quitonfailure
+    @handle_failures
     def goto(self, url: str) -> None:
         """
         Navigates the web driver to the specified URL.
@@ -334,7 +397,7 @@ class BaseDriver(WebDriverFactory):
         """
         self.get(url)
 
-    @quitonfailure
+    @handle_failures
     def select(
         self,
         value: str,
@@ -382,7 +445,7 @@ class BaseDriver(WebDriverFactory):
         result = wait.until(expected_condition((ATTR_SELECTOR[by], value)))
         return result
 
-    @quitonfailure
+    @handle_failures
     def select_elements(
         self,
         value: str,
@@ -435,7 +498,7 @@ class BaseDriver(WebDriverFactory):
             ignored_exceptions
         )
 
-    @quitonfailure
+    @handle_failures
     def xpath(
         self,
         value: str,
@@ -482,7 +545,7 @@ class BaseDriver(WebDriverFactory):
             ignored_exceptions
         )
 
-    @quitonfailure
+    @handle_failures
     def find_text(self,
                     value: str,
                     tag: str = None,
@@ -504,7 +567,7 @@ class BaseDriver(WebDriverFactory):
             return result
         return None
 
-    @quitonfailure
+    @handle_failures
     def find_contains_text(self,
                            value: str,
                            tag: str = None,
@@ -526,7 +589,7 @@ class BaseDriver(WebDriverFactory):
             return result
         return None
     
-    @quitonfailure
+    @handle_failures
     def send_to(
         self,
         element: WebElement,
@@ -570,7 +633,7 @@ class BaseDriver(WebDriverFactory):
         if enter:
             element.send_keys(Key.enter)
 
-    @quitonfailure
+    @handle_failures
     def send(
         self,
         value: str,
@@ -601,7 +664,7 @@ class BaseDriver(WebDriverFactory):
             ignored_exceptions=ignored_exceptions
         )
 
-    @quitonfailure
+    @handle_failures
     def child(
         self,
         element: WebElement,
@@ -653,7 +716,7 @@ class BaseDriver(WebDriverFactory):
         )
         return descendant
 
-    @quitonfailure
+    @handle_failures
     def child_by_class_name(
         self,
         element: WebElement,
@@ -702,7 +765,7 @@ class BaseDriver(WebDriverFactory):
         )
         return descendant
 
-    @quitonfailure
+    @handle_failures
     def children(
         self,
         element: WebElement,
@@ -755,7 +818,7 @@ class BaseDriver(WebDriverFactory):
         )
         return offspring
 
-    @quitonfailure
+    @handle_failures
     def children_by_class_name(
         self,
         element: WebElement,
@@ -804,7 +867,7 @@ class BaseDriver(WebDriverFactory):
         )
         return offspring
 
-    @quitonfailure
+    @handle_failures
     def click_element(
         self,
         element: WebElement,
@@ -839,7 +902,7 @@ class BaseDriver(WebDriverFactory):
         wait = self.wait(timeout, poll_frequency, ignored_exceptions)
         wait.until(expected_condition(element)).click()
 
-    @quitonfailure
+    @handle_failures
     def click(
         self,
         value: str,
@@ -895,7 +958,7 @@ class BaseDriver(WebDriverFactory):
             ignored_exceptions=ignored_exceptions
         )
 
-    @quitonfailure
+    @handle_failures
     def arrow_down_element(
         self,
         element: WebElement,
@@ -939,7 +1002,7 @@ class BaseDriver(WebDriverFactory):
         if enter:
             wait.until(expected_condition(element)).send_keys(Key.enter)
 
-    @quitonfailure
+    @handle_failures
     def soup_of(
         self,
         element: WebElement,
@@ -983,7 +1046,7 @@ class BaseDriver(WebDriverFactory):
             **kwargs
         )
 
-    @quitonfailure
+    @handle_failures
     def run(self, script, *args):
         """
         Executes the specified JavaScript script on the web page.
@@ -1002,7 +1065,7 @@ class BaseDriver(WebDriverFactory):
         """
         return self.execute_script(script, *args)
 
-    @quitonfailure
+    @handle_failures
     def query_selector(self, selector: str):
         """
         Executes a JavaScript query selector on the web page and returns the
@@ -1021,7 +1084,7 @@ class BaseDriver(WebDriverFactory):
         script = document_query_selector(selector)
         return self.run(script)
 
-    @quitonfailure
+    @handle_failures
     def query_selector_all(self, selector: str):
         """
         Executes a JavaScript query selector on the web page and returns all
@@ -1040,7 +1103,7 @@ class BaseDriver(WebDriverFactory):
         script = document_query_selector_all(selector)
         return self.run(script)
 
-    @quitonfailure
+    @handle_failures
     def dispatch_enter(self, element: WebElement):
         """
         Dispatches an 'Enter' key event to the specified web element.
@@ -1057,7 +1120,7 @@ class BaseDriver(WebDriverFactory):
         """
         return self.run(DISPATCH_ENTER, element)
 
-    @quitonfailure
+    @handle_failures
     def dispatch_enter_selector(self, selector: str):
         """
         Dispatches an 'Enter' key event to the first element matching the
@@ -1075,7 +1138,7 @@ class BaseDriver(WebDriverFactory):
         """
         return self.run(DISPATCH_ENTER_SELECTOR.format(selector))
 
-    @quitonfailure
+    @handle_failures
     def make_soup(self, parser="html.parser", **kwargs):
         """
         Parses the current page source using BeautifulSoup with the specified
@@ -1095,9 +1158,9 @@ class BaseDriver(WebDriverFactory):
             A BeautifulSoup object representing the parsed HTML of the current
             page.
         """
-        return BeautifulSoup(self.page_source(), parser=parser, **kwargs)
+        return BeautifulSoup(self.page_source, features=parser, **kwargs)
 
-    @quitonfailure
+    @handle_failures
     def make_dom(self, soup_parser="html.parser", **kwargs):
         """
         Parses the current page source using lxml with the specified parser and
@@ -1141,7 +1204,7 @@ class BaseDriver(WebDriverFactory):
         script = is_display(value)
         return self.run(script, element)
 
-    @quitonfailure
+    @handle_failures
     def switch_to_frame(self, value: str, by='id'):
         """
         Switches the web driver's focus to the frame specified by the given
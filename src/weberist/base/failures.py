@@ -0,0 +1,145 @@
+"""
+Failure handling of driver helpers.
+
+Helpers of `BaseDriver` call each other (``click`` → ``select`` → ``wait``),
+so handling failures in every one of them logged the same exception, with
+its traceback, once per level. `handle_failures` handles an exception only
+at the outermost helper call of a driver: nested calls go straight to the
+wrapped method, and the failure is logged once, without formatting the
+traceback unless DEBUG is enabled.
+
+What happens on failure is a `FailurePolicy`: raise it, retry the call,
+recycle the browser and retry, or quit the driver and raise. Drivers have a
+default policy (``failure_policy=``) and any helper accepts another one for
+a single call:
+
+>>> driver = ChromeDriver(failure_policy='quit')
+>>> driver.click('login', failure_policy=FailurePolicy('retry', retries=3))
+"""
+import time
+import logging
+from functools import wraps
+from typing import Callable, Tuple, Type
+
+from .exceptions import EXCEPTIONS
+
+logger = logging.getLogger('weberist.base.failures')
+
+
+class FailurePolicy:
+    """
+    Parameters
+    ----------
+    action : str, default 'raise'
+        One of `actions`:
+
+        - ``'raise'``: logs the error and raises it;
+        - ``'retry'``: calls the helper again, up to `retries` times;
+        - ``'recycle'``: recycles the browser (see `BaseDriver.recycle`)
+          before each retry;
+        - ``'quit'``: quits the driver and raises the error.
+    retries : int, optional
+        Number of retries; 0 for ``'raise'`` and ``'quit'``, 1 for
+        ``'recycle'`` and 2 for ``'retry'`` by default.
+    delay : float, default 0.0
+        Seconds to wait before each retry.
+    exceptions : Tuple[Type[BaseException], ...], optional
+        Exceptions the policy handles; others are raised right away, without
+        being logged.
+    """
+
+    actions = ('raise', 'retry', 'recycle', 'quit')
+    default_retries = {'raise': 0, 'retry': 2, 'recycle': 1, 'quit': 0}
+
+    def __init__(self,
+                 action: str = 'raise',
+                 retries: int = None,
+                 delay: float = 0.0,
+                 exceptions: Tuple[Type[BaseException], ...] = None) -> None:
+        if action not in self.actions:
+            raise ValueError(
+                f"Invalid action '{action}'. Valid are {self.actions}."
+            )
+        self.action = action
+        if retries is None:
+            retries = self.default_retries[action]
+        self.retries = retries if action in ('retry', 'recycle') else 0
+        self.delay = delay
+        self.exceptions = exceptions or EXCEPTIONS
+
+    def __repr__(self) -> str:
+        return f"FailurePolicy({self.action!r}, retries={self.retries})"
+
+    @classmethod
+    def parse(cls, policy: 'FailurePolicy | str | None') -> 'FailurePolicy':
+        """A policy from a `FailurePolicy`, an action name or None."""
+        if isinstance(policy, FailurePolicy):
+            return policy
+        return cls(policy or 'raise')
+
+
+RAISE = FailurePolicy('raise')
+
+
+def handle_failures(method: Callable) -> Callable:
+    """
+    Decorates a driver helper so that its failures are handled by a
+    `FailurePolicy`: the one given as ``failure_policy=`` to the call or,
+    else, the driver's ``failure_policy``.
+
+    Only the outermost decorated call of a driver handles failures; calls
+    made from inside it cost one attribute lookup. Drivers are not
+    thread-safe, so the nesting is tracked per driver.
+    """
+
+    @wraps(method)
+    def inner(self, *args, **kwargs):
+        if self._failure_depth:
+            if 'failure_policy' in kwargs:
+                del kwargs['failure_policy']
+            return method(self, *args, **kwargs)
+        policy = kwargs.pop('failure_policy', None)
+        policy = FailurePolicy.parse(
+            policy if policy is not None
+            else getattr(self, 'failure_policy', RAISE)
+        )
+        attempt = 0
+        while True:
+            self._failure_depth = 1
+            try:
+                return method(self, *args, **kwargs)
+            except policy.exceptions as err:
+                if attempt < policy.retries:
+                    attempt += 1
+                    logger.warning(
+                        "%s failed (%s: %s). Retry %d of %d%s.",
+                        method.__name__,
+                        type(err).__name__,
+                        err,
+                        attempt,
+                        policy.retries,
+                        " after recycling the browser"
+                        if policy.action == 'recycle' else '',
+                    )
+                else:
+                    logger.error(
+                        "%s failed: %s: %s",
+                        method.__name__,
+                        type(err).__name__,
+                        err,
+                    )
+                    # formatted only when DEBUG records are emitted
+                    logger.debug("Traceback of %s", method.__name__,
+                                 exc_info=True)
+                    if policy.action == 'quit':
+                        logger.warning("Closing window and quitting driver.")
+                        self.quit_driver()
+                    raise
+            finally:
+                self._failure_depth = 0
+            if policy.delay:
+                time.sleep(policy.delay)
+            if policy.action == 'recycle':
+                self.recycle()
+
+    return inner
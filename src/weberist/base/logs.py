@@ -0,0 +1,206 @@
+"""
+Logging profiles.
+
+``dev`` (the default) is the human readable `LOG` configuration of
+`weberist.base.config`. ``production`` is meant for long crawls, where
+formatting log records on the calling threads shows up in profiles:
+
+- records are put on a queue and written by a `QueueListener` thread;
+- they are written as one compact JSON object per line, with only the time,
+  level, logger, message, exception and the ``extra`` fields;
+- repetitive records (same logger and message template, below WARNING by
+  default) are sampled: at most `burst` per `period` seconds get through and
+  the next one that does carries the number of records ``suppressed``.
+
+``none`` leaves the logging configuration of the application alone. The
+profile and level are read from ``$WEBERIST_LOG_PROFILE`` and
+``$WEBERIST_LOG_LEVEL`` when weberist is imported, or set with
+`configure_logging`:
+
+>>> configure_logging('production', level='INFO', burst=5)
+"""
+import sys
+import copy
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.config import dictConfig
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Tuple
+
+from .config import LOG, LOG_LEVEL, LOG_PROFILE
+
+PROFILES = ('dev', 'production', 'none')
+# messages built with f-strings make a key each; the windows are dropped
+# past this many keys
+MAX_SAMPLED_KEYS = 10000
+# attributes of every LogRecord, the rest came from ``extra``
+RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord('', 0, '', 0, '', (), None))
+) | {'message', 'asctime', 'suppressed'}
+
+_listener: QueueListener = None
+_queue_handler: QueueHandler = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as compact JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES:
+                entry[key] = value
+        return json.dumps(entry, default=str, separators=(',', ':'))
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets at most `burst` records with the same logger and message template
+    through every `period` seconds; records above `max_level` always pass.
+    """
+
+    def __init__(self,
+                 burst: int = 10,
+                 period: float = 1.0,
+                 max_level: int = logging.INFO) -> None:
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self.max_level = max_level
+        self._windows: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            # [window start, records passed, records suppressed]
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.period:
+                suppressed = window[2] if window is not None else 0
+                if len(self._windows) >= MAX_SAMPLED_KEYS:
+                    self._windows.clear()
+                self._windows[key] = [now, 1, 0]
+            elif window[1] < self.burst:
+                window[1] += 1
+                suppressed, window[2] = window[2], 0
+            else:
+                window[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    `QueueHandler` that only merges the message arguments on the calling
+    thread; exceptions are formatted by the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+def stop_logging() -> None:
+    """
+    Detaches the queue of the ``production`` profile from the root logger,
+    then flushes and stops its listener.
+    """
+    global _listener, _queue_handler  # pylint: disable=global-statement
+    if _queue_handler is not None:
+        # nothing would drain the queue anymore
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(profile: str = LOG_PROFILE,
+                      level: str | int = LOG_LEVEL,
+                      stream=None,
+                      burst: int = 10,
+                      period: float = 1.0,
+                      sample_level: int = logging.INFO) -> QueueListener:
+    """
+    Configures the root logger with a logging profile.
+
+    Parameters
+    ----------
+    profile : str
+        One of `PROFILES`.
+    level : str | int
+        Level of the root logger (and of the ``dev`` named loggers).
+    stream : file-like, optional
+        Where ``production`` records are written; stderr by default.
+    burst, period, sample_level :
+        Sampling of ``production`` records, see `SamplingFilter`.
+
+    Returns
+    -------
+    QueueListener
+        The listener thread of the ``production`` profile, None otherwise.
+    """
+    if profile not in PROFILES:
+        raise ValueError(
+            f"Invalid logging profile '{profile}'. Valid are {PROFILES}."
+        )
+    stop_logging()
+    if profile == 'none':
+        return None
+    if isinstance(level, str):
+        level = level.upper()
+    if profile == 'dev':
+        config = copy.deepcopy(LOG)
+        for logger_config in config["loggers"].values():
+            logger_config["level"] = level
+        dictConfig(config)
+        return None
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter())
+    records = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(records)
+    queue_handler.addFilter(SamplingFilter(burst, period, sample_level))
+    root = logging.getLogger()
+    for old_handler in list(root.handlers):
+        root.removeHandler(old_handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    for name in LOG["loggers"]:
+        if name:
+            # the dev loggers write to their own handlers otherwise
+            named = logging.getLogger(name)
+            named.handlers = []
+            named.propagate = True
+            named.setLevel(logging.NOTSET)
+
+    global _listener, _queue_handler  # pylint: disable=global-statement
+    _queue_handler = queue_handler
+    _listener = QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+atexit.register(stop_logging)
@@ -17,8 +17,11 @@ framework.
 import gc
 import time
 import socket
+import weakref
 import logging
 from re import match
+from copy import deepcopy
+from functools import lru_cache, partial
 from typing import Any, List, Dict, Tuple
 from pathlib import Path
 
@@ -68,6 +71,7 @@ from weberist.generic.types import (
     WebDriverServices,
     WebDriverManagers
 )
+from weberist.utils.reaper import register_driver
 from weberist.generic.constants import (
     DEFAULT_ARGUMENTS,
     SELENOID_CAPABILITIES,
@@ -75,11 +79,29 @@ from weberist.generic.constants import (
 )
 
 from .data import UserAgent, WindowSize
-from .config import DEFAULT_PROFILE, ROOT_DIR, LOCALSTORAGE
+from .config import (
+    DEFAULT_PROFILE,
+    ROOT_DIR,
+    LOCALSTORAGE,
+    SELENOID_URL,
+)
+from .exceptions import (
+    MaxRetryError,
+    RequestConnectionError,
+    WebDriverException,
+)
 from .stealth.tools import remove_cdc
+from .profiling import StartupTrace
+from .volumes import mount_profile, unmount_profile
 
 logger = logging.getLogger('standard')
 
+STEALTH_SCRIPTS = (
+    'selenium.fingerprint.js',
+    'error.stack.override.js',
+    'webgl.worker.override.js',
+)
+
 def free_port() -> int:
     """Get free port."""
     sock = socket.socket()
@@ -264,7 +286,10 @@ class WebDrivers:
                           host: str = None,
                           port: int = None,
                           lang: str = 'en-US',
-                          remote: bool = False):
+                          remote: bool = False,
+                          trace: StartupTrace = None):
+
+        trace = trace or StartupTrace(enabled=False)
 
         if extensions:
             if all(isinstance(item, Path) for item in extensions):
@@ -321,24 +346,26 @@ class WebDrivers:
         if capabilities is None:
             capabilities = {}
         if remote:
-            capabilities.update(SELENOID_CAPABILITIES)
-            for option in options.arguments:
-                if '--user-data-dir' in option:
-                    capabilities['selenoid:options']['env'] = (
-                        [f'BROWSER_PROFILE_DIR={option.split("=")[-1]}']
-                    )
-                    if profile_name is None:
-                        profile_name = DEFAULT_PROFILE
-                    break
+            capabilities.update(deepcopy(SELENOID_CAPABILITIES))
+            # the profile is mounted in the session's container, see
+            # weberist.base.volumes
+            if profile_name is None and any(
+                isinstance(argument, str)
+                and argument.startswith('--user-data-dir')
+                for argument in option_arguments
+            ):
+                profile_name = DEFAULT_PROFILE
         else:
             executable_path = None
             if hasattr(manager, 'install'):
-                executable_path = manager().install()
+                with trace.phase('driver_install'):
+                    executable_path = manager().install()
                 if service_kwargs:
                     service = service_class(executable_path, **service_kwargs)
                 else:
                     service = service_class(executable_path)
-                remove_cdc(service.path)
+                with trace.phase('remove_cdc'):
+                    remove_cdc(service.path)
 
         for name, value in capabilities.items():
             options.set_capability(name, value)
@@ -353,8 +380,10 @@ class WebDrivers:
                    extensions: str | List[str] = None,
                    capabilities: Dict = None,
                    service_kwargs: Dict = None,
+                   trace: StartupTrace = None,
                    **kwargs):
 
+        trace = trace or StartupTrace(enabled=False)
         browser_name = browser
         remote = False
         if 'remote' in browser:
@@ -378,6 +407,7 @@ class WebDrivers:
                 capabilities=capabilities,
                 service_kwargs=service_kwargs,
                 remote=remote,
+                trace=trace,
                 **kwargs,
             )
 
@@ -392,7 +422,8 @@ class WebDrivers:
         service = None
         executable_path = None
         if hasattr(manager, 'install'):
-            executable_path = manager().install()
+            with trace.phase('driver_install'):
+                executable_path = manager().install()
             if service_kwargs:
                 service = service_class(executable_path, **service_kwargs)
             else:
@@ -404,6 +435,11 @@ class WebDrivers:
 class WebDriverFactory(SeleniumWebDriver):
     
     service: WebDriverServices = None
+    startup_trace: StartupTrace = None
+    launch_options: WebDriverOptions = None
+    stealth_kwargs: Dict[str, Any] = None
+    registry_entry: str = None
+    active_context: Any = None
     
     @classmethod
     def _set_up(cls,
@@ -420,7 +456,7 @@ class WebDriverFactory(SeleniumWebDriver):
             arguments.extend(list(DEFAULT_ARGUMENTS[browser.split("_")[0]]))
 
         if 'remote' in browser and 'command_executor' not in kwargs:
-            kwargs['command_executor'] = "http://0.0.0.0:4444/wd/hub"
+            kwargs['command_executor'] = f"{SELENOID_URL}/wd/hub"
 
         if 'chrome' in browser:
             experimental_options = kwargs.pop("experimental_options", {})
@@ -456,12 +492,20 @@ class WebDriverFactory(SeleniumWebDriver):
                 extensions: List[str | Path] = None,
                 capabilities: Dict = None,
                 stealth: bool = True,
+                startup_trace: StartupTrace = None,
                 **kwargs,) -> WebDriver:
 
+        trace = startup_trace or StartupTrace(enabled=False)
         capabilities = kwargs.get('capabilities', None)
-        browser, cls_properties, option_arguments, kwargs = cls._set_up(
-            browser, option_arguments, **kwargs
-        )
+        # a HubSelector choosing the Selenoid host of remote sessions
+        hub = kwargs.pop('hub', None)
+        profile = kwargs.get('profile')
+        if hub is not None and 'remote' in browser:
+            kwargs['command_executor'] = hub.select(profile)
+        with trace.phase('set_up'):
+            browser, cls_properties, option_arguments, kwargs = cls._set_up(
+                browser, option_arguments, **kwargs
+            )
 
         host = kwargs.pop("host", None)
         port = kwargs.pop("port", None)
@@ -473,71 +517,165 @@ class WebDriverFactory(SeleniumWebDriver):
         renderer = kwargs.pop("renderer", "Intel Iris OpenGL Engine")
         run_on_insecure_origins = kwargs.pop("run_on_insecure_origins", False)
 
-        driver, options, service = WebDrivers().get(
-            browser,
-            option_arguments,
-            extensions,
-            capabilities,
-            services_kwargs,
-            host=host,
-            port=port,
-            lang=lang,
-        )
+        with trace.phase('configure'):
+            driver, options, service = WebDrivers().get(
+                browser,
+                option_arguments,
+                extensions,
+                capabilities,
+                services_kwargs,
+                host=host,
+                port=port,
+                lang=lang,
+                trace=trace,
+            )
 
         if service is not None:
             kwargs['service'] = service
+        profile_volume = None
+        if 'remote' in browser and 'chrome' in browser:
+            profile_volume = mount_profile(options, profile)
 
         kwargs.pop('profile', None)
         kwargs.pop('localstorage', None)
 
-        instance: WebDriver = type(cls.__name__, (driver, ), cls_properties)(
-            *args,
-            options=options,
-            keep_alive=keep_alive,
-            **kwargs
-        )
+        with trace.phase('launch'):
+            attempts = 1
+            if hub is not None and 'remote' in browser:
+                attempts = len(hub.weights)
+            for attempt in range(attempts):
+                try:
+                    instance: WebDriver = type(
+                        cls.__name__, (driver, ), cls_properties
+                    )(
+                        *args,
+                        options=options,
+                        keep_alive=keep_alive,
+                        **kwargs
+                    )
+                    break
+                except (
+                    WebDriverException, MaxRetryError, RequestConnectionError
+                ) as err:
+                    if attempt == attempts - 1:
+                        if profile_volume is not None:
+                            unmount_profile(profile_volume)
+                        raise
+                    # fail over to another Selenoid host
+                    logger.warning(
+                        "Session on %s failed: %s",
+                        kwargs['command_executor'],
+                        err,
+                    )
+                    hub.mark_failed(kwargs['command_executor'])
+                    try:
+                        kwargs['command_executor'] = hub.select(profile)
+                    except RuntimeError as no_hub:
+                        if profile_volume is not None:
+                            unmount_profile(profile_volume)
+                        raise no_hub from err
+        instance.startup_trace = trace
+        instance.registry_entry = None
+        # released once: by quit_driver or when the driver is garbage
+        # collected, whichever comes first
+        instance.profile_volume = profile_volume
+        instance._release_profile = None
+        if profile_volume is not None:
+            instance._release_profile = weakref.finalize(
+                instance, unmount_profile, profile_volume
+            )
+        if service is not None:
+            try:
+                instance.registry_entry = register_driver(instance)
+            except OSError as err:
+                logger.warning("Could not register driver processes: %s", err)
+        # kept to start a new session in place (see BaseDriver.recycle)
+        instance.launch_options = options
+        instance.stealth_kwargs = None
 
         if stealth:
             if 'chrome' not in browser:
                 logger.warning('Stealthiness only supported in chrome')
                 return instance
-            if lang not in languages:
-                languages.append(lang)
-            ua_languages = ','.join(languages)
-
-            # Default selenium_stealth functions
-            with_utils(instance, **kwargs)
-            chrome_app(instance, **kwargs)
-            chrome_runtime(instance, run_on_insecure_origins, **kwargs)
-            iframe_content_window(instance, **kwargs)
-            media_codecs(instance, **kwargs)
-            navigator_languages(instance, languages, **kwargs)
-            navigator_permissions(instance, **kwargs)
-            navigator_plugins(instance, **kwargs)
-            navigator_vendor(instance, vendor, **kwargs)
-            navigator_webdriver(instance, **kwargs)
-            user_agent_override(instance, ua_languages=ua_languages, **kwargs)
-            webgl_vendor_override(instance, webgl_vendor, renderer, **kwargs)
-            window_outerdimensions(instance, **kwargs)
-            hairline_fix(instance, **kwargs)
-
-            # Hide selenium fingerprints
-            selenium_fingerprint = Path(
-                ROOT_DIR / 'base/stealth/js/selenium.fingerprint.js'
-            ).read_text(encoding='utf-8')
-            evaluateOnNewDocument(instance, selenium_fingerprint)
-
-            error_stack_override = Path(
-                ROOT_DIR / 'base/stealth/js/error.stack.override.js'
-            ).read_text(encoding='utf-8')
-            evaluateOnNewDocument(instance, error_stack_override)
-            webgl_override = Path(
-                ROOT_DIR / 'base/stealth/js/webgl.worker.override.js'
-            ).read_text(encoding='utf-8')
-            evaluateOnNewDocument(
-                instance, webgl_override
+            instance.stealth_kwargs = dict(
+                lang=lang,
+                languages=languages,
+                vendor=vendor,
+                webgl_vendor=webgl_vendor,
+                renderer=renderer,
+                run_on_insecure_origins=run_on_insecure_origins,
+                **kwargs,
             )
-            #NOTE: add time.sleep
-            # time.sleep(0.5)
+            with trace.phase('stealth'):
+                apply_stealth(instance, trace, **instance.stealth_kwargs)
 
         return instance
+
+
+@lru_cache(maxsize=None)
+def read_stealth_script(name: str) -> str:
+    """Read (once) one of the javascript files in `base/stealth/js`."""
+    return Path(ROOT_DIR / 'base/stealth/js' / name).read_text(
+        encoding='utf-8'
+    )
+
+
+def apply_stealth(instance: WebDriver,
+                  trace: StartupTrace = None,
+                  lang: str = 'en',
+                  languages: List[str] = None,
+                  vendor: str = "Google Inc.",
+                  webgl_vendor: str = "Intel Inc.",
+                  renderer: str = "Intel Iris OpenGL Engine",
+                  run_on_insecure_origins: bool = False,
+                  **kwargs) -> None:
+    """
+    Runs the selenium-stealth evasions and weberist's own stealth scripts on
+    a chrome `instance`, timing each injection as a phase of `trace`.
+    """
+    trace = trace or StartupTrace(enabled=False)
+    languages = list(languages or ["en-US", "en"])
+    if lang not in languages:
+        languages.append(lang)
+    ua_languages = ','.join(languages)
+
+    # Default selenium_stealth functions
+    injections = (
+        partial(with_utils, instance, **kwargs),
+        partial(chrome_app, instance, **kwargs),
+        partial(
+            chrome_runtime, instance, run_on_insecure_origins, **kwargs
+        ),
+        partial(iframe_content_window, instance, **kwargs),
+        partial(media_codecs, instance, **kwargs),
+        partial(navigator_languages, instance, languages, **kwargs),
+        partial(navigator_permissions, instance, **kwargs),
+        partial(navigator_plugins, instance, **kwargs),
+        partial(navigator_vendor, instance, vendor, **kwargs),
+        partial(navigator_webdriver, instance, **kwargs),
+        partial(
+            user_agent_override,
+            instance,
+            ua_languages=ua_languages,
+            **kwargs
+        ),
+        partial(
+            webgl_vendor_override,
+            instance,
+            webgl_vendor,
+            renderer,
+            **kwargs
+        ),
+        partial(window_outerdimensions, instance, **kwargs),
+        partial(hairline_fix, instance, **kwargs),
+    )
+    for injection in injections:
+        with trace.phase(injection.func.__name__):
+            injection()
+
+    # Hide selenium fingerprints
+    for script in STEALTH_SCRIPTS:
+        with trace.phase(script):
+            evaluateOnNewDocument(instance, read_stealth_script(script))
+    #NOTE: add time.sleep
+    # time.sleep(0.5)
@@ -0,0 +1,278 @@
+"""
+Resource monitoring of the process tree behind a web driver.
+
+`ResourceMonitor` samples the RSS and CPU usage of the driver service
+(chromedriver) and of every browser process below it and, when a threshold
+is crossed, runs one of the driver's relief actions: ``recycle``,
+``close_other_tabs`` or ``collect_garbage`` (see `BaseDriver`).
+
+Requires `psutil`.
+"""
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List
+
+from weberist.generic.types import WebDriver
+
+try:
+    import psutil
+except (ImportError, ModuleNotFoundError):  # pragma: no cover
+    psutil = None
+
+logger = logging.getLogger('weberist.base.monitor')
+
+ACTIONS = (
+    'recycle',
+    'close_other_tabs',
+    'collect_garbage',
+)
+MEGABYTE = 1024 * 1024
+
+
+def debugger_port(driver: WebDriver) -> int | None:
+    """Port of chrome's remote debugging server, as reported by the driver."""
+    capabilities = getattr(driver, 'capabilities', None) or {}
+    address = capabilities.get('goog:chromeOptions', {}).get('debuggerAddress')
+    if not address:
+        return None
+    return int(address.rsplit(':', 1)[-1])
+
+
+def find_browser_processes(port: int) -> List['psutil.Process']:
+    """Finds the browser processes started with ``--remote-debugging-port``."""
+    flag = f'--remote-debugging-port={port}'
+    processes = []
+    for process in psutil.process_iter(['cmdline']):
+        cmdline = process.info.get('cmdline') or []
+        if flag in cmdline:
+            processes.append(process)
+    return processes
+
+
+def driver_processes(driver: WebDriver) -> List['psutil.Process']:
+    """
+    The local process tree of `driver`: its service process and all its
+    descendants or, if there is no service (e.g. attached drivers), the
+    browser processes discovered by remote debugging port. Remote drivers
+    have no local processes.
+    """
+    roots = []
+    service = getattr(driver, 'service', None)
+    process = getattr(service, 'process', None) if service else None
+    if process is not None and process.poll() is None:
+        try:
+            roots.append(psutil.Process(process.pid))
+        except psutil.NoSuchProcess:
+            pass
+    if not roots:
+        port = debugger_port(driver)
+        if port is not None:
+            roots = find_browser_processes(port)
+    processes = {}
+    for root in roots:
+        processes[root.pid] = root
+        try:
+            for child in root.children(recursive=True):
+                processes[child.pid] = child
+        except psutil.NoSuchProcess:
+            continue
+    return list(processes.values())
+
+
+class ResourceMonitor:
+    """
+    Tracks memory and CPU of a driver's process tree and relieves it when a
+    threshold is crossed.
+
+    Call `check` from the thread that drives the browser (e.g. between two
+    pages) or `start` a background sampler. Selenium drivers are not
+    thread-safe, so by default the sampler only flags a crossed threshold
+    and the action runs on the next `check`; pass
+    ``background_actions=True`` to act from the sampler thread.
+
+    Parameters
+    ----------
+    driver : WebDriver
+        The driver to monitor.
+    max_rss_mb : float, optional
+        Threshold of the resident memory of the whole tree, in megabytes.
+    max_cpu_percent : float, optional
+        Threshold of the CPU usage of the whole tree, in percent of one core.
+    action : str | Callable, default 'recycle'
+        One of `ACTIONS` or a callable receiving the driver and the sample.
+    interval : float, default 30.0
+        Seconds between samples of the background sampler.
+    background_actions : bool, default False
+        Whether the background sampler runs the action itself.
+    on_action : Callable, optional
+        Called with the action name and the sample after an action ran.
+    """
+
+    def __init__(self,
+                 driver: WebDriver,
+                 max_rss_mb: float = None,
+                 max_cpu_percent: float = None,
+                 action: str | Callable = 'recycle',
+                 interval: float = 30.0,
+                 background_actions: bool = False,
+                 on_action: Callable[[str, Dict], Any] = None) -> None:
+        if psutil is None:
+            logger.warning("Install psutil to monitor browser resources.")
+            raise ModuleNotFoundError("No module named 'psutil'")
+        if not callable(action) and action not in ACTIONS:
+            raise ValueError(
+                f'Invalid action "{action}". Valid are {ACTIONS}.'
+            )
+        self.driver = driver
+        self.max_rss = max_rss_mb * MEGABYTE if max_rss_mb else None
+        self.max_cpu_percent = max_cpu_percent
+        self.action = action
+        self.interval = interval
+        self.background_actions = background_actions
+        self.on_action = on_action
+        self.last_sample: Dict[str, Any] = None
+        self.peak_rss = 0
+        self.actions_run = 0
+        self.exceeded = threading.Event()
+        self._processes: Dict[int, 'psutil.Process'] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _refresh_processes(self) -> List['psutil.Process']:
+        # keep psutil.Process objects between samples: cpu_percent is
+        # measured since the previous call on the same object
+        current = {process.pid: process for process in driver_processes(
+            self.driver
+        )}
+        for pid, process in current.items():
+            if pid not in self._processes:
+                self._processes[pid] = process
+        for pid in list(self._processes):
+            if pid not in current:
+                self._processes.pop(pid)
+        return list(self._processes.values())
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        Returns
+        -------
+        Dict[str, Any]
+            ``rss`` (bytes) and ``cpu_percent`` summed over the process tree,
+            the number of ``processes``, the ``peak_rss`` so far and the
+            ``timestamp`` of the sample.
+        """
+        with self._lock:
+            rss = 0
+            cpu_percent = 0.0
+            processes = 0
+            for process in self._refresh_processes():
+                try:
+                    with process.oneshot():
+                        rss += process.memory_info().rss
+                        cpu_percent += process.cpu_percent(interval=None)
+                    processes += 1
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            self.peak_rss = max(self.peak_rss, rss)
+            self.last_sample = {
+                "rss": rss,
+                "cpu_percent": cpu_percent,
+                "processes": processes,
+                "peak_rss": self.peak_rss,
+                "timestamp": time.time(),
+            }
+            return self.last_sample
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """Last sample plus the number of actions run so far."""
+        metrics = dict(self.last_sample or {})
+        metrics["actions_run"] = self.actions_run
+        return metrics
+
+    def is_exceeded(self, sample: Dict[str, Any]) -> bool:
+        if self.max_rss is not None and sample["rss"] > self.max_rss:
+            return True
+        if (self.max_cpu_percent is not None
+                and sample["cpu_percent"] > self.max_cpu_percent):
+            return True
+        return False
+
+    def act(self, sample: Dict[str, Any] = None) -> str:
+        """Runs the configured action and returns its name."""
+        sample = sample or self.last_sample
+        name = getattr(self.action, '__name__', self.action)
+        logger.warning(
+            "Driver resources above threshold (rss=%.1f MB, cpu=%.1f%%). "
+            "Running '%s'.",
+            (sample or {}).get("rss", 0) / MEGABYTE,
+            (sample or {}).get("cpu_percent", 0.0),
+            name,
+        )
+        if callable(self.action):
+            self.action(self.driver, sample)
+        else:
+            getattr(self.driver, self.action)()
+        self.actions_run += 1
+        self.exceeded.clear()
+        with self._lock:
+            self._processes = {}
+        if self.on_action is not None:
+            self.on_action(name, sample)
+        return name
+
+    def check(self) -> str | None:
+        """
+        Samples (unless the background sampler already flagged a crossed
+        threshold) and runs the action if needed.
+
+        Returns
+        -------
+        str | None
+            The name of the action run, if any.
+        """
+        if self.exceeded.is_set():
+            return self.act()
+        sample = self.sample()
+        if self.is_exceeded(sample):
+            return self.act(sample)
+        return None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                sample = self.sample()
+                if not self.is_exceeded(sample):
+                    continue
+                if self.background_actions:
+                    self.act(sample)
+                else:
+                    self.exceeded.set()
+            except Exception as err:  # pylint: disable=broad-except
+                logger.error("Resource monitor failed: %s", err)
+
+    def start(self) -> 'ResourceMonitor':
+        """Starts sampling every `interval` seconds in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self.sample()
+        self._thread = threading.Thread(
+            target=self._run, name='weberist-resource-monitor', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback_):
+        self.stop()
@@ -0,0 +1,145 @@
+"""
+Opt-in timing of the phases of a web driver launch.
+
+A `StartupTrace` is created for every launch and attached to the driver as
+`startup_trace`. When tracing is enabled (``trace_startup=True``), each phase
+of `WebDriverFactory.__new__` and `BaseDriver.__init__` is timed and the
+trace is aggregated into `STARTUP_STATS`, so regressions can be attributed to
+a single phase instead of to "startup" as a whole.
+"""
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger('weberist.base.profiling')
+
+PHASE_SEPARATOR = '/'
+
+
+class StartupTrace:
+    """
+    Wall-clock timings of the phases of a single web driver launch.
+
+    Phases may be nested; nested phase names are joined with
+    `PHASE_SEPARATOR` (e.g. ``"stealth/navigator_webdriver"``) and only
+    top-level phases count towards `total`.
+
+    Parameters
+    ----------
+    enabled : bool, default True
+        If False, `phase` is a no-op and nothing is recorded.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.phases: List[Tuple[str, float]] = []
+        self._stack: List[str] = []
+
+    def __bool__(self) -> bool:
+        return self.enabled
+
+    def __repr__(self) -> str:
+        timings = ', '.join(
+            f'{name}={duration:.3f}s' for name, duration in self.phases
+        )
+        return f'StartupTrace({timings})'
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as the phase `name`."""
+        if not self.enabled:
+            yield
+            return
+        self._stack.append(name)
+        full_name = PHASE_SEPARATOR.join(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((full_name, time.perf_counter() - start))
+            self._stack.pop()
+
+    @property
+    def total(self) -> float:
+        """Sum of the durations of the top-level phases, in seconds."""
+        return sum(
+            duration for name, duration in self.phases
+            if PHASE_SEPARATOR not in name
+        )
+
+    def as_dict(self) -> Dict[str, float]:
+        """Durations by phase name, summing phases that ran more than once."""
+        result = {}
+        for name, duration in self.phases:
+            result[name] = result.get(name, 0.0) + duration
+        return result
+
+
+class StartupStats:
+    """
+    Thread-safe aggregate of `StartupTrace` objects across launches.
+
+    For each phase it keeps the number of launches that ran it and the
+    mean, min, max and last duration, which is enough to spot which phase
+    regressed without keeping every trace in memory.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._phases: Dict[str, Dict[str, float]] = {}
+        self.launches = 0
+
+    def record(self, trace: StartupTrace) -> None:
+        if not trace.enabled:
+            return
+        timings = trace.as_dict()
+        timings['total'] = trace.total
+        with self._lock:
+            self.launches += 1
+            for name, duration in timings.items():
+                stats = self._phases.setdefault(
+                    name,
+                    {
+                        "count": 0,
+                        "sum": 0.0,
+                        "min": duration,
+                        "max": duration,
+                        "last": duration,
+                    }
+                )
+                stats["count"] += 1
+                stats["sum"] += duration
+                stats["min"] = min(stats["min"], duration)
+                stats["max"] = max(stats["max"], duration)
+                stats["last"] = duration
+        logger.debug("Startup trace: %s", trace)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns
+        -------
+        Dict[str, Dict[str, float]]
+            For each phase, its ``count``, ``mean``, ``min``, ``max`` and
+            ``last`` duration in seconds.
+        """
+        with self._lock:
+            return {
+                name: {
+                    "count": stats["count"],
+                    "mean": stats["sum"] / stats["count"],
+                    "min": stats["min"],
+                    "max": stats["max"],
+                    "last": stats["last"],
+                }
+                for name, stats in self._phases.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._phases = {}
+            self.launches = 0
+
+
+STARTUP_STATS = StartupStats()
@@ -0,0 +1,115 @@
+"""
+Profile volumes of remote sessions.
+
+Remote `ChromeDriver` sessions keep their profile on the Selenoid host: the
+directory of the profile is mounted in the session's container through
+Selenoid's ``volumes`` option. Chrome locks its user data directory, so a
+profile directory is mounted by one session at a time: a session asking for
+a profile already mounted by another session of this process runs with a
+throwaway profile instead.
+
+The directories are ``{root}/{profile}``, where root is
+``$WEBERIST_SELENOID_PROFILES_DIR``, a path on the Selenoid hosts used as
+is, or, if unset, ``{localstorage}/remote`` when Selenoid runs on this
+machine. Those are created here and handed over to the browser user of the
+images (`CONTAINER_UID`).
+"""
+import os
+import re
+import logging
+import threading
+from copy import deepcopy
+from pathlib import Path, PurePosixPath
+
+from selenium.webdriver.common.options import BaseOptions
+
+from .config import (
+    CONTAINER_GID,
+    CONTAINER_UID,
+    DEFAULT_PROFILE,
+    REMOTE_LOCALSTORAGE,
+    SELENOID_PROFILES_DIR,
+)
+
+logger = logging.getLogger('weberist.base.volumes')
+
+_mounted: set = set()
+_lock = threading.Lock()
+
+
+def profile_source(localstorage: str | Path, profile: str) -> str:
+    """
+    Path of the directory of `profile`, on the Selenoid host, mounted by
+    remote sessions.
+    """
+    name = re.sub(r'[^\w.-]+', '_', profile)
+    if SELENOID_PROFILES_DIR:
+        return str(PurePosixPath(SELENOID_PROFILES_DIR) / name)
+    path = Path(localstorage).absolute() / 'remote' / name
+    if not path.is_dir():
+        path.mkdir(parents=True)
+        # the browser runs as CONTAINER_UID in the container
+        if hasattr(os, 'geteuid') and os.geteuid() == 0:
+            os.chown(path, CONTAINER_UID, CONTAINER_GID)
+        else:
+            path.chmod(0o777)
+    return str(path)
+
+
+def mount_profile(options: BaseOptions, profile: str = None) -> str:
+    """
+    Mounts the profile directory of the ``--user-data-dir`` argument of
+    `options` in the session's container, if no other session of this
+    process has it mounted.
+
+    Parameters
+    ----------
+    options : BaseOptions
+        Options of a remote chrome session; updated in place.
+    profile : str, optional
+        Name of the profile, `DEFAULT_PROFILE` by default.
+
+    Returns
+    -------
+    str
+        The mounted directory, to be released with `unmount_profile`, or
+        None if nothing was mounted.
+    """
+    arguments = options.arguments
+    for index, argument in enumerate(arguments):
+        if isinstance(argument, str) and argument.startswith('--user-data-dir'):
+            break
+    else:
+        return None
+    profile = profile or DEFAULT_PROFILE
+    source = profile_source(argument.split("=")[-1], profile)
+    with _lock:
+        busy = source in _mounted
+        if not busy:
+            _mounted.add(source)
+    if busy:
+        logger.warning(
+            "Profile '%s' is mounted by another session, starting this one "
+            "with a throwaway profile.",
+            profile,
+        )
+        del arguments[index]
+        return None
+    arguments[index] = f'--user-data-dir={REMOTE_LOCALSTORAGE}'
+    selenoid_options = deepcopy(
+        options.capabilities.get('selenoid:options', {})
+    )
+    selenoid_options.setdefault('volumes', []).append(
+        f'{source}:{REMOTE_LOCALSTORAGE}'
+    )
+    selenoid_options.setdefault('env', []).append(
+        f'BROWSER_PROFILE_DIR={REMOTE_LOCALSTORAGE}'
+    )
+    options.set_capability('selenoid:options', selenoid_options)
+    return source
+
+
+def unmount_profile(source: str) -> None:
+    """Lets other sessions mount the profile directory `source`."""
+    with _lock:
+        _mounted.discard(source)
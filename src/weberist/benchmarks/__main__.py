@@ -0,0 +1,47 @@
+import json
+import argparse
+
+from .suite import BENCHMARKS, run_benchmarks, compare_results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='python -m weberist.benchmarks',
+        description='Run weberist benchmarks against a local static site.',
+    )
+    parser.add_argument(
+        '-o', '--output', help='JSON file to write the results to.'
+    )
+    parser.add_argument(
+        '-r', '--repeat', type=int, default=5,
+        help='Measured repetitions of each benchmark.'
+    )
+    parser.add_argument(
+        '--only', nargs='+', choices=list(BENCHMARKS),
+        help='Run only these benchmarks.'
+    )
+    parser.add_argument(
+        '--headed', action='store_true', help='Do not run chrome headless.'
+    )
+    parser.add_argument(
+        '--compare', metavar='BASELINE',
+        help='Previous results file to compare against.'
+    )
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        names=args.only,
+        repeat=args.repeat,
+        output=args.output,
+        headless=not args.headed,
+    )
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as json_file:
+            baseline = json.load(json_file)
+        print(json.dumps(compare_results(baseline, report), indent=4))
+    elif args.output is None:
+        print(json.dumps(report, indent=4))
+
+
+if __name__ == '__main__':
+    main()
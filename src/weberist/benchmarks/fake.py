@@ -0,0 +1,620 @@
+"""
+In-process fake WebDriver/Selenoid server.
+
+`FakeWebDriverServer` speaks enough of the W3C WebDriver protocol for the
+commands weberist issues (sessions, windows and tabs, navigation, page
+source, finding elements, scripts and the CDP passthrough of chrome,
+including ``Target.createTarget``) and answers a
+Selenoid-like ``/status``, without any browser behind it. Pages are static
+HTML parsed with lxml, so remote drivers, `SelenoidScheduler`,
+`RemoteSessionPool`, `CapacityGate` and the HTTP transport can be exercised
+and load-tested at thousands of sessions per second on machines without
+chrome or docker.
+
+Pages are looked up, by path, in the `pages` given to the server, then
+among the generated pages of `StaticSite` (``/table/<rows>``,
+``/deep/<depth>``, ...) and finally, if `fetch` is True, downloaded. Scripts
+are not run: `execute_script` answers from `scripts`, a list of
+``(substring, value)`` rules matched against the script source, where
+`value` may be a callable receiving the session, the script and its
+arguments.
+
+Examples
+--------
+>>> with FakeWebDriverServer(limit=100) as server:
+...     driver = ChromeDriver(remote=True, command_executor=server.hub_url)
+...     driver.goto(server.url('/table/1000'))
+...     cells = driver.select_elements('td', by='css selector')
+"""
+import re
+import json
+import time
+import uuid
+import logging
+import threading
+import urllib.request
+from collections import Counter
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Tuple
+
+from lxml import html as lxml_html
+
+from weberist.generic.constants import WEB_ELEMENT_KEY as ELEMENT_KEY
+from .fixtures import SiteHandler
+
+try:
+    from cssselect import GenericTranslator, SelectorError
+except ImportError:
+    GenericTranslator = None
+    SelectorError = ValueError
+
+logger = logging.getLogger('weberist.benchmarks.fake')
+
+BLANK_PAGE = '<html><head><title></title></head><body></body></html>'
+FAKE_USER_AGENT = (
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36'
+)
+DEFAULT_SCRIPTS: List[Tuple[str, Any]] = [
+    ('document.readyState', 'complete'),
+    ('navigator.userAgent', FAKE_USER_AGENT),
+    ('navigator.webdriver', None),
+    ('return 1', 1),
+]
+DEFAULT_CDP: Dict[str, Any] = {
+    'Page.addScriptToEvaluateOnNewDocument': {'identifier': '1'},
+    'Browser.getVersion': {
+        'product': 'Chrome/127.0.0.0', 'userAgent': FAKE_USER_AGENT
+    },
+    'Target.createBrowserContext': lambda session, params: {
+        'browserContextId': uuid.uuid4().hex
+    },
+}
+
+
+class WebDriverError(Exception):
+    """A W3C error response: HTTP `status`, error `code` and message."""
+
+    def __init__(self, status: int, code: str, message: str = '') -> None:
+        super().__init__(message or code)
+        self.status = status
+        self.code = code
+        self.message = message or code
+
+
+class FakeWindow:
+    """A tab of a fake session: its page and the elements found in it."""
+
+    def __init__(self) -> None:
+        self.url = 'about:blank'
+        self.document = lxml_html.fromstring(BLANK_PAGE)
+        self.elements: Dict[str, Any] = {}
+
+    def load(self, url: str, source: str) -> None:
+        self.url = url
+        self.document = lxml_html.fromstring(source or BLANK_PAGE)
+        # references of the previous page become stale
+        self.elements = {}
+
+
+class FakeSession:
+    """State of one fake browser session; commands act on its `current`
+    window."""
+
+    def __init__(self, capabilities: dict) -> None:
+        self.session_id = uuid.uuid4().hex
+        self.capabilities = capabilities
+        self.windows: Dict[str, FakeWindow] = {}
+        self.window = self.open_window()
+        self.created_at = time.monotonic()
+
+    def open_window(self, handle: str = None) -> str:
+        handle = handle or uuid.uuid4().hex.upper()
+        self.windows[handle] = FakeWindow()
+        return handle
+
+    @property
+    def current(self) -> FakeWindow:
+        if self.window not in self.windows:
+            raise WebDriverError(
+                404, 'no such window', "The current window was closed."
+            )
+        return self.windows[self.window]
+
+    @property
+    def url(self) -> str:
+        return self.current.url
+
+    @property
+    def document(self):
+        return self.current.document
+
+    def load(self, url: str, source: str) -> None:
+        self.current.load(url, source)
+
+    def reference(self, element) -> Dict[str, str]:
+        element_id = uuid.uuid4().hex
+        self.current.elements[element_id] = element
+        return {ELEMENT_KEY: element_id}
+
+    def element(self, element_id: str):
+        elements = self.current.elements
+        if element_id not in elements:
+            raise WebDriverError(
+                404, 'stale element reference',
+                f"Element {element_id} is not attached to the page."
+            )
+        return elements[element_id]
+
+
+def find(root, using: str, value: str) -> List[Any]:
+    """Elements under `root` matching a W3C locator strategy."""
+    if using == 'xpath':
+        try:
+            found = root.xpath(value)
+        except Exception as err:  # pylint: disable=broad-except
+            raise WebDriverError(400, 'invalid selector', str(err)) from err
+        return [node for node in found if hasattr(node, 'tag')]
+    if using == 'css selector':
+        if GenericTranslator is None:
+            raise WebDriverError(
+                500, 'unsupported operation',
+                "CSS selectors need the cssselect package."
+            )
+        try:
+            xpath = GenericTranslator().css_to_xpath(value)
+        except SelectorError as err:
+            raise WebDriverError(400, 'invalid selector', str(err)) from err
+        return root.xpath(xpath)
+    if using == 'tag name':
+        return list(root.iter(value))
+    if using in ('link text', 'partial link text'):
+        return [
+            link for link in root.iter('a')
+            if (link.text_content().strip() == value
+                if using == 'link text'
+                else value in link.text_content())
+        ]
+    raise WebDriverError(
+        400, 'invalid argument', f"Unknown locator strategy: {using}"
+    )
+
+
+class FakeWebDriverHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    server: 'FakeWebDriverServer'
+
+    def _respond(self, status: int, payload: Any) -> None:
+        content = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _dispatch(self, method: str) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        try:
+            params = json.loads(body) if body else {}
+            status, value = self.server.fake.handle(method, self.path, params)
+        except WebDriverError as err:
+            status, value = err.status, {'value': {
+                'error': err.code, 'message': err.message, 'stacktrace': ''
+            }}
+        except Exception as err:  # pylint: disable=broad-except
+            logger.exception("Fake WebDriver command failed")
+            status, value = 500, {'value': {
+                'error': 'unknown error', 'message': str(err),
+                'stacktrace': '',
+            }}
+        self._respond(status, value)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self._dispatch('GET')
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self._dispatch('POST')
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        self._dispatch('DELETE')
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        pass
+
+
+class FakeWebDriverServer:
+    """
+    Fake WebDriver/Selenoid endpoint on ``127.0.0.1``, served from a
+    background thread.
+
+    Parameters
+    ----------
+    pages : Dict[str, str], optional
+        HTML of the pages, by path (e.g. ``'/login'``).
+    limit : int, default 5
+        Total sessions reported by ``/status``; new sessions beyond it fail
+        with ``session not created``, like Selenoid after its queue.
+    latency : float, default 0.0
+        Seconds added to every command, to simulate the round trip to a
+        remote browser.
+    scripts : List[Tuple[str, Any]], optional
+        Rules answering `execute_script`, tried before `DEFAULT_SCRIPTS`.
+        Unknown scripts return True when called on an element (e.g.
+        selenium's visibility check) and None otherwise.
+    cdp : Dict[str, Any], optional
+        Results of CDP commands, by command name, on top of `DEFAULT_CDP`;
+        values may be callables receiving the session and the parameters.
+        Unknown commands return an empty dict.
+    fetch : bool, default False
+        Downloads pages that are neither in `pages` nor generated.
+    port : int, default 0
+        Port to bind; 0 picks a free port.
+    """
+
+    def __init__(self,
+                 pages: Dict[str, str] = None,
+                 limit: int = 5,
+                 latency: float = 0.0,
+                 scripts: List[Tuple[str, Any]] = None,
+                 cdp: Dict[str, Any] = None,
+                 fetch: bool = False,
+                 port: int = 0) -> None:
+        self.pages = dict(pages or {})
+        self.limit = limit
+        self.latency = latency
+        self.scripts = list(scripts or []) + DEFAULT_SCRIPTS
+        self.cdp = {
+            **DEFAULT_CDP,
+            # chromedriver uses target ids as window handles
+            'Target.createTarget': self._create_target,
+            'Target.closeTarget': self._close_target,
+            **(cdp or {}),
+        }
+        self.fetch = fetch
+        self.sessions: Dict[str, FakeSession] = {}
+        self.stats: Counter = Counter()
+        self._sources: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(
+            ('127.0.0.1', port), FakeWebDriverHandler
+        )
+        self.server.daemon_threads = True
+        self.server.fake = self
+        self.thread = None
+        self._routes: List[Tuple[str, re.Pattern, Callable]] = [
+            (method, re.compile(f'^{pattern}$'), handler)
+            for method, pattern, handler in (
+                ('GET', r'/status', self.status),
+                ('POST', r'/session', self.new_session),
+                ('DELETE', r'/session/(?P<sid>\w+)', self.delete_session),
+                ('POST', r'/session/(?P<sid>\w+)/url', self.navigate),
+                ('GET', r'/session/(?P<sid>\w+)/url', self.current_url),
+                ('GET', r'/session/(?P<sid>\w+)/title', self.title),
+                ('GET', r'/session/(?P<sid>\w+)/source', self.source),
+                ('POST', r'/session/(?P<sid>\w+)/(?P<many>elements?)',
+                 self.find_elements),
+                ('POST',
+                 r'/session/(?P<sid>\w+)/element/(?P<eid>\w+)'
+                 r'/(?P<many>elements?)',
+                 self.find_elements),
+                ('GET', r'/session/(?P<sid>\w+)/element/(?P<eid>\w+)/text',
+                 self.element_text),
+                ('GET', r'/session/(?P<sid>\w+)/element/(?P<eid>\w+)/name',
+                 self.element_name),
+                ('GET',
+                 r'/session/(?P<sid>\w+)/element/(?P<eid>\w+)'
+                 r'/(?:attribute|property)/(?P<name>[^/]+)',
+                 self.element_attribute),
+                ('GET',
+                 r'/session/(?P<sid>\w+)/element/(?P<eid>\w+)'
+                 r'/(?:enabled|displayed|selected)',
+                 self.element_state),
+                ('GET', r'/session/(?P<sid>\w+)/element/(?P<eid>\w+)/rect',
+                 self.element_rect),
+                ('POST',
+                 r'/session/(?P<sid>\w+)/element/(?P<eid>\w+)'
+                 r'/(?:click|clear)',
+                 self.element_click),
+                ('POST', r'/session/(?P<sid>\w+)/element/(?P<eid>\w+)/value',
+                 self.element_send_keys),
+                ('POST', r'/session/(?P<sid>\w+)/execute/(?:sync|async)',
+                 self.execute_script),
+                ('POST', r'/session/(?P<sid>\w+)/goog/cdp/execute',
+                 self.execute_cdp),
+                ('GET', r'/session/(?P<sid>\w+)/window', self.window),
+                ('POST', r'/session/(?P<sid>\w+)/window',
+                 self.switch_window),
+                ('DELETE', r'/session/(?P<sid>\w+)/window',
+                 self.close_window),
+                ('POST', r'/session/(?P<sid>\w+)/window/new',
+                 self.new_window),
+                ('GET', r'/session/(?P<sid>\w+)/window/handles',
+                 self.window_handles),
+                ('GET', r'/session/(?P<sid>\w+)/cookie', self.cookies),
+                ('POST',
+                 r'/session/(?P<sid>\w+)/(?:timeouts|window/rect|cookie'
+                 r'|refresh|back|forward|window/maximize)',
+                 self.accept),
+            )
+        ]
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def hub_url(self) -> str:
+        """Command executor for remote drivers."""
+        return f"{self.base_url}/wd/hub"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def handle(self, method: str, path: str, params: dict) -> Tuple[int, Any]:
+        """Routes a request; returns the HTTP status and the payload."""
+        path = urlsplit(path).path
+        if path.startswith('/wd/hub'):
+            path = path[len('/wd/hub'):]
+            if path == '/status':
+                # the W3C status, as opposed to Selenoid's own
+                return 200, {'value': {
+                    'ready': len(self.sessions) < self.limit,
+                    'message': 'weberist fake server',
+                }}
+        path = path.rstrip('/') or '/'
+        for route_method, pattern, handler in self._routes:
+            if route_method != method:
+                continue
+            match = pattern.match(path)
+            if match is None:
+                continue
+            arguments = match.groupdict()
+            session = None
+            if 'sid' in arguments:
+                session = self._session(arguments.pop('sid'))
+            with self._lock:
+                self.stats[handler.__name__] += 1
+            if self.latency:
+                time.sleep(self.latency)
+            if session is None:
+                return handler(params, **arguments)
+            return handler(session, params, **arguments)
+        raise WebDriverError(
+            404, 'unknown command', f"Unknown command: {method} {path}"
+        )
+
+    def _session(self, session_id: str) -> FakeSession:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise WebDriverError(
+                404, 'invalid session id', f"Unknown session {session_id}."
+            )
+        return session
+
+    def _page(self, url: str) -> str:
+        if url == 'about:blank':
+            return BLANK_PAGE
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        if path in self.pages:
+            return self.pages[path]
+        with self._lock:
+            source = self._sources.get(url)
+        if source is not None:
+            return source
+        content, _ = SiteHandler.render(path)
+        if content is not None:
+            source = content.decode('utf-8')
+        elif self.fetch:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                source = response.read().decode('utf-8', 'replace')
+        else:
+            logger.debug("No fake page for %s; serving a blank one.", url)
+            source = BLANK_PAGE
+        with self._lock:
+            self._sources[url] = source
+        return source
+
+    # selenoid endpoints
+
+    def status(self, params: dict) -> Tuple[int, Any]:
+        used = len(self.sessions)
+        return 200, {
+            'total': self.limit,
+            'used': used,
+            'queued': 0,
+            'pending': 0,
+            'browsers': {'chrome': {'fake': {}}},
+        }
+
+    # session commands
+
+    def new_session(self, params: dict) -> Tuple[int, Any]:
+        capabilities = params.get('capabilities', {}).get('alwaysMatch', {})
+        session = FakeSession(capabilities)
+        with self._lock:
+            if len(self.sessions) >= self.limit:
+                raise WebDriverError(
+                    500, 'session not created',
+                    f"Total limit of {self.limit} sessions reached."
+                )
+            self.sessions[session.session_id] = session
+        return 200, {'value': {
+            'sessionId': session.session_id,
+            'capabilities': {
+                'browserName': capabilities.get('browserName', 'chrome'),
+                'browserVersion': 'fake',
+                'platformName': 'linux',
+                'goog:chromeOptions': {'debuggerAddress': ''},
+            },
+        }}
+
+    def delete_session(self, session: FakeSession, params: dict):
+        with self._lock:
+            self.sessions.pop(session.session_id, None)
+        return 200, {'value': None}
+
+    def navigate(self, session: FakeSession, params: dict):
+        url = params.get('url', 'about:blank')
+        session.load(url, self._page(url))
+        return 200, {'value': None}
+
+    def current_url(self, session: FakeSession, params: dict):
+        return 200, {'value': session.url}
+
+    def title(self, session: FakeSession, params: dict):
+        return 200, {'value': session.document.findtext('.//title') or ''}
+
+    def source(self, session: FakeSession, params: dict):
+        return 200, {
+            'value': lxml_html.tostring(session.document, encoding='unicode')
+        }
+
+    def find_elements(self,
+                      session: FakeSession,
+                      params: dict,
+                      many: str,
+                      eid: str = None):
+        root = session.document if eid is None else session.element(eid)
+        found = find(root, params.get('using'), params.get('value'))
+        if many == 'elements':
+            return 200, {'value': [session.reference(node) for node in found]}
+        if not found:
+            raise WebDriverError(
+                404, 'no such element',
+                f"Unable to locate element: {params.get('value')}"
+            )
+        return 200, {'value': session.reference(found[0])}
+
+    def element_text(self, session: FakeSession, params: dict, eid: str):
+        text = session.element(eid).text_content()
+        return 200, {'value': ' '.join(text.split())}
+
+    def element_name(self, session: FakeSession, params: dict, eid: str):
+        return 200, {'value': session.element(eid).tag}
+
+    def element_attribute(self,
+                          session: FakeSession,
+                          params: dict,
+                          eid: str,
+                          name: str):
+        element = session.element(eid)
+        if name in ('textContent', 'innerText'):
+            return 200, {'value': element.text_content()}
+        return 200, {'value': element.get(name)}
+
+    def element_state(self, session: FakeSession, params: dict, eid: str):
+        session.element(eid)
+        return 200, {'value': True}
+
+    def element_rect(self, session: FakeSession, params: dict, eid: str):
+        session.element(eid)
+        return 200, {
+            'value': {'x': 0, 'y': 0, 'width': 100, 'height': 20}
+        }
+
+    def element_click(self, session: FakeSession, params: dict, eid: str):
+        session.element(eid)
+        return 200, {'value': None}
+
+    def element_send_keys(self, session: FakeSession, params: dict, eid: str):
+        element = session.element(eid)
+        element.set('value', (element.get('value') or '') + params.get(
+            'text', ''
+        ))
+        return 200, {'value': None}
+
+    def execute_script(self, session: FakeSession, params: dict):
+        script = params.get('script', '')
+        args = params.get('args', [])
+        for cue, value in self.scripts:
+            if cue in script:
+                if callable(value):
+                    value = value(session, script, args)
+                return 200, {'value': value}
+        on_element = any(
+            isinstance(arg, dict) and ELEMENT_KEY in arg for arg in args
+        )
+        return 200, {'value': True if on_element else None}
+
+    def execute_cdp(self, session: FakeSession, params: dict):
+        result = self.cdp.get(params.get('cmd'), {})
+        if callable(result):
+            result = result(session, params.get('params', {}))
+        return 200, {'value': result}
+
+    def _create_target(self, session: FakeSession, params: dict):
+        handle = session.open_window()
+        url = params.get('url', 'about:blank')
+        session.windows[handle].load(url, self._page(url))
+        return {'targetId': handle}
+
+    def _close_target(self, session: FakeSession, params: dict):
+        session.windows.pop(params.get('targetId'), None)
+        return {'success': True}
+
+    def window(self, session: FakeSession, params: dict):
+        session.current  # pylint: disable=pointless-statement
+        return 200, {'value': session.window}
+
+    def window_handles(self, session: FakeSession, params: dict):
+        return 200, {'value': list(session.windows)}
+
+    def switch_window(self, session: FakeSession, params: dict):
+        handle = params.get('handle')
+        if handle not in session.windows:
+            raise WebDriverError(
+                404, 'no such window', f"Unknown window {handle}."
+            )
+        session.window = handle
+        return 200, {'value': None}
+
+    def new_window(self, session: FakeSession, params: dict):
+        handle = session.open_window()
+        return 200, {
+            'value': {'handle': handle, 'type': params.get('type', 'tab')}
+        }
+
+    def close_window(self, session: FakeSession, params: dict):
+        session.current  # pylint: disable=pointless-statement
+        del session.windows[session.window]
+        if not session.windows:
+            # like chrome, closing the last window ends the session
+            with self._lock:
+                self.sessions.pop(session.session_id, None)
+        return 200, {'value': list(session.windows)}
+
+    def cookies(self, session: FakeSession, params: dict):
+        return 200, {'value': []}
+
+    def accept(self, session: FakeSession, params: dict):
+        return 200, {'value': None}
+
+    def start(self) -> 'FakeWebDriverServer':
+        self.thread = threading.Thread(
+            target=self.server.serve_forever,
+            name='weberist-fake-webdriver',
+            daemon=True,
+        )
+        self.thread.start()
+        logger.debug("Fake WebDriver serving at %s", self.hub_url)
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback_):
+        self.stop()
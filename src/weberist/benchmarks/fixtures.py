@@ -0,0 +1,190 @@
+"""
+Local static site used by the benchmark suite.
+
+Pages are generated in memory and served by a threaded HTTP server bound to
+localhost, so benchmarks never touch the network. Available pages:
+
+- ``/table/<rows>``: a table with `rows` rows and `TABLE_COLUMNS` columns;
+- ``/deep/<depth>``: `depth` nested ``div`` elements;
+- ``/lazy/<rows>``: a page that fetches `rows` rows with XHR after load;
+- ``/form``: a page with an input and a button for select/click benchmarks;
+- ``/data/<rows>``: the JSON consumed by ``/lazy/<rows>``.
+"""
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Tuple
+
+logger = logging.getLogger('weberist.benchmarks.fixtures')
+
+TABLE_COLUMNS = 8
+LAZY_DELAY_MS = 100
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def table_page(rows: int) -> str:
+    header = ''.join(f'<th>col {col}</th>' for col in range(TABLE_COLUMNS))
+    lines = [
+        '<tr>' + ''.join(
+            f'<td class="cell">{row}-{col}</td>'
+            for col in range(TABLE_COLUMNS)
+        ) + '</tr>'
+        for row in range(rows)
+    ]
+    body = (
+        f'<table id="table"><thead><tr>{header}</tr></thead>'
+        f'<tbody>{"".join(lines)}</tbody></table>'
+    )
+    return PAGE.format(title=f'table {rows}', body=body)
+
+
+def deep_page(depth: int) -> str:
+    opening = ''.join(
+        f'<div class="level" id="level-{level}">' for level in range(depth)
+    )
+    body = f'{opening}<span id="leaf">leaf</span>{"</div>" * depth}'
+    return PAGE.format(title=f'deep {depth}', body=body)
+
+
+def lazy_page(rows: int) -> str:
+    body = (
+        '<ul id="lazy"></ul>'
+        '<script>'
+        'setTimeout(function () {'
+        '  var xhr = new XMLHttpRequest();'
+        f'  xhr.open("GET", "/data/{rows}");'
+        '  xhr.onload = function () {'
+        '    var list = document.getElementById("lazy");'
+        '    JSON.parse(xhr.responseText).forEach(function (item, index) {'
+        '      var li = document.createElement("li");'
+        '      li.id = "lazy-row-" + index;'
+        '      li.textContent = item;'
+        '      list.appendChild(li);'
+        '    });'
+        '  };'
+        '  xhr.send();'
+        f'}}, {LAZY_DELAY_MS});'
+        '</script>'
+    )
+    return PAGE.format(title=f'lazy {rows}', body=body)
+
+
+def form_page() -> str:
+    body = (
+        '<input id="input" name="input" type="text">'
+        '<button id="button" '
+        'onclick="document.getElementById(\'clicks\').textContent++">'
+        'click</button>'
+        '<span id="clicks">0</span>'
+    )
+    return PAGE.format(title='form', body=body)
+
+
+def lazy_data(rows: int) -> str:
+    return json.dumps([f'item {row}' for row in range(rows)])
+
+
+ROUTES: Dict[str, Tuple[Callable, str]] = {
+    "table": (table_page, "text/html"),
+    "deep": (deep_page, "text/html"),
+    "lazy": (lazy_page, "text/html"),
+    "data": (lazy_data, "application/json"),
+}
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+
+    pages: Dict[str, Tuple[bytes, str]] = None
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.path not in self.pages:
+            self.pages[self.path] = self.render(self.path)
+        content, content_type = self.pages[self.path]
+        if content is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    @staticmethod
+    def render(path: str) -> Tuple[bytes, str]:
+        if path == '/form':
+            return form_page().encode('utf-8'), "text/html"
+        parts = path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] not in ROUTES:
+            return None, None
+        try:
+            size = int(parts[1])
+        except ValueError:
+            return None, None
+        render, content_type = ROUTES[parts[0]]
+        return render(size).encode('utf-8'), content_type
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        logger.debug(format, *args)
+
+
+class StaticSite:
+    """
+    Serves the generated benchmark pages on ``127.0.0.1`` from a background
+    thread.
+
+    Parameters
+    ----------
+    port : int, default 0
+        Port to bind; 0 picks a free port.
+
+    Examples
+    --------
+    >>> with StaticSite() as site:
+    ...     driver.goto(site.url('/table/1000'))
+    """
+
+    def __init__(self, port: int = 0) -> None:
+        handler = type('Handler', (SiteHandler, ), {"pages": {}})
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def start(self) -> 'StaticSite':
+        self.thread = threading.Thread(
+            target=self.server.serve_forever,
+            name='weberist-static-site',
+            daemon=True,
+        )
+        self.thread.start()
+        logger.debug("Static site serving at %s", self.base_url)
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback_):
+        self.stop()
@@ -0,0 +1,339 @@
+"""
+Benchmark suite for weberist.
+
+Every benchmark runs against the local `StaticSite`, so no network access is
+needed. Results are plain dictionaries of timing statistics (seconds) that
+`run_benchmarks` dumps to JSON, and `compare_results` diffs two such files,
+e.g. from two commits.
+
+Run it with ``python -m weberist.benchmarks --output results.json``.
+"""
+import gc
+import json
+import time
+import logging
+import platform
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+from datetime import datetime
+from importlib import metadata
+from typing import Any, Callable, Dict, List
+
+from weberist.core.drivers import ChromeDriver
+from weberist.base.data import ProfileStorageBackend
+from weberist.base.profiling import STARTUP_STATS
+from .fixtures import StaticSite
+
+logger = logging.getLogger('weberist.benchmarks.suite')
+
+PAGES = (
+    '/table/100',
+    '/table/5000',
+    '/deep/50',
+    '/deep/500',
+    '/lazy/200',
+)
+PROFILE_WRITES = 200
+
+
+def measure(func: Callable, repeat: int = 5, warmup: int = 1
+            ) -> Dict[str, float]:
+    """
+    Calls `func` `warmup` + `repeat` times and returns statistics of the
+    last `repeat` wall-clock durations, in seconds.
+    """
+    for _ in range(warmup):
+        func()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return {
+        "n": repeat,
+        "mean": statistics.fmean(durations),
+        "median": statistics.median(durations),
+        "min": min(durations),
+        "max": max(durations),
+        "stdev": statistics.stdev(durations) if repeat > 1 else 0.0,
+    }
+
+
+class BenchmarkContext:
+    """
+    Shared state of a benchmark run: the static site, a scratch directory
+    and a lazily launched headless `ChromeDriver`.
+    """
+
+    def __init__(self,
+                 site: StaticSite,
+                 target_path: Path,
+                 repeat: int = 5,
+                 headless: bool = True) -> None:
+        self.site = site
+        self.target_path = target_path
+        self.repeat = repeat
+        self.headless = headless
+        self._driver = None
+
+    def driver_kwargs(self, **kwargs) -> Dict[str, Any]:
+        option_arguments = []
+        if self.headless:
+            option_arguments.append('--headless=new')
+        kwargs.setdefault('option_arguments', option_arguments)
+        kwargs.setdefault('localstorage', self.target_path / 'localstorage')
+        return kwargs
+
+    def launch(self, **kwargs) -> ChromeDriver:
+        return ChromeDriver(**self.driver_kwargs(**kwargs))
+
+    @property
+    def driver(self) -> ChromeDriver:
+        if self._driver is None:
+            self._driver = self.launch()
+        return self._driver
+
+    def close(self) -> None:
+        if self._driver is not None:
+            self._driver.quit_driver()
+            self._driver = None
+
+
+def bench_startup(context: BenchmarkContext) -> Dict[str, Any]:
+    """`ChromeDriver` launch and quit, with and without stealth."""
+    result = {}
+    for name, stealth in (("stealth", True), ("no_stealth", False)):
+        STARTUP_STATS.reset()
+
+        def launch(stealth=stealth):
+            # chrome refuses a user-data-dir in use, e.g. by the shared
+            # driver, so each launch gets its own
+            localstorage = tempfile.mkdtemp(
+                prefix='startup-', dir=context.target_path
+            )
+            driver = context.launch(
+                stealth=stealth,
+                trace_startup=True,
+                localstorage=Path(localstorage),
+            )
+            driver.quit_driver()
+
+        result[name] = measure(launch, repeat=context.repeat)
+        result[f"{name}_phases"] = STARTUP_STATS.summary()
+    return result
+
+
+def bench_goto(context: BenchmarkContext) -> Dict[str, Any]:
+    """Latency of `BaseDriver.goto` for pages of growing size."""
+    driver = context.driver
+    return {
+        page: measure(
+            lambda page=page: driver.goto(context.site.url(page)),
+            repeat=context.repeat,
+        )
+        for page in PAGES
+    }
+
+
+def bench_wait_overhead(context: BenchmarkContext) -> Dict[str, Any]:
+    """
+    Cost of the waiting helpers (`select`, `click`, lazy content) compared
+    with plain selenium calls on the same elements.
+    """
+    driver = context.driver
+    driver.goto(context.site.url('/form'))
+    result = {
+        "find_element": measure(
+            lambda: driver.find_element('id', 'button'),
+            repeat=context.repeat,
+        ),
+        "select": measure(
+            lambda: driver.select('button'),
+            repeat=context.repeat,
+        ),
+        "element_click": measure(
+            lambda: driver.find_element('id', 'button').click(),
+            repeat=context.repeat,
+        ),
+        "click": measure(
+            lambda: driver.click('button'),
+            repeat=context.repeat,
+        ),
+    }
+
+    def select_lazy():
+        driver.goto(context.site.url('/lazy/200'))
+        driver.select('lazy-row-199', poll_frequency=0.05)
+
+    result["select_lazy"] = measure(select_lazy, repeat=context.repeat)
+    return result
+
+
+def bench_parse(context: BenchmarkContext) -> Dict[str, Any]:
+    """Cost of `make_soup` and `make_dom` on the current page source."""
+    driver = context.driver
+    result = {}
+    for page in PAGES:
+        driver.goto(context.site.url(page))
+        result[page] = {
+            "make_soup": measure(driver.make_soup, repeat=context.repeat),
+            "make_dom": measure(driver.make_dom, repeat=context.repeat),
+        }
+    return result
+
+
+def bench_profile_storage(context: BenchmarkContext) -> Dict[str, Any]:
+    """Write throughput of `ProfileStorageBackend.set_profile`."""
+    path = context.target_path / 'profiles'
+    path.mkdir(parents=True, exist_ok=True)
+
+    def write_profiles():
+        backend = ProfileStorageBackend(path)
+        backend.clear()
+        for index in range(PROFILE_WRITES):
+            backend.set_profile(f'Profile {index}', {"index": index})
+
+    result = measure(write_profiles, repeat=context.repeat)
+    result["writes"] = PROFILE_WRITES
+    result["writes_per_second"] = PROFILE_WRITES / result["mean"]
+    return result
+
+
+# name: (benchmark, needs a browser)
+BENCHMARKS: Dict[str, tuple[Callable, bool]] = {
+    "startup": (bench_startup, True),
+    "goto": (bench_goto, True),
+    "wait_overhead": (bench_wait_overhead, True),
+    "parse": (bench_parse, True),
+    "profile_storage": (bench_profile_storage, False),
+}
+
+
+def _version(package: str) -> str:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(names: List[str] = None,
+                   repeat: int = 5,
+                   output: str | Path = None,
+                   headless: bool = True) -> Dict[str, Any]:
+    """
+    Runs the benchmarks in `names` (all of `BENCHMARKS` by default).
+
+    Benchmarks that need a browser are reported as ``{"skipped": reason}``
+    if chrome cannot be launched.
+
+    Parameters
+    ----------
+    names : List[str], optional
+        Names of the benchmarks to run.
+    repeat : int, default 5
+        Number of measured repetitions of each benchmark.
+    output : str | Path, optional
+        If given, results are also written to this JSON file.
+    headless : bool, default True
+        Whether to launch chrome with ``--headless=new``.
+
+    Returns
+    -------
+    Dict[str, Any]
+        ``{"meta": {...}, "results": {name: statistics}}``.
+    """
+    names = names or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(
+            f'Unknown benchmarks {sorted(unknown)}. '
+            f'Valid are {list(BENCHMARKS)}.'
+        )
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "weberist": _version('weberist'),
+            "selenium": _version('selenium'),
+            "repeat": repeat,
+        },
+        "results": {},
+    }
+    browser_error = None
+    with tempfile.TemporaryDirectory() as tmp, StaticSite() as site:
+        context = BenchmarkContext(site, Path(tmp), repeat, headless)
+        if any(BENCHMARKS[name][1] for name in names):
+            try:
+                context.driver  # pylint: disable=pointless-statement
+            except Exception as err:  # pylint: disable=broad-except
+                browser_error = f"{type(err).__name__}: {err}"
+                logger.warning("Browser unavailable: %s", browser_error)
+        try:
+            for name in names:
+                benchmark, needs_browser = BENCHMARKS[name]
+                if needs_browser and browser_error is not None:
+                    report["results"][name] = {"skipped": browser_error}
+                    continue
+                logger.info("Running benchmark '%s'", name)
+                report["results"][name] = benchmark(context)
+                gc.collect()
+        finally:
+            context.close()
+
+    if output is not None:
+        with open(output, 'w', encoding='utf-8') as json_file:
+            json.dump(report, json_file, indent=4)
+    return report
+
+
+def _flatten(results: Dict[str, Any], prefix: str = '') -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        if not isinstance(value, dict):
+            continue
+        name = f"{prefix}{key}"
+        if "mean" in value:
+            flat[name] = value["mean"]
+        else:
+            flat.update(_flatten(value, f"{name}."))
+    return flat
+
+
+def compare_results(baseline: Dict[str, Any],
+                    current: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """
+    Compares the mean timings of two reports of `run_benchmarks`.
+
+    Returns
+    -------
+    Dict[str, Dict[str, float]]
+        For each timing present in both reports, its ``baseline`` and
+        ``current`` mean and their ``ratio`` (above 1 means slower).
+    """
+    before = _flatten(baseline.get("results", baseline))
+    after = _flatten(current.get("results", current))
+    return {
+        name: {
+            "baseline": before[name],
+            "current": after[name],
+            "ratio": after[name] / before[name] if before[name] else None,
+        }
+        for name in before if name in after
+    }
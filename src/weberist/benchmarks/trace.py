@@ -0,0 +1,341 @@
+"""
+Record and replay of WebDriver command traces.
+
+`CommandTrace.record` wraps the command executor of a driver and logs every
+command it sends (name, parameters, response time and error) until the
+block exits. Traces are saved as JSON lines, gzipped if the file name ends
+with ``.gz``. `replay` sends the commands of a trace again through another
+driver (e.g. one connected to `FakeWebDriverServer`, or after upgrading
+weberist or selenium) and records the new timings, and `compare_traces`
+diffs the two: command counts, latencies and round trips per page.
+
+Examples
+--------
+>>> trace = CommandTrace()
+>>> with trace.record(driver):
+...     crawl(driver)
+>>> trace.save('crawl.jsonl.gz')
+
+Later, or on another version:
+
+>>> replayed = replay(CommandTrace.load('crawl.jsonl.gz'), driver)
+>>> compare_traces(CommandTrace.load('crawl.jsonl.gz'), replayed)
+
+Or from a shell: ``python -m weberist.benchmarks.trace old.jsonl new.jsonl``.
+"""
+import gzip
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+import threading
+from pathlib import Path
+from datetime import datetime
+from importlib import metadata
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from weberist.generic.types import WebDriver
+from weberist.generic.constants import WEB_ELEMENT_KEY as ELEMENT_KEY
+
+logger = logging.getLogger('weberist.benchmarks.trace')
+
+NAVIGATION_COMMANDS = ('get', 'goBack', 'goForward', 'refresh')
+# commands replaying would break: the replaying driver owns its session
+SESSION_COMMANDS = ('newSession', 'quit')
+
+
+def _version(package: str) -> str | None:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _element_ids(value: Any) -> List[str]:
+    # element references in a response value, in order
+    if isinstance(value, dict):
+        if ELEMENT_KEY in value:
+            return [value[ELEMENT_KEY]]
+        return [
+            element_id
+            for item in value.values()
+            for element_id in _element_ids(item)
+        ]
+    if isinstance(value, list):
+        return [
+            element_id for item in value for element_id in _element_ids(item)
+        ]
+    return []
+
+
+def _map_elements(value: Any, elements: Dict[str, str]) -> Any:
+    # replaces recorded element references by the replayed ones
+    if isinstance(value, dict):
+        if ELEMENT_KEY in value:
+            return {ELEMENT_KEY: elements.get(value[ELEMENT_KEY],
+                                              value[ELEMENT_KEY])}
+        return {
+            key: (elements.get(item, item)
+                  if key == 'id' and isinstance(item, str)
+                  else _map_elements(item, elements))
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_map_elements(item, elements) for item in value]
+    return value
+
+
+class CommandTrace:
+    """
+    WebDriver commands sent by a driver, in order.
+
+    Each entry is a dict with the ``command`` name, its ``params`` (without
+    the session id), the ``elapsed`` seconds of the round trip, the
+    ``error`` raised, if any, and the ``elements`` referenced by the
+    response, which `replay` uses to map element ids between sessions.
+    """
+
+    def __init__(self,
+                 entries: List[Dict[str, Any]] = None,
+                 meta: Dict[str, Any] = None) -> None:
+        self.entries = list(entries or [])
+        self.meta = meta or {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "weberist": _version('weberist'),
+            "selenium": _version('selenium'),
+        }
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @contextmanager
+    def record(self, driver: WebDriver) -> Iterator['CommandTrace']:
+        """Records the commands `driver` sends inside the block."""
+        executor = driver.command_executor
+        execute = executor.execute
+
+        def traced(command: str, params: dict):
+            # copied first: selenium deletes the path parameters (the session
+            # and element ids) from `params` while sending the command
+            recorded = {
+                key: value for key, value in params.items()
+                if key != 'sessionId'
+            }
+            start = time.perf_counter()
+            error = None
+            response = None
+            try:
+                response = execute(command, params)
+                return response
+            except Exception as err:
+                error = type(err).__name__
+                raise
+            finally:
+                entry = {
+                    "command": command,
+                    "params": recorded,
+                    "elapsed": time.perf_counter() - start,
+                    "error": error,
+                }
+                if isinstance(response, dict):
+                    elements = _element_ids(response.get('value'))
+                    if elements:
+                        entry["elements"] = elements
+                with self._lock:
+                    self.entries.append(entry)
+
+        executor.execute = traced
+        try:
+            yield self
+        finally:
+            # drops the instance attribute, restoring the class method
+            if executor.__dict__.get('execute') is traced:
+                del executor.execute
+
+    def save(self, path: str | Path) -> Path:
+        """Writes the trace as JSON lines, gzipped for ``.gz`` paths."""
+        path = Path(path)
+        opener = gzip.open if path.suffix == '.gz' else open
+        with opener(path, 'wt', encoding='utf-8') as trace_file:
+            trace_file.write(json.dumps({"meta": self.meta}) + '\n')
+            for entry in self.entries:
+                trace_file.write(
+                    json.dumps(entry, separators=(',', ':')) + '\n'
+                )
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> 'CommandTrace':
+        path = Path(path)
+        opener = gzip.open if path.suffix == '.gz' else open
+        meta = None
+        entries = []
+        with opener(path, 'rt', encoding='utf-8') as trace_file:
+            for line in trace_file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if meta is None and "meta" in record:
+                    meta = record["meta"]
+                    continue
+                entries.append(record)
+        return cls(entries, meta)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, total and mean/median latency (seconds) per command."""
+        durations: Dict[str, List[float]] = {}
+        for entry in self.entries:
+            durations.setdefault(entry["command"], []).append(
+                entry["elapsed"]
+            )
+        return {
+            command: {
+                "count": len(values),
+                "total": sum(values),
+                "mean": statistics.fmean(values),
+                "median": statistics.median(values),
+            }
+            for command, values in durations.items()
+        }
+
+    def pages(self) -> List[Dict[str, Any]]:
+        """
+        Round trips and seconds spent on each page: the commands from a
+        navigation up to the next one. Session commands are left out, so
+        that pages of recorded and replayed traces line up.
+        """
+        pages = []
+        current = {"url": None, "commands": 0, "seconds": 0.0}
+        for entry in self.entries:
+            if entry["command"] in SESSION_COMMANDS:
+                continue
+            if entry["command"] in NAVIGATION_COMMANDS:
+                if current["commands"]:
+                    pages.append(current)
+                current = {
+                    "url": entry["params"].get('url', current["url"]),
+                    "commands": 0,
+                    "seconds": 0.0,
+                }
+            current["commands"] += 1
+            current["seconds"] += entry["elapsed"]
+        if current["commands"]:
+            pages.append(current)
+        return pages
+
+
+def replay(trace: CommandTrace,
+           driver: WebDriver,
+           stop_on_error: bool = False) -> CommandTrace:
+    """
+    Sends the commands of `trace` through `driver`, in order, and records
+    them.
+
+    Session commands are skipped, the session id is the one of `driver` and
+    element ids are mapped to the elements found while replaying. Errors are
+    recorded, as in the original trace, and do not stop the replay unless
+    `stop_on_error`.
+
+    Returns
+    -------
+    CommandTrace
+        The commands sent while replaying, with their new timings.
+    """
+    replayed = CommandTrace()
+    elements: Dict[str, str] = {}
+    with replayed.record(driver):
+        for entry in trace.entries:
+            if entry["command"] in SESSION_COMMANDS:
+                continue
+            params = _map_elements(entry["params"], elements)
+            params['sessionId'] = driver.session_id
+            try:
+                response = driver.command_executor.execute(
+                    entry["command"], params
+                )
+            except Exception as err:  # pylint: disable=broad-except
+                if stop_on_error:
+                    raise
+                if entry.get("error") is None:
+                    logger.warning(
+                        "Replayed %s failed: %s", entry["command"], err
+                    )
+                continue
+            if entry.get("elements") and isinstance(response, dict):
+                found = _element_ids(response.get('value'))
+                elements.update(zip(entry["elements"], found))
+    return replayed
+
+
+def compare_traces(baseline: CommandTrace,
+                   current: CommandTrace) -> Dict[str, Any]:
+    """
+    Diffs two traces of the same crawl.
+
+    Returns
+    -------
+    Dict[str, Any]
+        ``commands``: for each command, its ``count`` and ``mean`` latency
+        in both traces and the latency ``ratio`` (above 1 means slower);
+        ``pages``: round trips per page in both traces, matched in order;
+        ``total``: overall counts and seconds.
+    """
+    before = baseline.summary()
+    after = current.summary()
+    commands = {}
+    for command in sorted(set(before) | set(after)):
+        old = before.get(command, {"count": 0, "mean": None})
+        new = after.get(command, {"count": 0, "mean": None})
+        ratio = None
+        if old["mean"] and new["mean"] is not None:
+            ratio = new["mean"] / old["mean"]
+        commands[command] = {
+            "baseline_count": old["count"],
+            "current_count": new["count"],
+            "baseline_mean": old["mean"],
+            "current_mean": new["mean"],
+            "ratio": ratio,
+        }
+    pages = [
+        {
+            "url": old["url"],
+            "baseline_commands": old["commands"],
+            "current_commands": new["commands"],
+            "baseline_seconds": old["seconds"],
+            "current_seconds": new["seconds"],
+        }
+        for old, new in zip(baseline.pages(), current.pages())
+    ]
+    return {
+        "commands": commands,
+        "pages": pages,
+        "total": {
+            "baseline_commands": len(baseline),
+            "current_commands": len(current),
+            "baseline_seconds": sum(e["elapsed"] for e in baseline.entries),
+            "current_seconds": sum(e["elapsed"] for e in current.entries),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='python -m weberist.benchmarks.trace',
+        description='Compare two WebDriver command traces.',
+    )
+    parser.add_argument('baseline', help='Trace file recorded first.')
+    parser.add_argument('current', help='Trace file to compare with it.')
+    args = parser.parse_args()
+    report = compare_traces(
+        CommandTrace.load(args.baseline), CommandTrace.load(args.current)
+    )
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == '__main__':
+    main()
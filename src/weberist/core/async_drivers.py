@@ -0,0 +1,116 @@
+"""
+Awaitable facades over the synchronous drivers.
+
+Selenium drivers block and are not thread-safe, so each facade owns a
+single-thread executor: calls on one driver run one at a time, in order,
+off the event loop, while many drivers progress concurrently.
+
+Examples
+--------
+>>> async with AsyncChromeDriver() as driver:
+...     await driver.goto("https://example.com")
+...     await asyncio.wait_for(driver.click("login"), timeout=10)
+...     url = await driver.current_url
+"""
+import asyncio
+import logging
+from functools import partial, wraps
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict
+
+from weberist.base.drivers import BaseDriver
+from weberist.generic.types import WebDriver
+from .drivers import ChromeDriver
+
+logger = logging.getLogger('weberist.core.async_drivers')
+
+
+class AsyncDriverMixin:
+    """
+    Exposes every method of a synchronous driver as a coroutine function
+    and every property as an awaitable.
+
+    Timeouts and cancellation go through asyncio (e.g.
+    ``asyncio.wait_for``). A call that already started in the executor
+    cannot be interrupted and runs to completion; calls still queued behind
+    it are cancelled.
+
+    Parameters
+    ----------
+    factory : Callable[[], WebDriver]
+        Creates the synchronous driver; it is called in the executor.
+    """
+
+    def __init__(self, factory: Callable[[], WebDriver]) -> None:
+        self._factory = factory
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='weberist-driver'
+        )
+        self._methods: Dict[str, Callable[..., Awaitable]] = {}
+        self.driver: WebDriver = None
+
+    async def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Runs ``func(*args, **kwargs)`` in this driver's executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(func, *args, **kwargs)
+        )
+
+    async def start(self) -> 'AsyncDriverMixin':
+        if self.driver is None:
+            self.driver = await self.call(self._factory)
+        return self
+
+    async def quit(self) -> None:
+        """Quits the driver and shuts its executor down."""
+        try:
+            if self.driver is not None:
+                await self.call(self.driver.quit_driver)
+        finally:
+            self.driver = None
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __getattr__(self, name: str) -> Any:
+        driver = self.__dict__.get('driver')
+        if driver is None:
+            raise AttributeError(
+                f"'{type(self).__name__}' has no attribute '{name}'; "
+                "start the driver before using it."
+            )
+        if name in self._methods:
+            return self._methods[name]
+        if isinstance(getattr(type(driver), name, None), property):
+            # properties like current_url or page_source hit the browser
+            return self.call(getattr, driver, name)
+        attribute = getattr(driver, name)
+        if not callable(attribute):
+            return attribute
+
+        @wraps(attribute)
+        async def method(*args, **kwargs):
+            return await self.call(getattr(self.driver, name), *args, **kwargs)
+
+        self._methods[name] = method
+        return method
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback_):
+        if exc_type is not None:
+            logger.error("Exception occurred: %s", exc_value)
+        await self.quit()
+
+
+class AsyncBaseDriver(AsyncDriverMixin):
+    """Awaitable `BaseDriver`; keyword arguments are passed to it."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(partial(BaseDriver, *args, **kwargs))
+
+
+class AsyncChromeDriver(AsyncDriverMixin):
+    """Awaitable `ChromeDriver`; keyword arguments are passed to it."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(partial(ChromeDriver, *args, **kwargs))
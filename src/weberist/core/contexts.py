@@ -0,0 +1,136 @@
+"""
+Isolated browser contexts inside a running chrome.
+
+A browser context is chrome's incognito-like unit of isolation: it has its
+own cookies, cache and storage but shares the browser process, so opening
+one costs a tab instead of a whole new browser.
+"""
+import logging
+from functools import wraps
+from typing import Any, Callable
+
+from weberist.generic.types import WebDriver
+from weberist.base.exceptions import WebDriverException
+
+logger = logging.getLogger('weberist.core.contexts')
+
+
+class BrowserContext:
+    """
+    A tab in its own browser context of `driver`'s browser, created with
+    the CDP commands ``Target.createBrowserContext`` and
+    ``Target.createTarget``.
+
+    Attribute access is delegated to `driver`, so every `BaseDriver` helper
+    (`goto`, `select`, `click`, `make_soup`...) works on the handle; methods
+    first switch the driver to the context's tab if it is not the active
+    one. Switches made directly on the driver are not seen by the handle,
+    so call `activate` with ``force=True`` after them.
+
+    The context and its storage are disposed by `release`, also called when
+    leaving a ``with`` block.
+
+    Parameters
+    ----------
+    driver : WebDriver
+        A chrome driver (local or remote).
+    url : str, default 'about:blank'
+        URL to open in the context's tab.
+    proxy_server : str, optional
+        Proxy used by this context only, e.g. ``"http://host:port"``.
+    """
+
+    def __init__(self,
+                 driver: WebDriver,
+                 url: str = 'about:blank',
+                 proxy_server: str = None) -> None:
+        self.driver = driver
+        self.released = False
+        params = {"disposeOnDetach": False}
+        if proxy_server:
+            params["proxyServer"] = proxy_server
+        self.context_id = driver.execute_cdp_cmd(
+            'Target.createBrowserContext', params
+        )['browserContextId']
+        self.target_id = driver.execute_cdp_cmd(
+            'Target.createTarget',
+            {"url": url, "browserContextId": self.context_id},
+        )['targetId']
+        # chromedriver uses target ids as window handles
+        self.handle = self.target_id
+        logger.debug(
+            "Created browser context %s with tab %s",
+            self.context_id,
+            self.handle,
+        )
+
+    def __repr__(self) -> str:
+        return f"BrowserContext({self.context_id!r}, handle={self.handle!r})"
+
+    def activate(self, force: bool = False) -> None:
+        """Switches the driver to this context's tab."""
+        if self.released:
+            raise WebDriverException(
+                f"Browser context {self.context_id} was released."
+            )
+        if force or getattr(self.driver, 'active_context', None) is not self:
+            self.driver.switch_to.window(self.handle)
+            self.driver.active_context = self
+
+    def __getattr__(self, name: str) -> Any:
+        if isinstance(getattr(type(self.driver), name, None), property):
+            # properties like title or page_source read the current tab
+            self.activate()
+            return getattr(self.driver, name)
+        attribute = getattr(self.driver, name)
+        if callable(attribute):
+            return self._bind(attribute)
+        return attribute
+
+    def _bind(self, method: Callable) -> Callable:
+        @wraps(method)
+        def inner(*args, **kwargs):
+            self.activate()
+            return method(*args, **kwargs)
+        return inner
+
+    def release(self) -> None:
+        """Closes the context's tab and disposes the context and storage."""
+        if self.released:
+            return
+        self.released = True
+        # whichever context was active, the tab switches below leave it
+        self.driver.active_context = None
+        # CDP commands run on the current tab: leave the one being closed
+        others = [
+            handle for handle in self.driver.window_handles
+            if handle != self.handle
+        ]
+        if not others:
+            logger.warning(
+                "Tab %s is the last one, closing it without disposing "
+                "browser context %s",
+                self.handle,
+                self.context_id,
+            )
+            self.driver.switch_to.window(self.handle)
+            self.driver.close()
+            return
+        self.driver.switch_to.window(others[0])
+        for command, params in (
+            ('Target.closeTarget', {"targetId": self.target_id}),
+            (
+                'Target.disposeBrowserContext',
+                {"browserContextId": self.context_id}
+            ),
+        ):
+            try:
+                self.driver.execute_cdp_cmd(command, params)
+            except WebDriverException as err:
+                logger.warning("%s failed: %s", command, err)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback_):
+        self.release()
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Any, Dict
+from typing import List, Any, Callable, Dict, Iterable, Iterator, Tuple
 from pathlib import Path
 
 from weberist.base.drivers import BaseDriver
@@ -7,9 +7,10 @@ from weberist.base.config import LOCALSTORAGE
 from weberist.generic.types import WebDriver
 
 from weberist.base.data import ProfileStorageBackend
+from .contexts import BrowserContext
+from .tabs import TabScheduler
 
 logger = logging.getLogger('client')
-logger.setLevel(logging.DEBUG)
 
 class ChromeDriver(BaseDriver):
     
@@ -32,9 +33,7 @@ class ChromeDriver(BaseDriver):
         if 'stealth' in kwargs:
             kwargs['profile'] = kwargs.get('profile', 'Profile 1')
             kwargs['localstorage'] = kwargs.get('localstorage', LOCALSTORAGE)
-        profile = kwargs.get('profile', None)
-        localstorage = kwargs.get('localstorage', None)
-        
+
         instance = super().__new__(
             cls,
             *args,
@@ -44,15 +43,9 @@ class ChromeDriver(BaseDriver):
             keep_alive=keep_alive,
             extensions=extensions,
             capabilities=capabilities,
-            **kwargs,
-        )
-        
-        super().__init__(
-            instance,
             quit_on_failure=quit_on_failure,
             timeout=timeout,
-            profile=profile,
-            localstorage=localstorage,
+            **kwargs,
         )
         return instance
 
@@ -92,3 +85,39 @@ class ChromeDriver(BaseDriver):
             "downloadPath": str(path)
         }
         self.execute_cdp_cmd("Page.setDownloadBehavior", params)
+
+    def new_context(self,
+                    url: str = 'about:blank',
+                    proxy_server: str = None) -> BrowserContext:
+        """
+        Opens a tab in a new isolated browser context (own cookies and
+        storage) of this browser. Much cheaper than launching another
+        `ChromeDriver` when only cookie isolation is needed.
+
+        Parameters
+        ----------
+        url : str, default 'about:blank'
+            URL to open in the context's tab.
+        proxy_server : str, optional
+            Proxy used by this context only.
+
+        Returns
+        -------
+        BrowserContext
+            A handle supporting the `BaseDriver` helpers; release it (or use
+            it in a ``with`` block) to dispose the context.
+        """
+        return BrowserContext(self, url=url, proxy_server=proxy_server)
+
+    def map_tabs(self,
+                 urls: Iterable[str],
+                 callback: Callable[[WebDriver, str], Any],
+                 max_tabs: int = 4,
+                 return_exceptions: bool = False) -> Iterator[Tuple[str, Any]]:
+        """
+        Loads `urls` in up to `max_tabs` background tabs at once and yields
+        ``(url, callback(driver, url))`` for each loaded tab, in order. See
+        `TabScheduler`.
+        """
+        scheduler = TabScheduler(self, max_tabs=max_tabs)
+        return scheduler.map(urls, callback, return_exceptions)
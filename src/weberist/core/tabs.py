@@ -0,0 +1,139 @@
+"""
+Concurrent page loads in the tabs of a single driver.
+
+`TabScheduler` keeps up to `max_tabs` pages loading in background tabs,
+started through CDP (``Target.createTarget``) so no tab switch is needed to
+start them, and hands each loaded tab to an extraction callback in the
+order the URLs were given. Network latency of the next pages overlaps with
+the extraction of the current one.
+"""
+import logging
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator, Tuple
+
+from weberist.generic.shortcuts import WebDriverWait
+from weberist.generic.types import WebDriver
+from weberist.base.exceptions import EXCEPTIONS
+
+logger = logging.getLogger('weberist.core.tabs')
+
+READY_STATE = "return document.readyState;"
+
+
+class TabScheduler:
+    """
+    Parameters
+    ----------
+    driver : WebDriver
+        A chrome driver (local or remote).
+    max_tabs : int, default 4
+        Maximum number of tabs opened at once (loading, waiting for or
+        under extraction), besides the tab the driver was on.
+    timeout : float, optional
+        Seconds to wait for a tab to finish loading; the driver's `timeout`
+        by default.
+    poll_frequency : float, default 0.1
+        Seconds between checks of ``document.readyState``.
+    """
+
+    def __init__(self,
+                 driver: WebDriver,
+                 max_tabs: int = 4,
+                 timeout: float = None,
+                 poll_frequency: float = 0.1) -> None:
+        if max_tabs < 1:
+            raise ValueError("max_tabs must be at least 1.")
+        self.driver = driver
+        self.max_tabs = max_tabs
+        self.timeout = timeout or getattr(driver, 'timeout', 20)
+        self.poll_frequency = poll_frequency
+
+    def open_tab(self, url: str) -> str:
+        """Starts loading `url` in a background tab and returns its handle."""
+        return self.driver.execute_cdp_cmd(
+            'Target.createTarget', {"url": url, "background": True}
+        )['targetId']
+
+    def close_tab(self, handle: str) -> None:
+        try:
+            self.driver.execute_cdp_cmd(
+                'Target.closeTarget', {"targetId": handle}
+            )
+        except EXCEPTIONS as err:
+            logger.warning("Could not close tab %s: %s", handle, err)
+
+    def wait_loaded(self) -> None:
+        WebDriverWait(self.driver, self.timeout, self.poll_frequency).until(
+            lambda driver: driver.execute_script(READY_STATE) == 'complete'
+        )
+
+    def map(self,
+            urls: Iterable[str],
+            callback: Callable[[WebDriver, str], Any],
+            return_exceptions: bool = False) -> Iterator[Tuple[str, Any]]:
+        """
+        Loads `urls` in up to `max_tabs` tabs at once and calls
+        ``callback(driver, url)`` with the driver switched to each loaded
+        tab, in the order of `urls`.
+
+        Parameters
+        ----------
+        urls : Iterable[str]
+            URLs to load; consumed lazily.
+        callback : Callable[[WebDriver, str], Any]
+            Extraction function. It must not close or switch away from the
+            tab it is given.
+        return_exceptions : bool, default False
+            If True, exceptions raised while loading or by `callback` are
+            yielded as results instead of raised.
+
+        Yields
+        ------
+        Tuple[str, Any]
+            Each URL and its callback result (or exception).
+        """
+        driver = self.driver
+        home = driver.current_window_handle
+        urls = iter(urls)
+        in_flight = deque()
+        current = None
+        done = object()
+
+        def fill(limit):
+            while len(in_flight) < limit:
+                url = next(urls, done)
+                if url is done:
+                    return
+                in_flight.append((url, self.open_tab(url)))
+
+        try:
+            fill(self.max_tabs)
+            while in_flight:
+                url, current = in_flight.popleft()
+                try:
+                    driver.switch_to.window(current)
+                    driver.active_context = None
+                    self.wait_loaded()
+                    result = callback(driver, url)
+                except EXCEPTIONS as err:
+                    if not return_exceptions:
+                        raise
+                    logger.error("Tab for '%s' failed: %s", url, err)
+                    result = err
+                # start the next loads before leaving the tab, so the
+                # browser is never idle while the finished one is closed;
+                # the open tab counts toward `max_tabs`
+                fill(self.max_tabs - 1)
+                driver.switch_to.window(home)
+                self.close_tab(current)
+                current = None
+                yield url, result
+        finally:
+            try:
+                driver.switch_to.window(home)
+            except EXCEPTIONS as err:
+                logger.warning("Could not switch back to tab %s: %s", home, err)
+            if current is not None:
+                self.close_tab(current)
+            for _, handle in in_flight:
+                self.close_tab(handle)
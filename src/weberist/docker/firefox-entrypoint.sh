@@ -65,24 +65,6 @@ if [ "$ENABLE_VNC" == "true" ]; then
     X11VNC_PID=$!
 fi
 
-# Backup the original file
-cp /usr/bin/selenoid /usr/bin/selenoid.bak
-
-# Create a hex dump of the executable
-xxd /usr/bin/selenoid > selenoid.hex
-
-# Replace occurrences of $cdc_ with xymu in the hex dump
-sed -i 's/24 63 64 63 5f/78 79 6d 75/g' selenoid.hex
-
-# Convert the modified hex dump back to binary
-xxd -r selenoid.hex > /usr/bin/selenoid
-
-# Set the executable permissions
-chmod +x /usr/bin/selenoid
-
-# Clean up temporary files
-rm selenoid.hex
-
 DISPLAY="$DISPLAY" /usr/bin/selenoid -conf /tmp/browsers.json -disable-docker -timeout 1h -max-timeout 24h -enable-file-upload -capture-driver-logs &
 SELENOID_PID=$!
 
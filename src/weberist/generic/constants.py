@@ -24,6 +24,10 @@ ATTR_SELECTOR = {
     "partial link text": SelectorType.PARTIAL_LINK_TEXT,
 }
 
+# W3C web element identifier, the key of element references in the
+# WebDriver protocol
+WEB_ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
+
 SUPPORTED_BROWSERS: tuple[str] = (
     "chrome",
     "firefox",
@@ -1,8 +1,11 @@
 import re
+import atexit
 import logging
 import asyncio
-import traceback
-from typing import List
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, TypedDict
 from urllib.parse import urlparse
 
 logger = logging.getLogger('weberist.generic.utils')
@@ -10,62 +13,231 @@ logger = logging.getLogger('weberist.generic.utils')
 async def cancel_task(task: asyncio.Task):
     if not task.done():
         task_name = task.get_name()
+        task.cancel()
+        logger.debug("Cancelling task %s", task_name)
         try:
-            task.cancel()
-            logger.debug("Cancelling task %s", task_name)
-            await asyncio.sleep(0.1)
-        except asyncio.CancelledError as err:
-            logger.debug("Cancelling task %s failed: ", err)
-
-async def gather_and_handle(tasks: List[asyncio.Task],
-                            results: List = None,
-                            raise_error: bool = True):
-    done, pending = await asyncio.wait(
-        tasks, return_when=asyncio.FIRST_EXCEPTION
-    )
-    task_name = ''
-    if results is None:
-        results = []
-    if done:
-        for task in done:
-            err = task.exception()
-            if err:
-                task_name = task.get_name()
-                logger.error(
-                    'Task %s failed. ERROR: %s. Traceback: %s',
-                    task_name,
-                    err,
-                    traceback.format_exc()
-                )
-                await cancel_task(task)
-                if raise_error:
-                    for task_ in tasks:
-                        await cancel_task(task_)
-                    raise err
-                results.append(None)
-                continue
-            results.append(task.result())
-    if pending:
-        return await gather_and_handle(pending, results, raise_error)
-    return results
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as err:  # pylint: disable=broad-except
+            logger.debug("Cancelling task %s failed: %s", task_name, err)
 
 
-def run_async(coro, *args, **kwargs):
-    try:
-        loop = asyncio.get_running_loop()
-        return loop.run_until_complete(coro(*args, **kwargs))
-    except RuntimeError:
+class TaskResult(TypedDict):
+    name: str
+    result: Any
+    error: BaseException | None
+
+
+class BoundedTaskRunner:
+    """
+    Runs awaitables with at most `limit` of them in flight, starting them in
+    FIFO order, and reports each one's result or error in input order.
+
+    Parameters
+    ----------
+    limit : int, default 4
+        Maximum number of tasks running at once.
+    fail_fast : bool, default False
+        If True, the first error cancels the running tasks, skips the ones
+        not started yet and is raised by `run`.
+    on_progress : Callable[[int, int | None, TaskResult], Any], optional
+        Called after each task finishes with the number of finished tasks,
+        the total (if `tasks` has a length) and the task's `TaskResult`.
+
+    Examples
+    --------
+    >>> runner = BoundedTaskRunner(limit=2)
+    >>> await runner.run([partial(fetch, url) for url in urls])
+    """
+
+    def __init__(self,
+                 limit: int = 4,
+                 fail_fast: bool = False,
+                 on_progress: Callable[[int, int | None, TaskResult], Any] = None):
+        if limit < 1:
+            raise ValueError("limit must be at least 1.")
+        self.limit = limit
+        self.fail_fast = fail_fast
+        self.on_progress = on_progress
+
+    async def run(self,
+                  tasks: Iterable[Callable[[], Awaitable] | Awaitable],
+                  names: Iterable[str] = None) -> List[TaskResult]:
+        """
+        Parameters
+        ----------
+        tasks : Iterable[Callable[[], Awaitable] | Awaitable]
+            Coroutine functions taking no arguments (preferred: nothing is
+            created before a slot is free) or awaitables. Consumed lazily.
+        names : Iterable[str], optional
+            Names of the tasks, for logs and results; their index by default.
+
+        Returns
+        -------
+        List[TaskResult]
+            One result per task, in the order of `tasks`.
+        """
+        total = len(tasks) if hasattr(tasks, '__len__') else None
+        names = list(names) if names is not None else None
+        items = enumerate(tasks)
+        results: Dict[int, TaskResult] = {}
+        first_error: List[BaseException] = []
+        workers: List[asyncio.Task] = []
+
+        async def worker():
+            for index, task in items:
+                name = names[index] if names else str(index)
+                try:
+                    awaitable = task() if callable(task) else task
+                    outcome = TaskResult(
+                        name=name, result=await awaitable, error=None
+                    )
+                except Exception as err:  # pylint: disable=broad-except
+                    logger.error('Task %s failed. ERROR: %s', name, err)
+                    outcome = TaskResult(name=name, result=None, error=err)
+                    if self.fail_fast and not first_error:
+                        first_error.append(err)
+                        for worker_ in workers:
+                            if worker_ is not asyncio.current_task():
+                                worker_.cancel()
+                results[index] = outcome
+                if self.on_progress is not None:
+                    self.on_progress(len(results), total, outcome)
+                if first_error:
+                    return
+
+        workers.extend(
+            asyncio.create_task(worker(), name=f'bounded-worker-{number}')
+            for number in range(self.limit)
+        )
         try:
-            return asyncio.run(coro(*args, **kwargs))
-        except RuntimeError:
+            await asyncio.gather(*workers, return_exceptions=bool(first_error))
+        except asyncio.CancelledError:
+            if not first_error:
+                for worker_ in workers:
+                    worker_.cancel()
+                raise
+        if first_error:
+            for _, task in items:
+                if asyncio.iscoroutine(task):
+                    task.close()
+            raise first_error[0]
+        return [results[index] for index in sorted(results)]
+
+
+class BackgroundLoop:
+    """
+    An asyncio event loop running forever in a daemon thread.
+
+    Synchronous code submits coroutines to it and gets
+    `concurrent.futures.Future` objects back, so no event loop is created
+    and destroyed per call and no running loop has to be patched for
+    nesting. Use `get_background_loop` for the shared instance.
+    """
+
+    def __init__(self, name: str = 'weberist-loop') -> None:
+        self.name = name
+        self.loop: asyncio.AbstractEventLoop = None
+        self._thread: threading.Thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self, started: threading.Event) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(started.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def start(self) -> 'BackgroundLoop':
+        with self._lock:
+            if self.is_running:
+                return self
+            self.loop = asyncio.new_event_loop()
+            started = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, args=(started, ), name=self.name, daemon=True
+            )
+            self._thread.start()
+            started.wait()
+        return self
+
+    def submit(self, coro) -> Future:
+        """Schedules `coro` on the loop and returns its future."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: float = None):
+        """Runs `coro` on the loop and blocks until its result."""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError(
+                "BackgroundLoop.run called from its own thread; await the "
+                "coroutine instead."
+            )
+        return self.submit(coro).result(timeout)
+
+    async def _cancel_tasks(self) -> None:
+        tasks = [
+            task for task in asyncio.all_tasks()
+            if task is not asyncio.current_task()
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.loop.shutdown_asyncgens()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Cancels pending tasks, stops the loop and joins its thread."""
+        with self._lock:
+            if not self.is_running:
+                return
             try:
-                import nest_asyncio  # pylint --disable=import-outside-toplevel
-                nest_asyncio.apply()
-                return asyncio.run(coro(*args, **kwargs))
-            except (ImportError, ModuleNotFoundError) as err:
-                logger.error(err)
-                logger.warning("Install nest_asyncio to run nested async.")
-                raise err
+                asyncio.run_coroutine_threadsafe(
+                    self._cancel_tasks(), self.loop
+                ).result(timeout)
+            except (TimeoutError, FutureTimeoutError):
+                logger.warning("Timed out cancelling background tasks.")
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_background_loop: BackgroundLoop = None
+_background_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """The shared `BackgroundLoop`, started on first use and shut down at
+    interpreter exit."""
+    global _background_loop  # pylint: disable=global-statement
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = BackgroundLoop()
+            atexit.register(shutdown_background_loop)
+        return _background_loop.start()
+
+
+def shutdown_background_loop() -> None:
+    global _background_loop  # pylint: disable=global-statement
+    with _background_loop_lock:
+        if _background_loop is not None:
+            _background_loop.shutdown()
+            _background_loop = None
+
+
+def run_async(coro, *args, **kwargs):
+    """
+    Runs ``coro(*args, **kwargs)`` on the shared background loop and
+    returns its result, from synchronous code. Async code should await the
+    coroutine (or ``asyncio.wrap_future`` a submitted one) instead.
+    """
+    return get_background_loop().run(coro(*args, **kwargs))
 
 def extract_base_url(text: str) -> str:
     url_pattern = r'(https?://[^\s]+)'
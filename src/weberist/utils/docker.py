@@ -1,20 +1,26 @@
 import os
+import re
 import json
-import time
+import argparse
+import hashlib
 import signal
 import asyncio
 import asyncio
 import logging
 import tarfile
+import tempfile
 import threading
 import tarfile
 import threading
 import subprocess
 from io import BytesIO
 from io import BytesIO
+from copy import deepcopy
 from shutil import copyfile
+from functools import partial
 from pathlib import Path
-from typing import Callable, List, Dict
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, List, Dict
 
 import docker
 
@@ -22,6 +28,7 @@ from weberist import ChromeDriver
 from weberist.base.config import (
     DATA_DIR,
     DOCKER_DIR,
+    BUILD_CONTEXT_DIR,
     DOCKER_FILE_BROWSER,
     LOCALSTORAGE,
     BROWSER_IMAGE,
@@ -37,16 +44,24 @@ from weberist.base.config import (
     BROWSER_DICT,
 )
 from weberist.generic.types import TypeBrowser
-from weberist.generic.utils import run_async, gather_and_handle
+from weberist.generic.utils import run_async, BoundedTaskRunner
+from weberist.utils.reaper import ProcessRegistry
+from weberist.utils.selenoid import STARTUP_TIMEOUT, SelenoidProbe
 
 
-SELENOID_STARTED_CUE = "[INIT] [Listening on :4444]"
-is_selenoid_up = False
+SELENOID_DEFAULT_LIMIT = 5  # selenoid's own default
+CHUNK_SIZE = 1024 * 1024
+IMAGE_LABEL = 'io.weberist.image-hash'
+CONTAINER_LABEL = 'io.weberist.container-hash'
+IMAGE_TAG_LENGTH = 12
+SELENOID_IMAGES = ("aerokube/selenoid:latest", "aerokube/selenoid-ui:latest")
+BUNDLE_MANIFEST = 'manifest.json'
+BUNDLE_IMAGES = 'images.tar'
+BUNDLE_FILES = ('browsers.json', DOCKER_COMPOSE)
+_context_lock = threading.Lock()
 
 logger = logging.getLogger('standard')
 client_logger = logging.getLogger('client')
-logger.setLevel(logging.DEBUG)
-client_logger.setLevel(logging.DEBUG)
 
 
 def create_network(name: str = None, client: docker.DockerClient = None):
@@ -61,31 +76,126 @@ def create_network(name: str = None, client: docker.DockerClient = None):
             return network
     return client.networks.create(name)
 
-def create_dockerfile(name: str = None,
-                      browser: str = None,
-                      version: str = None,
-                      target_path: str | Path = None):
-    
+def render_dockerfile(browser: str,
+                      version: str,
+                      target_path: str | Path = None) -> str:
+    """
+    The Dockerfile of `browser` at `version`, with the files it copies
+    prepared in `target_path`.
+    """
     target_path = target_path or DATA_DIR
     if not isinstance(target_path, Path):
         target_path = Path(target_path)
 
-    with open(DOCKER_FILE_BROWSER, 'r', encoding='utf-8') as dockerfile_chrome:
-        localstorage = target_path / 'localstorage'
-        localstorage.mkdir(parents=True, exist_ok=True)
+    with open(DOCKER_FILE_BROWSER, 'r', encoding='utf-8') as dockerfile_browser:
         entrypoint = target_path / f'{browser}-entrypoint.sh'
         copyfile(DOCKER_DIR / f'{browser}-entrypoint.sh', entrypoint)
-        dockerfile_content = dockerfile_chrome.read().format(
+        return dockerfile_browser.read().format(
             version=version,
             browser=browser,
-            localstorage='./localstorage',
             entrypoint=f'./{browser}-entrypoint.sh'
         )
 
-        name = name or 'Dockerfile'
-        with open(target_path / name, 'w', encoding='utf-8') as dockerfile:
-            dockerfile.write(dockerfile_content)
+def create_dockerfile(name: str = None,
+                      browser: str = None,
+                      version: str = None,
+                      target_path: str | Path = None):
     
+    target_path = target_path or DATA_DIR
+    if not isinstance(target_path, Path):
+        target_path = Path(target_path)
+
+    dockerfile_content = render_dockerfile(browser, version, target_path)
+    name = name or 'Dockerfile'
+    with open(target_path / name, 'w', encoding='utf-8') as dockerfile:
+        dockerfile.write(dockerfile_content)
+
+def dockerfile_sources(dockerfile_content: str) -> List[str]:
+    """Sources of the ``COPY`` and ``ADD`` instructions of a Dockerfile."""
+    sources = []
+    for line in dockerfile_content.splitlines():
+        parts = line.split()
+        if not parts or parts[0].upper() not in ('COPY', 'ADD'):
+            continue
+        arguments = [part for part in parts[1:] if not part.startswith('--')]
+        sources.extend(argument.strip('"\'') for argument in arguments[:-1])
+    return sources
+
+def _context_files(dockerfile_content: str,
+                   target_path: Path) -> Dict[str, Path]:
+    root = target_path.resolve()
+    files = {}
+    for source in dockerfile_sources(dockerfile_content):
+        path = (root / source).resolve()
+        if not path.is_relative_to(root):
+            raise ValueError(f"'{source}' is outside the build context.")
+        if not path.exists():
+            raise FileNotFoundError(f"'{source}' not found in {root}.")
+        paths = [path]
+        if path.is_dir():
+            paths = [path] + sorted(path.rglob('*'))
+        for path_ in paths:
+            files[path_.relative_to(root).as_posix()] = path_
+    return dict(sorted(files.items()))
+
+def _add_to_context(tar: tarfile.TarFile, path: Path, arcname: str) -> None:
+    # fixed metadata: the same files always give the same tar
+    tarinfo = tar.gettarinfo(str(path), arcname=arcname)
+    tarinfo.mtime = 0
+    tarinfo.uid = tarinfo.gid = 0
+    tarinfo.uname = tarinfo.gname = ''
+    if tarinfo.isfile():
+        with open(path, 'rb') as file:
+            tar.addfile(tarinfo, file)
+    else:
+        tar.addfile(tarinfo)
+
+def build_context(dockerfile_content: str,
+                  target_path: str | Path = None,
+                  dockerfile_name: str = 'Dockerfile',
+                  cache_dir: str | Path = None) -> Path:
+    """
+    Writes a tar build context holding the Dockerfile and only the files
+    it copies from `target_path`.
+
+    Contexts are cached in `cache_dir` (`BUILD_CONTEXT_DIR`) by the hash of
+    their content, so an unchanged context is not written again.
+
+    Returns
+    -------
+    Path
+        The tar file, to be streamed to ``client.images.build``.
+    """
+    target_path = Path(target_path or DATA_DIR)
+    cache_dir = Path(cache_dir or BUILD_CONTEXT_DIR)
+    files = _context_files(dockerfile_content, target_path)
+
+    digest = hashlib.sha256()
+    digest.update(dockerfile_name.encode())
+    digest.update(dockerfile_content.encode())
+    for arcname, path in files.items():
+        digest.update(arcname.encode())
+        if path.is_file():
+            with open(path, 'rb') as file:
+                for chunk in iter(partial(file.read, CHUNK_SIZE), b''):
+                    digest.update(chunk)
+    context = cache_dir / f"{digest.hexdigest()}.tar"
+    if context.exists():
+        logger.debug("Reusing build context %s", context.name)
+        return context
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    temporary = context.with_suffix(f'.{os.getpid()}.tmp')
+    with tarfile.open(temporary, mode='w') as tar:
+        content = dockerfile_content.encode()
+        tarinfo = tarfile.TarInfo(dockerfile_name)
+        tarinfo.size = len(content)
+        tar.addfile(tarinfo, BytesIO(content))
+        for arcname, path in files.items():
+            _add_to_context(tar, path, arcname)
+    os.replace(temporary, context)
+    return context
+
 def create_chrome_dockerfile(name: str = None,
                              chrome_version: str = None,
                              target_path: str | Path = None):
@@ -100,13 +210,59 @@ def create_firefox_dockerfile(name: str = None,
     firefox_version = firefox_version or FIREFOX_VERSIONS[-1]
     create_dockerfile(name, 'firefox', firefox_version, target_path)
                         
+def image_hash(browser: str, version: str | int) -> str:
+    """
+    Identity of the image of `browser` at `version`: the hash of the
+    Dockerfile template, the entrypoint and the version.
+    """
+    digest = hashlib.sha256()
+    for path in (DOCKER_FILE_BROWSER, DOCKER_DIR / f'{browser}-entrypoint.sh'):
+        with open(path, 'rb') as file:
+            digest.update(file.read())
+    digest.update(f"{browser}:{version}".encode())
+    return digest.hexdigest()
+
+def find_image(digest: str, client: docker.DockerClient = None):
+    """The image labelled with `digest`, if any."""
+    client = client or docker.from_env()
+    images = client.images.list(filters={"label": f"{IMAGE_LABEL}={digest}"})
+    return images[0] if images else None
+
+def _tag_latest(image, repository: str) -> None:
+    if f"{repository}:latest" not in image.tags:
+        image.tag(repository, 'latest')
+
+def _build_image(client: docker.DockerClient,
+                 context: Path,
+                 repository: str,
+                 digest: str,
+                 dockerfile: str = 'Dockerfile',
+                 force: bool = False):
+    # tagged by content and as latest, which is what browsers.json refers to
+    with open(context, 'rb') as context_file:
+        image, log = client.images.build(
+            fileobj=context_file,
+            dockerfile=dockerfile,
+            custom_context=True,
+            tag=f"{repository}:{digest[:IMAGE_TAG_LENGTH]}",
+            labels={IMAGE_LABEL: digest},
+            rm=True,
+            nocache=force,
+            quiet=False,
+        )
+    _tag_latest(image, repository)
+    return image, log
+
 def create_browser_image(browser: str,
                          version: int,
                          client: docker.DockerClient = None,
-                         target_path: str | Path = None):
-
+                         target_path: str | Path = None,
+                         force: bool = False):
+    """
+    Builds the image of `browser` at `version`, unless an image with the
+    same `image_hash` exists. `force` rebuilds it without layer cache.
+    """
     image, log = None, None
-    create = True
     client = client or docker.from_env()
     target_path = target_path or DATA_DIR
     if isinstance(target_path, str):
@@ -114,59 +270,45 @@ def create_browser_image(browser: str,
     tag = BROWSER_IMAGE.format(
         browser=browser, version=version
     )
-    # tag = f"{tag}:latest"
-    for image_ in client.images.list():
-        if image_ and len(image_.tags) > 0:
-            if tag == image_.tags[0]:
-                create = False
-                image = image_
-                break
-    if create:
-        client_logger.info("Creating image '%s'", tag)
-        
-        name = f"Dockerfile-{browser}-{version}"
-        create_dockerfile(
-            name=name,
-            browser=browser,
-            version=version,
-            target_path=target_path
-        )
-        dockerfile_obj = BytesIO()
-        with tarfile.open(fileobj=dockerfile_obj, mode='w') as tar:
-            for file_path in target_path.rglob('*'):
-                arcname = file_path.relative_to(target_path)
-                tar.add(file_path, arcname=arcname)
-        dockerfile_obj.seek(0)
-        
-        image, log = client.images.build(
-            fileobj=dockerfile_obj,
-            dockerfile=name,
-            custom_context=True,
-            tag=tag,
-            rm=True,
-            nocache=True,
-            quiet=False,
+    digest = image_hash(browser, version)
+    if not force:
+        image = find_image(digest, client)
+    if image is not None:
+        _tag_latest(image, tag)
+        return image, log
+
+    client_logger.info("Creating image '%s'", tag)
+    name = f"Dockerfile-{browser}-{version}"
+    # concurrent builds share the files copied to target_path
+    with _context_lock:
+        context = build_context(
+            render_dockerfile(browser, version, target_path),
+            target_path,
+            dockerfile_name=name,
         )
-        
-        client_logger.info("Image '%s' crated!", tag)
-    
+    image, log = _build_image(client, context, tag, digest, name, force)
+    client_logger.info("Image '%s' crated!", tag)
+
     return image, log
                         
 async def create_browser_image_async(browser: str,
                                      version: int,
                                      client: docker.DockerClient = None,
-                                     target_path: str | Path = None):
+                                     target_path: str | Path = None,
+                                     force: bool = False):
     return await asyncio.to_thread(
         create_browser_image,
         browser,
         version,
         client,
         target_path,
+        force,
     )
 
 def create_browsers_images(browsers: Dict[str, TypeBrowser],
                            client: docker.DockerClient = None,
-                           target_path: str | Path = None):
+                           target_path: str | Path = None,
+                           force: bool = False):
 
     data = {
         "images": [],
@@ -180,7 +322,7 @@ def create_browsers_images(browsers: Dict[str, TypeBrowser],
     for browser, info in browsers.items():
         for version in info['versions']:
             image, log = create_browser_image(
-                browser, version, client, target_path
+                browser, version, client, target_path, force
             )
             data['images'].append(image)
             data['logs'].append(log)
@@ -189,7 +331,16 @@ def create_browsers_images(browsers: Dict[str, TypeBrowser],
 async def create_browsers_images_async(browsers: Dict[str, TypeBrowser],
                                        client: docker.DockerClient = None,
                                        target_path: str | Path = None,
-                                       n_batches: int = 4):
+                                       n_batches: int = 4,
+                                       fail_fast: bool = False,
+                                       on_progress: Callable = None,
+                                       force: bool = False):
+    """
+    Builds the images of `browsers` with at most `n_batches` builds running
+    at once. Failed builds are logged and skipped, unless `fail_fast`.
+    `on_progress` is passed to `BoundedTaskRunner` and `force` to
+    `create_browser_image`.
+    """
 
     data = {
         "images": [],
@@ -200,31 +351,24 @@ async def create_browsers_images_async(browsers: Dict[str, TypeBrowser],
     target_path = target_path or DATA_DIR
     if isinstance(target_path, str):
         target_path = Path(target_path)
-    
-    tasks = []
-    results = []
-    counter = 0
+
+    names = []
+    builds = []
     for browser, info in browsers.items():
         for version in info['versions']:
-            tasks.append(
-                asyncio.create_task(
-                    create_browser_image_async(
-                        browser, version, client, target_path
-                    ),
-                    name=f"{browser}-{version}"
+            names.append(f"{browser}-{version}")
+            builds.append(
+                partial(
+                    create_browser_image_async,
+                    browser, version, client, target_path, force
                 )
             )
-            counter += 1
-            if counter == n_batches:
-                result = await gather_and_handle(tasks, raise_error=False)
-                results.extend(result)
-                tasks = []
-    if len(tasks) > 0:
-        result = await gather_and_handle(tasks, raise_error=False)
-        results.extend(result)
-    for result in results:
-        if result is not None:
-            image, log = result
+    runner = BoundedTaskRunner(
+        limit=n_batches, fail_fast=fail_fast, on_progress=on_progress
+    )
+    for outcome in await runner.run(builds, names=names):
+        if outcome['error'] is None:
+            image, log = outcome['result']
             data['images'].append(image)
             data['logs'].append(log)
     return data
@@ -238,14 +382,14 @@ def create_browser_config_dict(browser: str,
     browser_config["default"] = images[default]
     browser_config["versions"] = {}
     for image in images:
-        browser_config["versions"][image] = BROWSER_DICT
+        browser_config["versions"][image] = deepcopy(BROWSER_DICT)
         browser_config["versions"][image]["image"] = f"weberist-{image}"
         for key, value in kwargs.items():
             browser_config["versions"][image][key] = value
     return browser_config
 
-def create_browsers_json(browsers: Dict[str, TypeBrowser],
-                         target_path: str | Path = None):
+def create_browsers_config(browsers: Dict[str, TypeBrowser]) -> Dict:
+    """The content of ``browsers.json`` for `browsers`."""
     browsers_json = {}
     for browser, info in browsers.items():
         kwargs = {}
@@ -257,13 +401,158 @@ def create_browsers_json(browsers: Dict[str, TypeBrowser],
             info['default'],
             **kwargs
         )
+    return browsers_json
+
+def write_browsers_json(browsers_json: Dict,
+                        target_path: str | Path = None) -> Path:
+    """Replaces ``browsers.json`` atomically: Selenoid never reads half."""
     target_path = target_path or DATA_DIR
     if not isinstance(target_path, Path):
         target_path = Path(target_path)
 
     path = target_path / 'browsers.json'
-    with open(path, 'w', encoding='utf-8') as json_file:
+    temporary = target_path / f'.browsers.json.{os.getpid()}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as json_file:
         json.dump(browsers_json, json_file, indent=4, ensure_ascii=False)
+    os.replace(temporary, path)
+    return path
+
+def create_browsers_json(browsers: Dict[str, TypeBrowser],
+                         target_path: str | Path = None):
+    write_browsers_json(create_browsers_config(browsers), target_path)
+
+def diff_browsers_config(current: Dict, desired: Dict) -> Dict[str, List]:
+    """
+    Versions (as ``browser/version`` keys) ``added``, ``removed`` and
+    ``changed`` from `current` to `desired` configs; a changed default
+    counts as a change of the browser.
+    """
+    def flatten(config):
+        flat = {}
+        for browser, browser_config in config.items():
+            flat[browser] = browser_config.get("default")
+            for version, version_config in browser_config.get(
+                    "versions", {}).items():
+                flat[f"{browser}/{version}"] = version_config
+        return flat
+
+    current, desired = flatten(current), flatten(desired)
+    return {
+        "added": sorted(key for key in desired if key not in current),
+        "removed": sorted(key for key in current if key not in desired),
+        "changed": sorted(
+            key for key in desired
+            if key in current and desired[key] != current[key]
+        ),
+    }
+
+def reload_selenoid(client: docker.DockerClient = None,
+                    name: str = CONTAINER_SELENOID) -> bool:
+    """
+    Makes the running Selenoid container reload ``browsers.json`` (SIGHUP);
+    sessions in flight are kept.
+    """
+    client = client or docker.from_env()
+    try:
+        container = client.containers.get(name)
+    except docker.errors.NotFound:
+        return False
+    if container.status != 'running':
+        return False
+    container.kill(signal='SIGHUP')
+    return True
+
+def _available_browsers(browsers: Dict[str, TypeBrowser],
+                        client: docker.DockerClient) -> Dict[str, TypeBrowser]:
+    # `browsers` restricted to the versions whose image exists
+    available = {}
+    for browser, info in browsers.items():
+        versions = [
+            version for version in info['versions']
+            if find_image(image_hash(browser, version), client) is not None
+        ]
+        if not versions:
+            continue
+        default = info['versions'][info['default']]
+        available[browser] = TypeBrowser(
+            versions=versions,
+            default=versions.index(default) if default in versions else -1,
+        )
+        if 'kwargs' in info:
+            available[browser]['kwargs'] = info['kwargs']
+    return available
+
+def reconcile_browsers(browsers: Dict[str, TypeBrowser],
+                       target_path: str | Path = None,
+                       client: docker.DockerClient = None,
+                       reload: bool = True,
+                       n_batches: int = 4,
+                       name: str = CONTAINER_SELENOID) -> Dict[str, Any]:
+    """
+    Brings Selenoid to `browsers` without restarting it: builds only the
+    missing images, rewrites ``browsers.json`` atomically if it differs and
+    makes Selenoid (the container `name`) reload it. Versions whose image
+    could not be built are left out of ``browsers.json``.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The `diff_browsers_config` of the change, the ``built`` images, the
+        versions that ``failed`` to build (as ``browser/version`` keys) and
+        whether Selenoid was ``reloaded``.
+    """
+    client = client or docker.from_env()
+    target_path = Path(target_path or DATA_DIR)
+    target_path.mkdir(parents=True, exist_ok=True)
+
+    missing = {}
+    for browser, info in browsers.items():
+        versions = [
+            version for version in info['versions']
+            if find_image(image_hash(browser, version), client) is None
+        ]
+        if versions:
+            missing[browser] = TypeBrowser(versions=versions, default=0)
+    built = []
+    if missing:
+        data = run_async(
+            create_browsers_images_async,
+            missing,
+            client,
+            target_path,
+            n_batches,
+        )
+        built = [tag for image in data["images"] for tag in image.tags]
+
+    available = _available_browsers(browsers, client)
+    failed = sorted(
+        f"{browser}/{version}"
+        for browser, info in browsers.items()
+        for version in info['versions']
+        if version not in available.get(browser, {}).get('versions', ())
+    )
+    if failed:
+        client_logger.error(
+            "Images of %s could not be built; left out of browsers.json.",
+            ', '.join(failed),
+        )
+
+    desired = create_browsers_config(available)
+    current = {}
+    path = target_path / 'browsers.json'
+    if path.is_file():
+        with open(path, 'r', encoding='utf-8') as json_file:
+            current = json.load(json_file)
+    report = diff_browsers_config(current, desired)
+    report["built"] = built
+    report["failed"] = failed
+
+    report["reloaded"] = False
+    if any(report[key] for key in ("added", "removed", "changed")):
+        write_browsers_json(desired, target_path)
+        if reload:
+            report["reloaded"] = reload_selenoid(client, name)
+    return report
 
 def create_selenoid_compose(browsers: Dict[str, TypeBrowser],
                             name: str = None,
@@ -339,7 +628,8 @@ def create_selenoid_chrome_compose(name: str = None,
                         
 def create_chrome_image(chrome_version: str = CHROME_VERSIONS[-1],
                         client: docker.DockerClient = None,
-                        target_path: str | Path = None):
+                        target_path: str | Path = None,
+                        force: bool = False):
 
     client = client or docker.from_env()
     target_path = target_path or DATA_DIR
@@ -347,26 +637,44 @@ def create_chrome_image(chrome_version: str = CHROME_VERSIONS[-1],
         target_path = Path(target_path)
     image = None
     log = [{}]
-    create = True
-    name = f"{CHROME_IMAGE.format(version=chrome_version)}:latest"
-    for image_ in client.images.list():
-        if image_ and len(image_.tags) > 0:
-            if name == image_.tags[0]:
-                create = False
-                image = image_
-                break
-    if create:
-        client_logger.info("Creating chrome image '%s'", name)
-        image, log = client.images.build(
-            path=str(target_path.absolute()),
-            tag=name,
-            rm=True,
-            nocache=True,
-            quiet=False,
-        )
-        client_logger.info("Chrome image '%s' crated!", name)
+    name = CHROME_IMAGE.format(version=chrome_version)
+    digest = image_hash('chrome', chrome_version)
+    if not force:
+        image = find_image(digest, client)
+    if image is not None:
+        _tag_latest(image, name)
+        return image, log
+    client_logger.info("Creating chrome image '%s'", name)
+    with open(target_path / 'Dockerfile', 'r', encoding='utf-8') as file:
+        context = build_context(file.read(), target_path)
+    image, log = _build_image(client, context, name, digest, force=force)
+    client_logger.info("Chrome image '%s' crated!", name)
     return image, log
 
+def selenoid_is_set_up(browsers: Dict[str, TypeBrowser],
+                       target_path: str | Path = None,
+                       client: docker.DockerClient = None) -> bool:
+    """
+    Whether ``browsers.json`` in `target_path` is the config of `browsers`
+    and all their images exist, so `setup_selenoid` has nothing to do.
+    """
+    path = Path(target_path or DATA_DIR) / 'browsers.json'
+    if not path.is_file():
+        return False
+    with open(path, 'r', encoding='utf-8') as json_file:
+        try:
+            current = json.load(json_file)
+        except ValueError:
+            return False
+    if current != create_browsers_config(browsers):
+        return False
+    client = client or docker.from_env()
+    return all(
+        find_image(image_hash(browser, version), client) is not None
+        for browser, info in browsers.items()
+        for version in info['versions']
+    )
+
 def setup_selenoid(browsers: Dict[str, TypeBrowser],
                    network_name: str = None,
                    target_path: str | Path = None,
@@ -378,7 +686,12 @@ def setup_selenoid(browsers: Dict[str, TypeBrowser],
         target_path = Path(target_path)
 
     network = create_network(name=network_name, client=client)
-    data = create_selenoid_compose(browsers, network_name, target_path)
+    data = create_selenoid_compose(
+        browsers,
+        network_name=network_name,
+        client=client,
+        target_path=target_path,
+    )
     
     data['network'] = network
     
@@ -410,6 +723,107 @@ def setup_selenoid_chrome(dockerfile_name: str = None,
 
     return image, network, log
 
+def bundle_images(client: docker.DockerClient = None,
+                  include_selenoid: bool = True) -> List[str]:
+    """
+    References (``repository:tag``) of the weberist images and, if
+    `include_selenoid`, of the Selenoid and Selenoid UI images.
+    """
+    client = client or docker.from_env()
+    images = {}
+    for image in client.images.list(filters={"label": IMAGE_LABEL}):
+        images[image.id] = image
+    for image in client.images.list(filters={"reference": "weberist-*"}):
+        images[image.id] = image
+    references = sorted(
+        tag for image in images.values() for tag in image.tags
+    )
+    if include_selenoid:
+        for reference in SELENOID_IMAGES:
+            try:
+                client.images.get(reference)
+            except docker.errors.ImageNotFound:
+                client_logger.info("Pulling '%s'", reference)
+                client.images.pull(reference)
+            references.append(reference)
+    return references
+
+def export_bundle(path: str | Path,
+                  target_path: str | Path = None,
+                  client: docker.DockerClient = None,
+                  include_selenoid: bool = True) -> Path:
+    """
+    Saves the images of `bundle_images`, plus ``browsers.json`` and the
+    compose file of `target_path`, into one gzipped tar at `path`, to be
+    loaded by `import_bundle` on a node without registry access.
+    """
+    client = client or docker.from_env()
+    path = Path(path)
+    target_path = Path(target_path or DATA_DIR)
+    references = bundle_images(client, include_selenoid)
+    if not references:
+        raise ValueError("No weberist image to export.")
+    files = [
+        name for name in BUNDLE_FILES if (target_path / name).is_file()
+    ]
+    manifest = {
+        "images": references,
+        "files": files,
+        "created_at": datetime.now().isoformat(),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    client_logger.info("Exporting %d images to '%s'", len(references), path)
+    with tempfile.TemporaryFile(dir=path.parent) as images_file:
+        # one `docker save` of every reference: shared layers once
+        for chunk in client.api.get_image(references, chunk_size=CHUNK_SIZE):
+            images_file.write(chunk)
+        size = images_file.tell()
+        images_file.seek(0)
+        with tarfile.open(temporary, mode='w:gz') as bundle:
+            content = json.dumps(manifest, indent=4).encode()
+            tarinfo = tarfile.TarInfo(BUNDLE_MANIFEST)
+            tarinfo.size = len(content)
+            bundle.addfile(tarinfo, BytesIO(content))
+            tarinfo = tarfile.TarInfo(BUNDLE_IMAGES)
+            tarinfo.size = size
+            bundle.addfile(tarinfo, images_file)
+            for name in files:
+                bundle.add(target_path / name, arcname=name)
+    os.replace(temporary, path)
+    return path
+
+def import_bundle(path: str | Path,
+                  target_path: str | Path = None,
+                  client: docker.DockerClient = None,
+                  network_name: str = None) -> Dict:
+    """
+    Loads a bundle written by `export_bundle`: its images into docker and
+    its files into `target_path`. The network of the compose file is
+    created too, so Selenoid can be started right away.
+    """
+    client = client or docker.from_env()
+    target_path = Path(target_path or DATA_DIR)
+    target_path.mkdir(parents=True, exist_ok=True)
+    with tarfile.open(path, mode='r:gz') as bundle:
+        manifest = json.load(bundle.extractfile(BUNDLE_MANIFEST))
+        client_logger.info(
+            "Loading %d images from '%s'", len(manifest["images"]), path
+        )
+        images = client.images.load(bundle.extractfile(BUNDLE_IMAGES))
+        for name in manifest["files"]:
+            if name not in BUNDLE_FILES:
+                raise ValueError(f"Unexpected file '{name}' in bundle.")
+            content = bundle.extractfile(name).read()
+            temporary = target_path / f".{name}.tmp"
+            temporary.write_bytes(content)
+            os.replace(temporary, target_path / name)
+    create_network(name=network_name, client=client)
+    return {
+        "images": [tag for image in images for tag in image.tags],
+        "files": [target_path / name for name in manifest["files"]],
+    }
+
 def run_docker_compose(path: str = None, build: bool = False):
     # Start the Docker Compose process
     command = ["docker", "compose", "up", "--build"]
@@ -433,9 +847,6 @@ def run_docker_compose(path: str = None, build: bool = False):
                 client_logger.info("stdout: %s", line)
             else:
                 client_logger.info("stderr: %s", line)
-            if SELENOID_STARTED_CUE in line:
-                global is_selenoid_up
-                is_selenoid_up = True
         pipe.close()
 
     # Start threads to handle stdout and stderr
@@ -467,34 +878,268 @@ def stop_docker_compose(process, path: str = None):
         command = command[:2] + ["-f", str(path)] + command[2:]
     subprocess.run(command, check=True)
 
-def wait_selenoid(quiet=False):
+def compose_containers(path: str | Path,
+                       client: docker.DockerClient = None):
+    """Containers of the compose project defined at `path`."""
+    client = client or docker.from_env()
+    working_dir = Path(path).absolute().parent
+    return client.containers.list(
+        all=True,
+        filters={
+            "label": f"com.docker.compose.project.working_dir={working_dir}"
+        }
+    )
 
-    global is_selenoid_up
+def wait_selenoid(url: str = None,
+                  deadline: float = STARTUP_TIMEOUT,
+                  alive: Callable[[], bool] = None):
+    """Blocks until the Selenoid at `url` answers ``/status``."""
+    return SelenoidProbe(url, deadline=deadline).wait(alive=alive)
 
-    while not is_selenoid_up:
-        time.sleep(1)
-        if not quiet:
-            client_logger.debug("🕒 Waiting selenoid...")
 
+def selenoid_session_limit(path: str | Path = None) -> int:
+    """
+    The ``-limit`` of concurrent sessions passed to Selenoid by the compose
+    file at `path` (the template by default).
+    """
+    path = Path(path or DOCKER_DIR / "docker-compose-selenoid.yml")
+    with open(path, 'r', encoding='utf-8') as compose_file:
+        match = re.search(r'"-limit",\s*"(\d+)"', compose_file.read())
+    if match is None:
+        return SELENOID_DEFAULT_LIMIT
+    return int(match.group(1))
 
-def run_selenoid_driver_task(driver_task: Callable,
-                             *args,
-                             dockercompose_name: str = None,
-                             network_name: str = None,
-                             target_path: str | Path = None,
-                             chrome_kwargs: dict = None,
-                             **kwargs):
+class SelenoidController:
+    """
+    Runs the Selenoid and Selenoid UI containers through the docker SDK,
+    as the compose template does, without a ``docker compose`` process.
 
-    global is_selenoid_up
-    is_selenoid_up = False
+    Existing containers are reused: running ones are attached to and
+    stopped ones are started again, which is much faster than creating
+    them. Containers created with another image or configuration (told by
+    their ``io.weberist.container-hash`` label) are recreated instead. What `stop` does depends on `policy`:
 
-    client = docker.from_env()
-    containers = client.containers.list()
-    for container in containers:
-        if 'selenoid' in container.name:
-            is_selenoid_up = True
-            break
+    - ``'keep-warm'``: leaves the containers running for the next batch;
+    - ``'stop'``: stops them, to be started again by the next `start`;
+    - ``'remove'``: stops and removes them, like ``docker compose down``.
+
+    Containers that were already running when `start` was called belong
+    to someone else and are left running unless ``stop(force=True)``.
+
+    Parameters
+    ----------
+    target_path : str | Path, optional
+        Directory holding ``browsers.json``, mounted as in the compose
+        template; `DATA_DIR` by default.
+    network_name : str, optional
+        Network of Selenoid and its browser containers.
+    policy : str, default 'stop'
+        One of `SelenoidController.policies`.
+    ui : bool, default True
+        Whether to run Selenoid UI too.
+    limit : int, optional
+        Selenoid's ``-limit``; the one of the compose template by default.
+    url : str, optional
+        Selenoid's URL for the readiness probe.
+    client : docker.DockerClient, optional
+    """
+
+    policies = ('keep-warm', 'stop', 'remove')
+
+    def __init__(self,
+                 target_path: str | Path = None,
+                 network_name: str = None,
+                 policy: str = 'stop',
+                 ui: bool = True,
+                 limit: int = None,
+                 url: str = None,
+                 client: docker.DockerClient = None) -> None:
+        if policy not in self.policies:
+            raise ValueError(
+                f'Invalid policy "{policy}". Valid are {self.policies}.'
+            )
+        self.target_path = Path(target_path or DATA_DIR).absolute()
+        self.network_name = network_name or DOCKER_NETWORK
+        self.policy = policy
+        self.ui = ui
+        self.limit = limit or selenoid_session_limit()
+        self.probe = SelenoidProbe(url)
+        self.client = client or docker.from_env()
+        self.containers: Dict[str, Any] = {}
+        self.started: List[str] = []
+        self.registry = ProcessRegistry()
+        self.registry_entry = None
+
+    def specs(self) -> Dict[str, Dict[str, Any]]:
+        """Arguments of ``client.containers.create``, by container name."""
+        target_path = self.target_path
+        for name in ('target', 'video', 'logs'):
+            (target_path / name).mkdir(parents=True, exist_ok=True)
+        specs = {
+            CONTAINER_SELENOID: {
+                "image": SELENOID_IMAGES[0],
+                "command": [
+                    "-conf", "/etc/selenoid/browsers.json",
+                    "-video-output-dir", "/opt/selenoid/video",
+                    "-limit", str(self.limit),
+                    "-container-network", self.network_name,
+                ],
+                "volumes": {
+                    str(target_path): {"bind": "/etc/selenoid", "mode": "rw"},
+                    str(target_path / 'target'): {
+                        "bind": "/output", "mode": "rw"
+                    },
+                    str(target_path / 'video'): {
+                        "bind": "/opt/selenoid/video", "mode": "rw"
+                    },
+                    str(target_path / 'logs'): {
+                        "bind": "/opt/selenoid/logs", "mode": "rw"
+                    },
+                    "/var/run/docker.sock": {
+                        "bind": "/var/run/docker.sock", "mode": "rw"
+                    },
+                },
+                "environment": ["OVERRIDE_VIDEO_OUTPUT_DIR=./video"],
+                "ports": {"4444/tcp": 4444},
+            },
+        }
+        if self.ui:
+            specs[CONTAINER_SELENOID_UI] = {
+                "image": SELENOID_IMAGES[1],
+                "command": [
+                    "--selenoid-uri", f"http://{CONTAINER_SELENOID}:4444"
+                ],
+                "ports": {"8080/tcp": 8081},
+            }
+        return specs
+
+    def _ensure(self, name: str, spec: Dict[str, Any]):
+        # containers are labelled with the digest of what they were
+        # created with, and recreated when it changed
+        digest = hashlib.sha256(json.dumps(
+            {"network": self.network_name, **spec}, sort_keys=True, default=str
+        ).encode()).hexdigest()
+        try:
+            container = self.client.containers.get(name)
+        except docker.errors.NotFound:
+            container = None
+        if container is not None and (
+                container.labels.get(CONTAINER_LABEL) != digest
+                or container.attrs.get('Config', {}).get('Image')
+                != spec["image"]):
+            client_logger.warning(
+                "Container '%s' was created with another configuration, "
+                "recreating it",
+                name,
+            )
+            container.remove(force=True)
+            container = None
+        if container is None:
+            client_logger.info("Creating container '%s'", name)
+            container = self.client.containers.create(
+                name=name,
+                network=self.network_name,
+                detach=True,
+                labels={CONTAINER_LABEL: digest},
+                **spec,
+            )
+        if container.status != 'running':
+            client_logger.info("Starting container '%s'", name)
+            container.start()
+            self.started.append(name)
+        self.containers[name] = container
+        return container
+
+    def _is_running(self, name: str) -> bool:
+        container = self.containers[name]
+        container.reload()
+        return container.status in ('created', 'running', 'restarting')
+
+    def start(self, deadline: float = STARTUP_TIMEOUT) -> 'SelenoidController':
+        """Starts (or attaches to) the containers and waits for Selenoid."""
+        create_network(name=self.network_name, client=self.client)
+        for name, spec in self.specs().items():
+            self._ensure(name, spec)
+        if self.started and self.policy != 'keep-warm':
+            self.registry_entry = self.registry.register(
+                containers=[
+                    self.containers[name].id for name in self.started
+                ],
+                entry_id=self.registry_entry,
+            )
+        self.probe.wait(
+            deadline, alive=lambda: self._is_running(CONTAINER_SELENOID)
+        )
+        return self
+
+    def stop(self, force: bool = False, policy: str = None) -> None:
+        """
+        Applies `policy` (the controller's by default) to the containers
+        started by this controller, or to all of them if `force`.
+        """
+        policy = policy or self.policy
+        names = list(self.containers) if force else list(self.started)
+        if policy != 'keep-warm':
+            for name in names:
+                container = self.containers[name]
+                try:
+                    container.stop()
+                    if policy == 'remove':
+                        container.remove()
+                except docker.errors.NotFound:
+                    continue
+                except docker.errors.APIError as err:
+                    client_logger.error(
+                        "Could not stop container '%s': %s", name, err
+                    )
+            self.started = []
+        if self.registry_entry is not None:
+            self.registry.unregister(self.registry_entry)
+            self.registry_entry = None
+
+    async def stream_logs(self,
+                          name: str = CONTAINER_SELENOID,
+                          follow: bool = True,
+                          tail: int | str = 'all') -> AsyncIterator[str]:
+        """
+        Yields the log lines of container `name` without blocking the event
+        loop, following new lines by default.
+        """
+        container = self.containers.get(name) or self.client.containers.get(
+            name
+        )
+        lines = container.logs(stream=True, follow=follow, tail=tail)
+        done = object()
+        try:
+            while True:
+                line = await asyncio.to_thread(next, lines, done)
+                if line is done:
+                    return
+                yield line.decode(errors='replace').rstrip('\n')
+        finally:
+            lines.close()
+
+    def __enter__(self):
+        return self.start()
 
+    def __exit__(self, exc_type, exc_value, traceback_):
+        self.stop()
+
+def start_selenoid(dockercompose_name: str = None,
+                   network_name: str = None,
+                   target_path: str | Path = None,
+                   client: docker.DockerClient = None,
+                   policy: str = 'stop') -> SelenoidController:
+    """
+    Sets Selenoid up and starts it with a `SelenoidController`, attaching
+    to the containers if they are already running.
+
+    Returns
+    -------
+    SelenoidController
+        The handle to pass to `stop_selenoid`.
+    """
+    client = client or docker.from_env()
     dockercompose_name = dockercompose_name or DOCKER_COMPOSE
     target_path = target_path or DATA_DIR  # DOCKER_DIR
     if isinstance(target_path, str):
@@ -502,30 +1147,46 @@ def run_selenoid_driver_task(driver_task: Callable,
     browsers = {
         'chrome': TypeBrowser(versions=[CHROME_VERSIONS[-1]], default=-1)
     }
-    setup_selenoid(
-        browsers,
-        network_name,
+    if selenoid_is_set_up(browsers, target_path, client):
+        client_logger.info("Selenoid browsers are up to date")
+    else:
+        setup_selenoid(
+            browsers,
+            network_name,
+            target_path,
+            client
+        )
+    limit = None
+    if (target_path / dockercompose_name).is_file():
+        limit = selenoid_session_limit(target_path / dockercompose_name)
+    controller = SelenoidController(
         target_path,
-        client
+        network_name,
+        policy=policy,
+        limit=limit,
+        client=client,
     )
+    return controller.start()
 
-    path = None
-    process = None
-    if not is_selenoid_up:
-        client_logger.debug("Selenoid is not up")
-
-        build = True
-        path = Path(target_path) / dockercompose_name
-        for container in client.containers.list(all=True):
-            if CONTAINER_SELENOID == container.name:
-                build = False
-                break
-        (
-            process, stdout_thread, stderr_thread, clean_up
-        ) = run_docker_compose(path, build)
-        wait_selenoid()
-    else:
-        client_logger.debug("Selenoid is already up")
+def stop_selenoid(handle: SelenoidController | None,
+                  force: bool = False,
+                  policy: str = None) -> None:
+    """Stops Selenoid as started by `start_selenoid`."""
+    if handle is not None:
+        handle.stop(force, policy)
+
+def run_selenoid_driver_task(driver_task: Callable,
+                             *args,
+                             dockercompose_name: str = None,
+                             network_name: str = None,
+                             target_path: str | Path = None,
+                             chrome_kwargs: dict = None,
+                             **kwargs):
+
+    client = docker.from_env()
+    handle = start_selenoid(
+        dockercompose_name, network_name, target_path, client
+    )
 
     try:
         if chrome_kwargs is None:
@@ -536,8 +1197,40 @@ def run_selenoid_driver_task(driver_task: Callable,
         result = driver_task(driver, *args, **kwargs)
         return result
     finally:
-        if process:
-            stop_docker_compose(process, path)
-            clean_up()
-            stdout_thread.join()
-            stderr_thread.join()
+        stop_selenoid(handle)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        prog='python -m weberist.utils.docker',
+        description="Exports or imports an offline bundle of the images.",
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_parser = commands.add_parser(
+        'export', help="save images, browsers.json and compose file"
+    )
+    export_parser.add_argument('path', help="bundle to write (.tar.gz)")
+    export_parser.add_argument('--target-path', default=None)
+    export_parser.add_argument(
+        '--no-selenoid',
+        action='store_true',
+        help="leave the selenoid and selenoid-ui images out",
+    )
+    import_parser = commands.add_parser('import', help="load a bundle")
+    import_parser.add_argument('path', help="bundle to load")
+    import_parser.add_argument('--target-path', default=None)
+    import_parser.add_argument('--network', default=None)
+    arguments = parser.parse_args()
+    if arguments.command == 'export':
+        print(export_bundle(
+            arguments.path,
+            arguments.target_path,
+            include_selenoid=not arguments.no_selenoid,
+        ))
+    else:
+        loaded = import_bundle(
+            arguments.path,
+            arguments.target_path,
+            network_name=arguments.network,
+        )
+        print(json.dumps(loaded, indent=4, default=str))
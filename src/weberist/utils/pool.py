@@ -0,0 +1,387 @@
+"""
+Warm pool of remote Selenoid sessions.
+
+Starting a remote `ChromeDriver` makes Selenoid start a container, the
+browser and the stealth injections, which takes seconds. `RemoteSessionPool`
+creates the sessions ahead of time and hands them out to tasks, so short
+tasks do not wait for any of it. Idle sessions are pinged before Selenoid's
+idle timeout closes them, and sessions are kept per profile, so a task
+asking for a profile gets a browser already running with it.
+
+Examples
+--------
+>>> with RemoteSessionPool(size=4, profiles=['Profile 1', 'Profile 2']) as pool:
+...     with pool.session('Profile 1') as driver:
+...         driver.goto("https://example.com")
+"""
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List
+
+from weberist import ChromeDriver
+from weberist.generic.types import WebDriver
+from weberist.utils.selenoid import CapacityGate
+from weberist.utils.scheduler import is_session_lost
+
+logger = logging.getLogger('weberist.utils.pool')
+
+# selenoid's default -timeout
+SESSION_TIMEOUT = 60.0
+PING_SCRIPT = "return 1;"
+
+
+class PooledSession:
+    """A remote driver with the bookkeeping of the pool."""
+
+    def __init__(self, driver: WebDriver, profile: str = None) -> None:
+        self.driver = driver
+        self.profile = profile
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+
+    def __repr__(self) -> str:
+        return f"PooledSession({self.driver.session_id!r}, {self.profile!r})"
+
+
+class RemoteSessionPool:
+    """
+    Parameters
+    ----------
+    size : int, default 4
+        Number of sessions kept open.
+    profiles : Iterable[str], optional
+        Profiles of the sessions created by `warm`, cycled through; sessions
+        without profile if not given.
+    chrome_kwargs : dict, optional
+        Keyword arguments of the remote `ChromeDriver`s. Sessions have no
+        persistent profile unless ``localstorage`` is given; a profile is
+        then mounted by one session at a time, other sessions of the same
+        profile get a throwaway one (see `weberist.base.volumes`).
+    session_timeout : float, default 60.0
+        Selenoid's ``-timeout``: idle sessions are closed by Selenoid after
+        it.
+    refresh_margin : float, default 15.0
+        Idle sessions are pinged this many seconds before `session_timeout`.
+    max_age : float, optional
+        Sessions older than this, in seconds, are replaced when idle.
+    interval : float, default 5.0
+        Seconds between maintenance rounds of the background thread.
+    gate : CapacityGate, optional
+        Admits the creation of each session.
+    """
+
+    def __init__(self,
+                 size: int = 4,
+                 profiles: Iterable[str] = None,
+                 chrome_kwargs: dict = None,
+                 session_timeout: float = SESSION_TIMEOUT,
+                 refresh_margin: float = 15.0,
+                 max_age: float = None,
+                 interval: float = 5.0,
+                 gate: CapacityGate = None) -> None:
+        if size < 1:
+            raise ValueError("size must be at least 1.")
+        self.size = size
+        self.profiles = list(profiles) if profiles else [None]
+        self.chrome_kwargs = dict(chrome_kwargs or {})
+        self.session_timeout = session_timeout
+        self.refresh_margin = refresh_margin
+        self.max_age = max_age
+        self.interval = interval
+        self.gate = gate
+        self.stats = {
+            "created": 0, "hits": 0, "misses": 0, "pings": 0, "discarded": 0
+        }
+        self._idle: Dict[str | None, deque] = {}
+        self._busy: Dict[int, PooledSession] = {}
+        self._creating = 0
+        # idle sessions taken out by `maintain`
+        self._maintaining = 0
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._closed = False
+
+    @property
+    def total(self) -> int:
+        """
+        Sessions open, idle, busy or being maintained, plus those being
+        created.
+        """
+        idle = sum(len(sessions) for sessions in self._idle.values())
+        return idle + len(self._busy) + self._creating + self._maintaining
+
+    def _create(self, profile: str = None) -> PooledSession:
+        kwargs = dict(self.chrome_kwargs)
+        if profile is not None:
+            kwargs['profile'] = profile
+        if self.gate is None:
+            driver = ChromeDriver(remote=True, **kwargs)
+        else:
+            with self.gate.admit():
+                driver = ChromeDriver(remote=True, **kwargs)
+        with self._condition:
+            self.stats["created"] += 1
+        return PooledSession(driver, profile)
+
+    def _quit(self, session: PooledSession) -> None:
+        with self._condition:
+            self.stats["discarded"] += 1
+        try:
+            # releases the profile lease too, for the replacing session
+            session.driver.quit_driver()
+        except Exception as err:  # pylint: disable=broad-except
+            logger.debug("Could not quit session: %s", err)
+
+    def _add_idle(self, session: PooledSession) -> None:
+        with self._condition:
+            self._idle.setdefault(session.profile, deque()).append(session)
+            self._condition.notify_all()
+
+    def _pop_idle(self, profile: str = None) -> PooledSession | None:
+        sessions = self._idle.get(profile)
+        if sessions:
+            return sessions.popleft()
+        return None
+
+    def _pop_any_idle(self) -> PooledSession | None:
+        # least recently used first
+        candidates = [
+            sessions[0] for sessions in self._idle.values() if sessions
+        ]
+        if not candidates:
+            return None
+        session = min(candidates, key=lambda session: session.last_used)
+        self._idle[session.profile].popleft()
+        return session
+
+    def _create_reserved(self,
+                         profile: str = None,
+                         busy: bool = False) -> PooledSession:
+        # creates the session of a slot reserved in `_creating`
+        try:
+            session = self._create(profile)
+        except Exception:
+            with self._condition:
+                self._creating -= 1
+                self._condition.notify_all()
+            raise
+        with self._condition:
+            self._creating -= 1
+            if busy:
+                self._busy[id(session.driver)] = session
+            else:
+                self._idle.setdefault(profile, deque()).append(session)
+            self._condition.notify_all()
+        return session
+
+    def warm(self) -> 'RemoteSessionPool':
+        """Creates sessions, in parallel, until the pool holds `size`."""
+        with self._condition:
+            if self._closed:
+                return self
+            missing = max(self.size - self.total, 0)
+            self._creating += missing
+        if not missing:
+            return self
+        profiles = [
+            self.profiles[index % len(self.profiles)]
+            for index in range(missing)
+        ]
+
+        def create(profile):
+            try:
+                self._create_reserved(profile)
+            except Exception as err:  # pylint: disable=broad-except
+                logger.error("Could not create remote session: %s", err)
+
+        with ThreadPoolExecutor(max_workers=missing) as executor:
+            list(executor.map(create, profiles))
+        return self
+
+    def acquire(self, profile: str = None, timeout: float = None) -> WebDriver:
+        """
+        Hands out a session with `profile`: an idle one if available, else a
+        new one, replacing the least recently used idle session of another
+        profile when the pool is full.
+
+        Raises
+        ------
+        TimeoutError
+            If every session stayed busy for `timeout` seconds.
+        """
+        end = None if timeout is None else time.monotonic() + timeout
+        evicted = None
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("The pool is closed.")
+                session = self._pop_idle(profile)
+                if session is not None:
+                    self.stats["hits"] += 1
+                    session.uses += 1
+                    self._busy[id(session.driver)] = session
+                    return session.driver
+                if self.total < self.size:
+                    break
+                evicted = self._pop_any_idle()
+                if evicted is not None:
+                    break
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(
+                        f"No remote session freed up after {timeout}s."
+                    )
+                self._condition.wait(remaining)
+            self.stats["misses"] += 1
+            self._creating += 1
+        if evicted is not None:
+            self._quit(evicted)
+        session = self._create_reserved(profile, busy=True)
+        session.uses += 1
+        return session.driver
+
+    def release(self, driver: WebDriver, discard: bool = False) -> None:
+        """Gives `driver` back to the pool, or quits it if `discard`."""
+        with self._condition:
+            session = self._busy.pop(id(driver), None)
+            self._condition.notify_all()
+        if session is None:
+            raise ValueError("The driver does not belong to this pool.")
+        if discard or self._closed:
+            self._quit(session)
+            return
+        session.last_used = time.monotonic()
+        self._add_idle(session)
+
+    @contextmanager
+    def session(self,
+                profile: str = None,
+                timeout: float = None) -> Iterator[WebDriver]:
+        """
+        Context manager around `acquire` and `release`; the session is
+        discarded if the block lost it.
+        """
+        driver = self.acquire(profile, timeout)
+        discard = False
+        try:
+            yield driver
+        except Exception as err:
+            discard = is_session_lost(err)
+            raise
+        finally:
+            self.release(driver, discard)
+
+    def maintain(self) -> Dict[str, int]:
+        """
+        Pings the idle sessions close to Selenoid's timeout, replaces the
+        dead and too old ones and refills the pool.
+
+        Returns
+        -------
+        Dict[str, int]
+            Number of sessions ``pinged`` and ``replaced``.
+        """
+        now = time.monotonic()
+        due = []
+        with self._condition:
+            for sessions in self._idle.values():
+                for session in list(sessions):
+                    too_old = (
+                        self.max_age is not None
+                        and now - session.created_at >= self.max_age
+                    )
+                    idle_for = now - session.last_used
+                    if too_old or (
+                            idle_for
+                            >= self.session_timeout - self.refresh_margin):
+                        sessions.remove(session)
+                        due.append((session, too_old))
+            self._maintaining += len(due)
+        report = {"pinged": 0, "replaced": 0}
+        for session, too_old in due:
+            if not too_old:
+                try:
+                    session.driver.execute_script(PING_SCRIPT)
+                    session.last_used = time.monotonic()
+                    report["pinged"] += 1
+                    with self._condition:
+                        self._maintaining -= 1
+                        self._idle.setdefault(
+                            session.profile, deque()
+                        ).append(session)
+                        self._condition.notify_all()
+                    continue
+                except Exception as err:  # pylint: disable=broad-except
+                    logger.warning("Idle session lost: %s", err)
+            report["replaced"] += 1
+            self._quit(session)
+            with self._condition:
+                self._maintaining -= 1
+                self._condition.notify_all()
+        with self._condition:
+            self.stats["pings"] += report["pinged"]
+            self._condition.notify_all()
+        due.clear()
+        if not self._closed:
+            self.warm()
+        return report
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.maintain()
+            except Exception as err:  # pylint: disable=broad-except
+                logger.error("Session pool maintenance failed: %s", err)
+
+    def start(self) -> 'RemoteSessionPool':
+        """Warms the pool and starts maintaining it in a daemon thread."""
+        self.warm()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='weberist-session-pool', daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stops the maintenance and quits the idle sessions; busy ones are
+        quit when released."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._condition:
+            self._closed = True
+            idle: List[PooledSession] = [
+                session
+                for sessions in self._idle.values()
+                for session in sessions
+            ]
+            self._idle = {}
+            self._condition.notify_all()
+        for session in idle:
+            self._quit(session)
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "idle": sum(len(sessions) for sessions in self._idle.values()),
+                "busy": len(self._busy),
+                "creating": self._creating,
+                "maintaining": self._maintaining,
+                **self.stats,
+            }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback_):
+        self.close()
@@ -0,0 +1,329 @@
+"""
+Registry and reaper of the browser processes and containers launched by
+weberist.
+
+Every local driver registers its process tree (chromedriver and chrome) and
+every Selenoid stack started by `run_selenoid_driver_task` registers its
+containers in `RUNTIME_DIR`, one JSON file per launch, together with the pid
+of the Python process that owns them. `Reaper` kills whatever is registered
+by owners that no longer exist, e.g. crashed workers.
+
+Killing process trees uses `psutil` when installed; otherwise only the
+registered pids are signalled.
+"""
+import os
+import json
+import uuid
+import signal
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+from weberist.base.config import RUNTIME_DIR
+from weberist.base.monitor import driver_processes
+from weberist.generic.types import WebDriver
+
+try:
+    import psutil
+except (ImportError, ModuleNotFoundError):  # pragma: no cover
+    psutil = None
+
+logger = logging.getLogger('weberist.utils.reaper')
+
+TERMINATE_TIMEOUT = 3
+
+
+def process_identity(pid: int) -> Dict[str, Any]:
+    """Pid plus creation time, so a reused pid is not mistaken for it."""
+    identity = {"pid": pid, "create_time": None}
+    if psutil is not None:
+        try:
+            identity["create_time"] = psutil.Process(pid).create_time()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return identity
+
+
+def is_alive(identity: Dict[str, Any]) -> bool:
+    pid = identity["pid"]
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            if process.status() == psutil.STATUS_ZOMBIE:
+                return False
+            create_time = identity.get("create_time")
+            return create_time is None or process.create_time() == create_time
+        except psutil.NoSuchProcess:
+            return False
+        except psutil.AccessDenied:
+            return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def kill_process_tree(identity: Dict[str, Any]) -> List[int]:
+    """
+    Terminates (then kills) the process of `identity` and its descendants.
+
+    Returns
+    -------
+    List[int]
+        The pids that were signalled.
+    """
+    if not is_alive(identity):
+        return []
+    pid = identity["pid"]
+    if psutil is None:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            return []
+        return [pid]
+    try:
+        root = psutil.Process(pid)
+        processes = root.children(recursive=True) + [root]
+    except psutil.NoSuchProcess:
+        return []
+    for process in processes:
+        try:
+            process.terminate()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    _, alive = psutil.wait_procs(processes, timeout=TERMINATE_TIMEOUT)
+    for process in alive:
+        try:
+            process.kill()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return [process.pid for process in processes]
+
+
+def remove_containers(container_ids: Iterable[str], client=None) -> List[str]:
+    """Force-removes the containers that still exist."""
+    container_ids = list(container_ids)
+    if not container_ids:
+        return []
+    import docker  # pylint: disable=import-outside-toplevel
+    from docker.errors import NotFound, APIError  # pylint: disable=C0415
+
+    client = client or docker.from_env()
+    removed = []
+    for container_id in container_ids:
+        try:
+            client.containers.get(container_id).remove(force=True)
+            removed.append(container_id)
+        except NotFound:
+            continue
+        except APIError as err:
+            logger.error(
+                "Could not remove container %s: %s", container_id, err
+            )
+    return removed
+
+
+class ProcessRegistry:
+    """
+    Files in `path` recording what each Python process launched.
+
+    Parameters
+    ----------
+    path : str | Path, optional
+        The runtime directory, `RUNTIME_DIR` by default.
+    """
+
+    def __init__(self, path: str | Path = None) -> None:
+        self.path = Path(path or RUNTIME_DIR)
+
+    def _entry_path(self, entry_id: str) -> Path:
+        return self.path / f"{entry_id}.json"
+
+    def _write(self, entry_id: str, entry: Dict[str, Any]) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        path = self._entry_path(entry_id)
+        temporary = path.with_suffix('.tmp')
+        with temporary.open('w', encoding='utf-8') as json_file:
+            json.dump(entry, json_file)
+        os.replace(temporary, path)
+
+    def register(self,
+                 pids: Iterable[int] = (),
+                 containers: Iterable[str] = (),
+                 owner_pid: int = None,
+                 entry_id: str = None) -> str:
+        """
+        Records `pids` and `containers` as owned by `owner_pid` (the current
+        process by default). Passing an existing `entry_id` replaces it.
+
+        Returns
+        -------
+        str
+            The id of the entry, to `unregister` or `release` it.
+        """
+        owner_pid = owner_pid or os.getpid()
+        entry_id = entry_id or f"{owner_pid}-{uuid.uuid4().hex[:12]}"
+        entry = {
+            "owner": process_identity(owner_pid),
+            "processes": [process_identity(pid) for pid in pids],
+            "containers": list(containers),
+            "created_at": datetime.now().isoformat(),
+        }
+        self._write(entry_id, entry)
+        return entry_id
+
+    def unregister(self, entry_id: str) -> None:
+        try:
+            self._entry_path(entry_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def release(self, entry_id: str, client=None) -> Dict[str, List]:
+        """Kills what `entry_id` registered, then unregisters it."""
+        entry = self.get(entry_id)
+        reclaimed = {"processes": [], "containers": []}
+        if entry is not None:
+            reclaimed = reclaim(entry, client)
+        self.unregister(entry_id)
+        return reclaimed
+
+    def get(self, entry_id: str) -> Dict[str, Any] | None:
+        try:
+            with self._entry_path(entry_id).open('r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        entries = {}
+        if not self.path.is_dir():
+            return entries
+        for path in self.path.glob('*.json'):
+            try:
+                with path.open('r', encoding='utf-8') as json_file:
+                    entries[path.stem] = json.load(json_file)
+            except (OSError, ValueError) as err:
+                logger.warning("Ignoring registry entry %s: %s", path, err)
+        return entries
+
+
+def reclaim(entry: Dict[str, Any], client=None) -> Dict[str, List]:
+    processes = []
+    for identity in entry.get("processes", []):
+        processes.extend(kill_process_tree(identity))
+    containers = remove_containers(entry.get("containers", []), client)
+    return {"processes": processes, "containers": containers}
+
+
+def register_driver(driver: WebDriver,
+                    registry: ProcessRegistry = None,
+                    entry_id: str = None) -> str | None:
+    """
+    Registers the local process tree of `driver`. Remote drivers have none
+    and are not registered.
+    """
+    service = getattr(driver, 'service', None)
+    process = getattr(service, 'process', None) if service else None
+    if process is None:
+        return None
+    pids = [process.pid]
+    if psutil is not None:
+        pids = [process_.pid for process_ in driver_processes(driver)]
+    registry = registry or ProcessRegistry()
+    return registry.register(pids=pids, entry_id=entry_id)
+
+
+class Reaper:
+    """
+    Reclaims processes and containers registered by dead owners.
+
+    `start` reaps once immediately and then every `interval` seconds in a
+    daemon thread; `reap` can also be called directly, e.g. at worker
+    startup.
+
+    Parameters
+    ----------
+    registry : ProcessRegistry, optional
+        Registry to reap, the default `RUNTIME_DIR` one if not given.
+    interval : float, default 60.0
+        Seconds between periodic reaps.
+    client : docker.DockerClient, optional
+        Client used to remove containers.
+    """
+
+    def __init__(self,
+                 registry: ProcessRegistry = None,
+                 interval: float = 60.0,
+                 client=None) -> None:
+        self.registry = registry or ProcessRegistry()
+        self.interval = interval
+        self.client = client
+        self.reclaimed = {"processes": 0, "containers": 0, "entries": 0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def reap(self) -> Dict[str, Any]:
+        """
+        Returns
+        -------
+        Dict[str, Any]
+            The ``processes`` (pids) and ``containers`` (ids) reclaimed and
+            the number of orphaned ``entries`` removed.
+        """
+        report = {"processes": [], "containers": [], "entries": 0}
+        for entry_id, entry in self.registry.entries().items():
+            if is_alive(entry["owner"]):
+                continue
+            reclaimed = reclaim(entry, self.client)
+            report["processes"].extend(reclaimed["processes"])
+            report["containers"].extend(reclaimed["containers"])
+            report["entries"] += 1
+            self.registry.unregister(entry_id)
+        self.reclaimed["processes"] += len(report["processes"])
+        self.reclaimed["containers"] += len(report["containers"])
+        self.reclaimed["entries"] += report["entries"]
+        if report["processes"] or report["containers"]:
+            logger.warning(
+                "Reaped %d orphaned processes and %d containers.",
+                len(report["processes"]),
+                len(report["containers"]),
+            )
+        return report
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.reap()
+            except Exception as err:  # pylint: disable=broad-except
+                logger.error("Reaper failed: %s", err)
+
+    def start(self) -> Dict[str, Any]:
+        """Reaps now and starts reaping periodically. Returns the report."""
+        report = self.reap()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='weberist-reaper', daemon=True
+            )
+            self._thread.start()
+        return report
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def reap_orphans(path: str | Path = None, client=None) -> Dict[str, Any]:
+    """Reaps the registry at `path` once."""
+    return Reaper(ProcessRegistry(path), client=client).reap()
+
+
+if __name__ == '__main__':
+    print(json.dumps(reap_orphans(), indent=4))
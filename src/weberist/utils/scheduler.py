@@ -0,0 +1,302 @@
+"""
+Runs many driver tasks on a pool of remote Selenoid sessions.
+
+`SelenoidScheduler` keeps up to `max_sessions` remote `ChromeDriver`s open,
+one per worker thread, and reuses them across tasks. A task whose session
+was lost (e.g. the browser container died or the session timed out in
+Selenoid) is retried on a fresh session. Selenoid is started once and, by
+default, left running when the scheduler stops, so that the next batch does
+not pay for its startup.
+
+Examples
+--------
+>>> def title(driver, url):
+...     driver.goto(url)
+...     return driver.title
+>>> with SelenoidScheduler() as scheduler:
+...     for url, result in scheduler.map(title, urls):
+...         print(url, result)
+"""
+import logging
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+from weberist import ChromeDriver
+from weberist.base.exceptions import (
+    MaxRetryError,
+    RequestConnectionError,
+    WebDriverException,
+)
+from weberist.generic.types import WebDriver
+from weberist.utils.docker import (
+    SelenoidController,
+    selenoid_session_limit,
+    start_selenoid,
+    stop_selenoid,
+)
+from weberist.utils.selenoid import CapacityGate
+
+logger = logging.getLogger('weberist.utils.scheduler')
+
+# messages of WebDriverException meaning the session is gone for good
+SESSION_LOST_MESSAGES = (
+    'invalid session id',
+    'session deleted',
+    'session not found',
+    'unknown session',
+    'chrome not reachable',
+    'disconnected',
+)
+
+
+def is_session_lost(err: BaseException) -> bool:
+    """Whether `err` means the remote session cannot be used anymore."""
+    if isinstance(err, (MaxRetryError, RequestConnectionError)):
+        return True
+    if isinstance(err, WebDriverException):
+        message = (err.msg or '').lower()
+        return any(cue in message for cue in SESSION_LOST_MESSAGES)
+    return False
+
+
+class SelenoidScheduler:
+    """
+    Parameters
+    ----------
+    max_sessions : int, optional
+        Number of concurrent remote sessions; the ``-limit`` of the Selenoid
+        compose file by default.
+    retries : int, default 2
+        How many times a task is retried on a new session after its session
+        was lost. Other errors are not retried.
+    keep_running : bool, default True
+        Whether Selenoid is left running by `stop`.
+    tasks_per_session : int, optional
+        Quits and replaces a session after this many tasks.
+    chrome_kwargs : dict, optional
+        Keyword arguments of the remote `ChromeDriver`s. Sessions have no
+        persistent profile unless ``localstorage`` is given; a profile is
+        then mounted by one session at a time, concurrent sessions get a
+        throwaway one (see `weberist.base.volumes`).
+    gate : CapacityGate, optional
+        Admits the creation of each session, so that sessions beyond
+        Selenoid's free slots wait on the client side.
+    admit_timeout : float, optional
+        Seconds a session waits for `gate`; the task fails with
+        `TimeoutError` after that.
+    dockercompose_name, network_name, target_path :
+        Passed to `start_selenoid`.
+    """
+
+    def __init__(self,
+                 max_sessions: int = None,
+                 retries: int = 2,
+                 keep_running: bool = True,
+                 tasks_per_session: int = None,
+                 chrome_kwargs: dict = None,
+                 gate: CapacityGate = None,
+                 admit_timeout: float = None,
+                 dockercompose_name: str = None,
+                 network_name: str = None,
+                 target_path: str | Path = None) -> None:
+        self.target_path = target_path
+        self.dockercompose_name = dockercompose_name
+        self.network_name = network_name
+        if max_sessions is None:
+            compose = None
+            if target_path is not None and dockercompose_name is not None:
+                compose = Path(target_path) / dockercompose_name
+                compose = compose if compose.exists() else None
+            max_sessions = selenoid_session_limit(compose)
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1.")
+        self.max_sessions = max_sessions
+        self.retries = retries
+        self.keep_running = keep_running
+        self.tasks_per_session = tasks_per_session
+        self.chrome_kwargs = dict(chrome_kwargs or {})
+        self.gate = gate
+        self.admit_timeout = admit_timeout
+        self.stats = {"tasks": 0, "failed": 0, "retries": 0, "sessions": 0}
+        self._selenoid: SelenoidController = None
+        self._started = False
+        self._executor: ThreadPoolExecutor = None
+        self._local = threading.local()
+        self._drivers: List[WebDriver] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> 'SelenoidScheduler':
+        """Starts Selenoid, if it is not up, and the worker threads."""
+        if self._started:
+            return self
+        self._selenoid = start_selenoid(
+            self.dockercompose_name,
+            self.network_name,
+            self.target_path,
+            policy='keep-warm' if self.keep_running else 'stop',
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_sessions,
+            thread_name_prefix='weberist-selenoid-session',
+        )
+        self._started = True
+        return self
+
+    def _session(self) -> WebDriver:
+        driver = getattr(self._local, 'driver', None)
+        if (driver is not None and self.tasks_per_session
+                and self._local.tasks >= self.tasks_per_session):
+            self._discard(driver)
+            driver = None
+        if driver is None:
+            if self.gate is None:
+                driver = ChromeDriver(remote=True, **self.chrome_kwargs)
+            else:
+                with self.gate.admit(self.admit_timeout):
+                    driver = ChromeDriver(remote=True, **self.chrome_kwargs)
+            self._local.driver = driver
+            self._local.tasks = 0
+            with self._lock:
+                self._drivers.append(driver)
+                self.stats["sessions"] += 1
+        return driver
+
+    def _discard(self, driver: WebDriver) -> None:
+        self._local.driver = None
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        try:
+            driver.quit_driver()
+        except Exception as err:  # pylint: disable=broad-except
+            logger.debug("Could not quit lost session: %s", err)
+
+    def _run(self, driver_task: Callable, item: Any, args, kwargs) -> Any:
+        attempt = 0
+        while True:
+            driver = self._session()
+            try:
+                result = driver_task(driver, item, *args, **kwargs)
+                self._local.tasks += 1
+                return result
+            except Exception as err:  # pylint: disable=broad-except
+                if not is_session_lost(err) or attempt >= self.retries:
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.stats["retries"] += 1
+                logger.warning(
+                    "Session lost running task for %r (%s). Retry %d of %d.",
+                    item,
+                    err,
+                    attempt,
+                    self.retries,
+                )
+                self._discard(driver)
+
+    def map(self,
+            driver_task: Callable[..., Any],
+            items: Iterable[Any],
+            *args,
+            return_exceptions: bool = False,
+            **kwargs) -> Iterator[Tuple[Any, Any]]:
+        """
+        Runs ``driver_task(driver, item, *args, **kwargs)`` for every item
+        and yields the results as they complete.
+
+        Parameters
+        ----------
+        driver_task : Callable[..., Any]
+            Function receiving a remote driver and an item. The driver is
+            reused by later tasks, so the function should not quit it.
+        items : Iterable[Any]
+            Consumed lazily: at most twice `max_sessions` items are pending.
+        return_exceptions : bool, default False
+            If True, errors are yielded as results instead of raised.
+
+        Yields
+        ------
+        Tuple[Any, Any]
+            Each item and its result (or exception), in completion order.
+        """
+        self.start()
+        items = iter(items)
+        pending = {}
+        done = object()
+
+        def fill():
+            while len(pending) < 2 * self.max_sessions:
+                item = next(items, done)
+                if item is done:
+                    return
+                future = self._executor.submit(
+                    self._run, driver_task, item, args, kwargs
+                )
+                pending[future] = item
+
+        try:
+            fill()
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                finished = [(future, pending.pop(future)) for future in finished]
+                # keep the sessions busy while the results are consumed
+                fill()
+                for future, item in finished:
+                    self.stats["tasks"] += 1
+                    err = future.exception()
+                    if err is None:
+                        yield item, future.result()
+                        continue
+                    self.stats["failed"] += 1
+                    if not return_exceptions:
+                        raise err
+                    logger.error("Task for %r failed: %s", item, err)
+                    yield item, err
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def run(self,
+            driver_task: Callable[..., Any],
+            items: Iterable[Any],
+            *args,
+            **kwargs) -> List[Tuple[Any, Any]]:
+        """`map` collected into a list, with errors returned as results."""
+        return list(
+            self.map(driver_task, items, *args, return_exceptions=True,
+                     **kwargs)
+        )
+
+    def stop(self, stop_stack: bool = None) -> None:
+        """
+        Quits the sessions and the workers. Selenoid is stopped too if it
+        was started by this scheduler and `stop_stack` (by default,
+        ``not keep_running``).
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit_driver()
+            except Exception as err:  # pylint: disable=broad-except
+                logger.debug("Could not quit session: %s", err)
+        self._local = threading.local()
+        if stop_stack is None:
+            stop_stack = not self.keep_running
+        if stop_stack:
+            stop_selenoid(self._selenoid, policy='stop')
+            self._selenoid = None
+        self._started = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback_):
+        if exc_type is not None:
+            logger.error("Exception occurred: %s", exc_value)
+        self.stop()
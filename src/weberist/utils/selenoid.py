@@ -0,0 +1,570 @@
+"""
+Client side helpers of a running Selenoid.
+
+`SelenoidProbe` tells when a Selenoid instance is ready by polling its
+``/status`` endpoint with exponential backoff, up to a deadline. Its `ready`
+event can be waited on from any thread, `wait_async` from a coroutine, and
+`wait_selenoids` waits for several instances at once.
+
+`CapacityGate` admits new sessions only while ``/status`` reports free
+slots, so that excess requests wait on the client side, and `HubSelector`
+spreads sessions over several Selenoid hosts.
+"""
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+import requests
+
+from weberist.base.config import SELENOID_URL
+
+logger = logging.getLogger('weberist.utils.selenoid')
+
+STARTUP_TIMEOUT = 300.0
+
+
+def selenoid_status(url: str = None, timeout: float = 2.0) -> Dict[str, Any]:
+    """The JSON of Selenoid's ``/status`` at `url` (`SELENOID_URL`)."""
+    url = (url or SELENOID_URL).rstrip('/')
+    response = requests.get(f"{url}/status", timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+class SelenoidProbe:
+    """
+    Parameters
+    ----------
+    url : str, optional
+        Base URL of the Selenoid instance, `SELENOID_URL` by default.
+    deadline : float, default 300.0
+        Seconds `wait` waits before raising `TimeoutError`.
+    initial_delay : float, default 0.05
+        Seconds before the second poll.
+    max_delay : float, default 2.0
+        Upper bound of the delay between polls.
+    factor : float, default 2.0
+        Growth of the delay after each failed poll.
+    request_timeout : float, default 2.0
+        Timeout of each ``/status`` request.
+    """
+
+    def __init__(self,
+                 url: str = None,
+                 deadline: float = STARTUP_TIMEOUT,
+                 initial_delay: float = 0.05,
+                 max_delay: float = 2.0,
+                 factor: float = 2.0,
+                 request_timeout: float = 2.0) -> None:
+        self.url = (url or SELENOID_URL).rstrip('/')
+        self.deadline = deadline
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.request_timeout = request_timeout
+        self.ready = threading.Event()
+        self.status: Dict[str, Any] = None
+        self.error: BaseException = None
+        self._thread = None
+
+    def __repr__(self) -> str:
+        return f"SelenoidProbe({self.url!r}, ready={self.ready.is_set()})"
+
+    def check(self) -> bool:
+        """Polls ``/status`` once; sets `ready` if Selenoid answered."""
+        try:
+            self.status = selenoid_status(self.url, self.request_timeout)
+        except (requests.RequestException, ValueError) as err:
+            self.error = err
+            return False
+        self.error = None
+        self.ready.set()
+        return True
+
+    def wait(self,
+             deadline: float = None,
+             alive: Callable[[], bool] = None) -> Dict[str, Any]:
+        """
+        Polls until Selenoid is ready.
+
+        Parameters
+        ----------
+        deadline : float, optional
+            Overrides the probe's `deadline`.
+        alive : Callable[[], bool], optional
+            Checked between polls, e.g. whether the compose process still
+            runs; the wait fails as soon as it returns False.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The first ``/status`` answered.
+
+        Raises
+        ------
+        TimeoutError
+            If Selenoid is not ready by the deadline.
+        RuntimeError
+            If `alive` returned False.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        end = time.monotonic() + deadline
+        delay = self.initial_delay
+        while not self.check():
+            if alive is not None and not alive():
+                raise RuntimeError(
+                    f"Selenoid at {self.url} exited before being ready."
+                )
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"Selenoid at {self.url} not ready after {deadline}s: "
+                    f"{self.error}"
+                )
+            logger.debug("Waiting selenoid at %s...", self.url)
+            time.sleep(min(delay, remaining))
+            delay = min(delay * self.factor, self.max_delay)
+        return self.status
+
+    def start(self, deadline: float = None) -> 'SelenoidProbe':
+        """Waits in a daemon thread; wait on `ready` to be signalled."""
+        if self.ready.is_set() or (
+                self._thread is not None and self._thread.is_alive()):
+            return self
+
+        def run():
+            try:
+                self.wait(deadline)
+            except (TimeoutError, RuntimeError) as err:
+                logger.error(err)
+
+        self._thread = threading.Thread(
+            target=run, name='weberist-selenoid-probe', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    async def wait_async(self, deadline: float = None) -> Dict[str, Any]:
+        """`wait` as a coroutine, polled without blocking the event loop."""
+        deadline = self.deadline if deadline is None else deadline
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline
+        delay = self.initial_delay
+        while not await asyncio.to_thread(self.check):
+            remaining = end - loop.time()
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"Selenoid at {self.url} not ready after {deadline}s: "
+                    f"{self.error}"
+                )
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * self.factor, self.max_delay)
+        return self.status
+
+
+def wait_selenoids(urls: Iterable[str],
+                   deadline: float = STARTUP_TIMEOUT,
+                   **kwargs) -> List[SelenoidProbe]:
+    """
+    Waits, concurrently, until every Selenoid of `urls` is ready.
+
+    Raises
+    ------
+    TimeoutError
+        Listing the instances not ready by the deadline.
+    """
+    probes = [
+        SelenoidProbe(url, deadline=deadline, **kwargs).start()
+        for url in urls
+    ]
+    end = time.monotonic() + deadline
+    for probe in probes:
+        probe.ready.wait(max(end - time.monotonic(), 0))
+    not_ready = [probe.url for probe in probes if not probe.ready.is_set()]
+    if not_ready:
+        raise TimeoutError(
+            f"Selenoid not ready after {deadline}s: {', '.join(not_ready)}"
+        )
+    return probes
+
+
+class CapacityGate:
+    """
+    Client side admission control of new Selenoid sessions.
+
+    A session request is admitted only while Selenoid reports free slots
+    (``total - used - pending - queued`` in ``/status``) beyond the sessions
+    this gate admitted that are still being created; otherwise it waits,
+    re-reading ``/status`` every `refresh_interval` seconds, instead of
+    queueing inside Selenoid with an opaque timeout.
+
+    Parameters
+    ----------
+    url : str, optional
+        Base URL of the Selenoid instance, `SELENOID_URL` by default.
+    refresh_interval : float, default 1.0
+        Maximum age, in seconds, of the status used to admit a request.
+    reserve : int, default 0
+        Slots left free for other clients.
+    fetch : Callable[[], Dict], optional
+        Returns the ``/status`` JSON; `selenoid_status` of `url` by default.
+    max_failures : int, default 3
+        Consecutive failed reads of ``/status`` after which waiting requests
+        stop waiting on a status that cannot change.
+    fail_open : bool, default False
+        Whether requests are then admitted anyway (Selenoid queues or
+        rejects them itself) instead of failing with `ConnectionError`.
+
+    Examples
+    --------
+    >>> gate = CapacityGate()
+    >>> with gate.admit(timeout=60):
+    ...     driver = ChromeDriver(remote=True)
+    """
+
+    def __init__(self,
+                 url: str = None,
+                 refresh_interval: float = 1.0,
+                 reserve: int = 0,
+                 fetch: Callable[[], Dict[str, Any]] = None,
+                 max_failures: int = 3,
+                 fail_open: bool = False) -> None:
+        self.url = (url or SELENOID_URL).rstrip('/')
+        self.refresh_interval = refresh_interval
+        self.reserve = reserve
+        self.fetch = fetch or (lambda: selenoid_status(self.url))
+        self.max_failures = max_failures
+        self.fail_open = fail_open
+        self.status: Dict[str, Any] = {}
+        self.failures = 0
+        self.launching = 0
+        self.waiting = 0
+        self.counters = {
+            "admitted": 0,
+            "timeouts": 0,
+            "unreachable": 0,
+            "wait_seconds": 0.0,
+        }
+        self._refreshed_at = None
+        self._condition = threading.Condition()
+
+    def refresh(self) -> Dict[str, Any]:
+        """Reads ``/status``; keeps the previous status if it fails."""
+        try:
+            status = self.fetch()
+        except (requests.RequestException, OSError, ValueError) as err:
+            with self._condition:
+                self.failures += 1
+                # not retried before the next refresh interval
+                self._refreshed_at = time.monotonic()
+            logger.warning(
+                "Could not read Selenoid status at %s (%d in a row): %s",
+                self.url,
+                self.failures,
+                err,
+            )
+            return self.status
+        with self._condition:
+            self.failures = 0
+            self.status = status
+            self._refreshed_at = time.monotonic()
+            self._condition.notify_all()
+        return status
+
+    @property
+    def free(self) -> int:
+        """Free slots according to the last status, minus `reserve`."""
+        status = self.status
+        return (
+            status.get("total", 0)
+            - status.get("used", 0)
+            - status.get("pending", 0)
+            - status.get("queued", 0)
+            - self.reserve
+        )
+
+    def _stale(self) -> bool:
+        return (
+            self._refreshed_at is None
+            or time.monotonic() - self._refreshed_at >= self.refresh_interval
+        )
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Waits for a free slot and admits one session request.
+
+        Returns
+        -------
+        bool
+            False if no slot freed up within `timeout`.
+
+        Raises
+        ------
+        ConnectionError
+            If ``/status`` failed `max_failures` times in a row and not
+            `fail_open`.
+        """
+        start = time.monotonic()
+        end = None if timeout is None else start + timeout
+        with self._condition:
+            self.waiting += 1
+        try:
+            while True:
+                if self._stale():
+                    self.refresh()
+                with self._condition:
+                    unreachable = self.failures >= self.max_failures
+                    if unreachable:
+                        self.counters["unreachable"] += 1
+                        if not self.fail_open:
+                            logger.error(
+                                "Selenoid status at %s unreachable; not "
+                                "admitting the session.", self.url
+                            )
+                            raise ConnectionError(
+                                f"Selenoid status at {self.url} failed "
+                                f"{self.failures} times in a row."
+                            )
+                        logger.warning(
+                            "Selenoid status at %s unreachable; admitting "
+                            "the session without capacity check.", self.url
+                        )
+                    if unreachable or self.free - self.launching > 0:
+                        self.launching += 1
+                        self.counters["admitted"] += 1
+                        self.counters["wait_seconds"] += (
+                            time.monotonic() - start
+                        )
+                        return True
+                    wait = self.refresh_interval
+                    if end is not None:
+                        remaining = end - time.monotonic()
+                        if remaining <= 0:
+                            self.counters["timeouts"] += 1
+                            return False
+                        wait = min(wait, remaining)
+                    self._condition.wait(wait)
+        finally:
+            with self._condition:
+                self.waiting -= 1
+
+    def release(self) -> None:
+        """Marks an admitted request as done (session created or failed)."""
+        with self._condition:
+            self.launching = max(self.launching - 1, 0)
+            # the new session now shows in /status
+            self._refreshed_at = None
+            self._condition.notify_all()
+
+    @contextmanager
+    def admit(self, timeout: float = None) -> Iterator[None]:
+        """
+        Context manager around `acquire` and `release`.
+
+        Raises
+        ------
+        TimeoutError
+            If no slot freed up within `timeout`.
+        """
+        if not self.acquire(timeout):
+            raise TimeoutError(
+                f"No free Selenoid slot at {self.url} after {timeout}s."
+            )
+        try:
+            yield
+        finally:
+            self.release()
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """Capacity from the last status plus the gate's counters."""
+        status = self.status
+        return {
+            "total": status.get("total", 0),
+            "used": status.get("used", 0),
+            "queued": status.get("queued", 0),
+            "pending": status.get("pending", 0),
+            "free": max(self.free, 0),
+            "launching": self.launching,
+            "waiting": self.waiting,
+            **self.counters,
+        }
+
+
+class HubSelector:
+    """
+    Chooses the Selenoid host of each new remote session.
+
+    Hosts are read from their ``/status`` (cached for `status_ttl`
+    seconds). A host that does not answer, or that failed to create a
+    session (`mark_failed`), is skipped for `cooldown` seconds. A profile is
+    placed on the host it got first while that host is healthy, so its
+    profile volume stays on one machine; otherwise it fails over to another
+    host.
+
+    Parameters
+    ----------
+    endpoints : Iterable[str] | Dict[str, float]
+        Base URLs of the Selenoid instances, or URLs mapped to weights.
+    strategy : str, default 'least-loaded'
+        ``'least-loaded'`` picks the host with the largest share of free
+        slots; ``'weighted-round-robin'`` spreads sessions by weight.
+    status_ttl : float, default 1.0
+        Seconds a ``/status`` is reused.
+    cooldown : float, default 30.0
+        Seconds an unhealthy host is skipped.
+    fetch : Callable[[str], Dict], optional
+        Returns the ``/status`` JSON of a URL; `selenoid_status` by default.
+
+    Examples
+    --------
+    >>> hub = HubSelector(['http://host-a:4444', 'http://host-b:4444'])
+    >>> driver = ChromeDriver(remote=True, hub=hub, profile='Profile 1')
+    """
+
+    strategies = ('least-loaded', 'weighted-round-robin')
+
+    def __init__(self,
+                 endpoints: Iterable[str] | Dict[str, float],
+                 strategy: str = 'least-loaded',
+                 status_ttl: float = 1.0,
+                 cooldown: float = 30.0,
+                 fetch: Callable[[str], Dict[str, Any]] = None) -> None:
+        if strategy not in self.strategies:
+            raise ValueError(
+                f'Invalid strategy "{strategy}". Valid are {self.strategies}.'
+            )
+        if not isinstance(endpoints, dict):
+            endpoints = {endpoint: 1.0 for endpoint in endpoints}
+        if not endpoints:
+            raise ValueError("At least one endpoint is required.")
+        self.weights = {
+            endpoint.rstrip('/'): weight
+            for endpoint, weight in endpoints.items()
+        }
+        self.strategy = strategy
+        self.status_ttl = status_ttl
+        self.cooldown = cooldown
+        self.fetch = fetch or selenoid_status
+        self.statuses: Dict[str, Dict[str, Any]] = {}
+        self.sticky: Dict[str, str] = {}
+        self.placed = {endpoint: 0 for endpoint in self.weights}
+        self._fetched_at: Dict[str, float] = {}
+        self._unhealthy_until: Dict[str, float] = {}
+        self._pending = {endpoint: 0 for endpoint in self.weights}
+        self._current = {endpoint: 0.0 for endpoint in self.weights}
+        self._lock = threading.Lock()
+
+    def _refresh(self, endpoint: str) -> None:
+        fetched_at = self._fetched_at.get(endpoint)
+        if (fetched_at is not None
+                and time.monotonic() - fetched_at < self.status_ttl):
+            return
+        try:
+            status = self.fetch(endpoint)
+        except (requests.RequestException, ValueError) as err:
+            logger.warning("Selenoid at %s is unhealthy: %s", endpoint, err)
+            self.mark_failed(endpoint)
+            return
+        with self._lock:
+            self.statuses[endpoint] = status
+            self._fetched_at[endpoint] = time.monotonic()
+            self._pending[endpoint] = 0
+
+    def is_healthy(self, endpoint: str) -> bool:
+        return time.monotonic() >= self._unhealthy_until.get(endpoint, 0.0)
+
+    def mark_failed(self, endpoint: str) -> None:
+        """Skips `endpoint` for `cooldown` seconds."""
+        endpoint = endpoint.rstrip('/')
+        if endpoint.endswith('/wd/hub'):
+            endpoint = endpoint[:-len('/wd/hub')]
+        with self._lock:
+            self._unhealthy_until[endpoint] = time.monotonic() + self.cooldown
+            self._fetched_at.pop(endpoint, None)
+
+    def free_share(self, endpoint: str) -> float:
+        """Free slots over total, counting the sessions placed since the
+        last status."""
+        status = self.statuses.get(endpoint, {})
+        total = status.get("total", 0)
+        if not total:
+            return 0.0
+        free = (
+            total
+            - status.get("used", 0)
+            - status.get("pending", 0)
+            - status.get("queued", 0)
+            - self._pending[endpoint]
+        )
+        return free / total
+
+    def healthy(self) -> List[str]:
+        for endpoint in self.weights:
+            if self.is_healthy(endpoint):
+                self._refresh(endpoint)
+        return [
+            endpoint for endpoint in self.weights if self.is_healthy(endpoint)
+        ]
+
+    def _least_loaded(self, endpoints: List[str]) -> str:
+        return max(endpoints, key=self.free_share)
+
+    def _weighted_round_robin(self, endpoints: List[str]) -> str:
+        # smooth weighted round-robin, as in nginx
+        total = sum(self.weights[endpoint] for endpoint in endpoints)
+        for endpoint in endpoints:
+            self._current[endpoint] += self.weights[endpoint]
+        chosen = max(endpoints, key=lambda endpoint: self._current[endpoint])
+        self._current[chosen] -= total
+        return chosen
+
+    def select(self, profile: str = None) -> str:
+        """
+        Returns
+        -------
+        str
+            The command executor (``<endpoint>/wd/hub``) of the next session.
+
+        Raises
+        ------
+        RuntimeError
+            If no host is healthy.
+        """
+        endpoints = self.healthy()
+        if not endpoints:
+            raise RuntimeError(
+                f"No healthy Selenoid among {list(self.weights)}."
+            )
+        with self._lock:
+            endpoint = self.sticky.get(profile) if profile else None
+            if endpoint is not None and endpoint not in endpoints:
+                logger.warning(
+                    "Moving profile '%s' from unhealthy %s.", profile, endpoint
+                )
+                endpoint = None
+            if endpoint is None:
+                if self.strategy == 'least-loaded':
+                    endpoint = self._least_loaded(endpoints)
+                else:
+                    endpoint = self._weighted_round_robin(endpoints)
+            if profile:
+                self.sticky[profile] = endpoint
+            self._pending[endpoint] += 1
+            self.placed[endpoint] += 1
+        return f"{endpoint}/wd/hub"
+
+    @property
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per host: health, free share and sessions placed."""
+        return {
+            endpoint: {
+                "healthy": self.is_healthy(endpoint),
+                "free_share": self.free_share(endpoint),
+                "placed": self.placed[endpoint],
+            }
+            for endpoint in self.weights
+        }
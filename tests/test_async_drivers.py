@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('lxml')
+
+from weberist.core.async_drivers import AsyncChromeDriver  # noqa: E402
+from weberist.benchmarks.fake import FakeWebDriverServer  # noqa: E402
+
+
+def test_driver_helpers_are_not_shadowed():
+
+    async def crawl(server):
+        async with AsyncChromeDriver(
+                remote=True, command_executor=server.hub_url) as driver:
+            await driver.goto(server.url('/table/1'))
+            # BaseDriver.run executes a script
+            ready = await driver.run("return document.readyState;")
+            title = await driver.title
+            length = await driver.call(len, 'abc')
+            return ready, title, length
+
+    with FakeWebDriverServer() as server:
+        assert asyncio.run(crawl(server)) == ('complete', 'table 1', 3)
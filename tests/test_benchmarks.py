@@ -0,0 +1,89 @@
+import json
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from weberist.benchmarks.fixtures import StaticSite
+from weberist.benchmarks.suite import (
+    BenchmarkContext,
+    bench_startup,
+    compare_results,
+    measure,
+    run_benchmarks,
+)
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.headers['Content-Type'], response.read().decode()
+
+
+def test_static_site_serves_generated_pages():
+    with StaticSite() as site:
+        content_type, table = fetch(site.url('/table/3'))
+        assert content_type.startswith('text/html')
+        assert table.count('<tr') >= 3
+        content_type, data = fetch(site.url('/data/2'))
+        assert content_type.startswith('application/json')
+        json.loads(data)
+        with pytest.raises(urllib.error.HTTPError):
+            fetch(site.url('/missing/1'))
+
+
+def test_measure():
+    calls = []
+    result = measure(lambda: calls.append(1), repeat=3, warmup=2)
+    assert len(calls) == 5
+    assert result["n"] == 3
+    assert result["min"] <= result["median"] <= result["max"]
+
+
+def test_run_benchmarks_writes_json(tmp_path):
+    output = tmp_path / 'results.json'
+    report = run_benchmarks(['profile_storage'], repeat=2, output=output)
+    with open(output, encoding='utf-8') as file:
+        assert json.load(file) == report
+    assert report["results"]["profile_storage"]["n"] == 2
+    assert report["meta"]["repeat"] == 2
+    with pytest.raises(ValueError):
+        run_benchmarks(['nope'])
+
+
+def test_compare_results():
+    baseline = {"results": {"goto": {"/a": {"mean": 2.0}}, "x": {"mean": 0}}}
+    current = {"results": {"goto": {"/a": {"mean": 3.0}}, "x": {"mean": 1}}}
+    assert compare_results(baseline, current) == {
+        "goto./a": {"baseline": 2.0, "current": 3.0, "ratio": 1.5},
+        "x": {"baseline": 0, "current": 1, "ratio": None},
+    }
+
+
+class Driver:
+
+    def quit_driver(self):
+        pass
+
+
+class Context(BenchmarkContext):
+
+    def __init__(self, target_path):
+        super().__init__(None, target_path, repeat=2)
+        self.launches = []
+
+    def launch(self, **kwargs):
+        self.launches.append(kwargs)
+        return Driver()
+
+
+def test_startup_launches_use_their_own_user_data_dir(tmp_path):
+    context = Context(tmp_path)
+    result = bench_startup(context)
+    assert set(result) == {
+        "stealth", "stealth_phases", "no_stealth", "no_stealth_phases"
+    }
+    directories = [launch['localstorage'] for launch in context.launches]
+    # warmup + repeat, with and without stealth
+    assert len(set(directories)) == len(directories) == 6
+    assert all(Path(path).parent == tmp_path for path in directories)
@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+pytest.importorskip('docker')
+
+from weberist.utils import docker as docker_utils  # noqa: E402
+
+
+class Image:
+    tags = ['weberist-chrome_127.0:latest']
+
+
+@pytest.fixture(name='images')
+def fixture_images(monkeypatch):
+    # digests of the images that exist; builds only add the '127' one
+    images = {docker_utils.image_hash('chrome', '126')}
+    monkeypatch.setattr(
+        docker_utils, 'find_image',
+        lambda digest, client=None: Image() if digest in images else None,
+    )
+
+    def build(function, browsers, *args):
+        images.add(docker_utils.image_hash('chrome', '127'))
+        return {"images": [Image()]}
+
+    monkeypatch.setattr(docker_utils, 'run_async', build)
+    return images
+
+
+def test_reconcile_writes_only_built_versions(tmp_path, images, monkeypatch):
+    reloaded = []
+    monkeypatch.setattr(
+        docker_utils, 'reload_selenoid',
+        lambda client, name: reloaded.append(name) or True,
+    )
+    report = docker_utils.reconcile_browsers(
+        {'chrome': {'versions': ['126', '127', '128'], 'default': -1}},
+        target_path=tmp_path,
+        client=object(),
+        name='selenoid-2',
+    )
+    assert report["failed"] == ['chrome/128']
+    assert report["reloaded"]
+    assert reloaded == ['selenoid-2']
+    with open(tmp_path / 'browsers.json', encoding='utf-8') as file:
+        chrome = json.load(file)['chrome']
+    assert sorted(chrome['versions']) == ['chrome_126.0', 'chrome_127.0']
+    assert chrome['default'] == 'chrome_127.0'
+
+
+def test_selenoid_is_set_up(tmp_path, images):
+    browsers = {'chrome': {'versions': ['126'], 'default': -1}}
+    assert not docker_utils.selenoid_is_set_up(browsers, tmp_path, object())
+    docker_utils.create_browsers_json(browsers, tmp_path)
+    assert docker_utils.selenoid_is_set_up(browsers, tmp_path, object())
+    browsers['chrome']['versions'].append('127')
+    docker_utils.create_browsers_json(browsers, tmp_path)
+    assert not docker_utils.selenoid_is_set_up(browsers, tmp_path, object())
+
+
+class Container:
+
+    def __init__(self, name, image, labels, status='running'):
+        self.name = name
+        self.labels = labels
+        self.attrs = {'Config': {'Image': image}}
+        self.status = status
+        self.removed = False
+
+    def start(self):
+        self.status = 'running'
+
+    def remove(self, force=False):
+        self.removed = True
+
+
+class Containers:
+
+    def __init__(self):
+        self.by_name = {}
+
+    def get(self, name):
+        if name not in self.by_name:
+            raise docker_utils.docker.errors.NotFound(name)
+        return self.by_name[name]
+
+    def create(self, name, image, labels, **kwargs):
+        container = Container(name, image, labels, status='created')
+        self.by_name[name] = container
+        return container
+
+
+class Client:
+
+    def __init__(self):
+        self.containers = Containers()
+
+
+def test_controller_recreates_containers_of_another_spec(tmp_path):
+    client = Client()
+    controller = docker_utils.SelenoidController(
+        tmp_path, ui=False, limit=2, client=client
+    )
+    name = docker_utils.CONTAINER_SELENOID
+    spec = controller.specs()[name]
+    created = controller._ensure(name, spec)
+    assert controller._ensure(name, spec) is created
+    assert controller.started == [name]
+
+    stale = Container(name, spec['image'], created.labels)
+    stale.attrs['Config']['Image'] = 'aerokube/selenoid:1.10.0'
+    client.containers.by_name[name] = stale
+    assert controller._ensure(name, spec) is not stale
+    assert stale.removed
+
+    controller.limit = 4
+    current = client.containers.by_name[name]
+    assert controller._ensure(name, controller.specs()[name]) is not current
+
+
+def test_setup_writes_into_target_path(tmp_path, images, monkeypatch):
+    monkeypatch.setattr(
+        docker_utils, 'create_network', lambda name=None, client=None: name
+    )
+    browsers = {'chrome': {'versions': ['126'], 'default': -1}}
+    data = docker_utils.setup_selenoid(browsers, 'net', tmp_path, object())
+    assert data['network'] == 'net'
+    assert (tmp_path / docker_utils.DOCKER_COMPOSE).is_file()
+    assert docker_utils.selenoid_is_set_up(browsers, tmp_path, object())
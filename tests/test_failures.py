@@ -0,0 +1,119 @@
+import logging
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from weberist.base.failures import FailurePolicy, handle_failures
+
+
+class Records(logging.Handler):
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture(name='records')
+def fixture_records():
+    handler = Records()
+    logger = logging.getLogger('weberist.base.failures')
+    level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    yield handler.records
+    logger.removeHandler(handler)
+    logger.setLevel(level)
+
+
+class Driver:
+    _failure_depth = 0
+
+    def __init__(self, failure_policy='raise', failures=1):
+        self.failure_policy = FailurePolicy.parse(failure_policy)
+        self.failures = failures
+        self.calls = 0
+        self.recycled = 0
+        self.quit = 0
+
+    @handle_failures
+    def wait(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise TimeoutException("timed out")
+        return 'element'
+
+    @handle_failures
+    def select(self):
+        return self.wait()
+
+    @handle_failures
+    def click(self):
+        return self.select()
+
+    def recycle(self):
+        self.recycled += 1
+
+    def quit_driver(self):
+        self.quit += 1
+
+
+def errors(records):
+    return [record for record in records if record.levelno >= logging.ERROR]
+
+
+def test_nested_helpers_log_once(records):
+    driver = Driver()
+    with pytest.raises(TimeoutException):
+        driver.click()
+    assert len(errors(records)) == 1
+    assert errors(records)[0].getMessage().startswith('click failed')
+    # the traceback goes to one DEBUG record
+    assert [record.exc_info is not None for record in records] == [
+        False, True
+    ]
+
+
+def test_retry(records):
+    driver = Driver('retry', failures=2)
+    assert driver.click() == 'element'
+    assert driver.calls == 3
+    assert len(records) == 2
+    assert not errors(records)
+
+    driver = Driver(FailurePolicy('retry', retries=1), failures=2)
+    with pytest.raises(TimeoutException):
+        driver.click()
+    assert driver.calls == 2
+
+
+def test_quit_calls_quit_driver():
+    driver = Driver('quit')
+    with pytest.raises(TimeoutException):
+        driver.click()
+    assert driver.quit == 1
+    assert driver.calls == 1
+
+
+def test_recycle_calls_recycle():
+    driver = Driver('recycle')
+    assert driver.click() == 'element'
+    assert driver.recycled == 1
+    assert driver.calls == 2
+
+
+def test_per_call_policy_overrides_the_driver_one():
+    driver = Driver('quit', failures=1)
+    assert driver.click(failure_policy='retry') == 'element'
+    assert driver.quit == 0
+    assert driver.failure_policy.action == 'quit'
+
+
+def test_other_exceptions_are_not_handled(records):
+    driver = Driver(FailurePolicy('retry', exceptions=(KeyError,)))
+    with pytest.raises(TimeoutException):
+        driver.click()
+    assert driver.calls == 1
+    assert not records
@@ -0,0 +1,117 @@
+import pytest
+
+pytest.importorskip('lxml')
+pytest.importorskip('cssselect')
+
+from selenium.webdriver.remote.webelement import WebElement  # noqa: E402
+from selenium.common.exceptions import (  # noqa: E402
+    NoSuchElementException,
+    StaleElementReferenceException,
+)
+
+from weberist import ChromeDriver  # noqa: E402
+from weberist.benchmarks.fake import FakeWebDriverServer  # noqa: E402
+
+
+@pytest.fixture(name='server')
+def fixture_server():
+    with FakeWebDriverServer(limit=3) as server:
+        yield server
+
+
+@pytest.fixture(name='driver')
+def fixture_driver(server):
+    driver = ChromeDriver(remote=True, command_executor=server.hub_url)
+    yield driver
+    driver.quit()
+
+
+def test_find_elements_returns_web_elements(server, driver):
+    driver.goto(server.url('/table/3'))
+    cells = driver.find_elements('css selector', 'td')
+    assert isinstance(cells[0], WebElement)
+    assert cells[0].text == '0-0'
+    assert len(cells) == 24
+
+
+def test_select_elements(server, driver):
+    driver.goto(server.url('/table/2'))
+    cells = driver.select_elements('td', by='css selector')
+    assert [cell.text for cell in cells[:2]] == ['0-0', '0-1']
+
+
+def test_missing_and_stale_elements(server, driver):
+    driver.goto(server.url('/deep/3'))
+    leaf = driver.find_element('id', 'leaf')
+    with pytest.raises(NoSuchElementException):
+        driver.find_element('css selector', '#missing')
+    driver.goto(server.url('/deep/4'))
+    with pytest.raises(StaleElementReferenceException):
+        leaf.text  # pylint: disable=pointless-statement
+
+
+def test_status_counts_sessions(server, driver):
+    status = server.status({})[1]
+    assert status['used'] == 1
+    assert status['total'] == 3
+
+
+def test_switch_to_new_window(server, driver):
+    home = driver.current_window_handle
+    driver.switch_to.new_window('tab')
+    assert len(driver.window_handles) == 2
+    driver.goto(server.url('/deep/2'))
+    driver.close()
+    driver.switch_to.window(home)
+    assert driver.window_handles == [home]
+    assert driver.current_url == 'about:blank'
+
+
+def test_browser_contexts(server, driver):
+    with driver.new_context(server.url('/table/1')) as first, \
+            driver.new_context(server.url('/deep/1')) as second:
+        assert first.find_element('css selector', 'td').text == '0-0'
+        assert second.find_element('id', 'leaf').text == 'leaf'
+        assert first.title == 'table 1'
+    assert len(driver.window_handles) == 1
+
+
+def test_map_tabs(server, driver):
+    urls = [server.url(f'/table/{rows}') for rows in range(1, 6)]
+    titles = [
+        title for _, title in driver.map_tabs(
+            urls, lambda driver, url: driver.title, max_tabs=2
+        )
+    ]
+    assert titles == [f'table {rows}' for rows in range(1, 6)]
+    assert len(driver.window_handles) == 1
+
+
+def test_context_switches_back_after_another_is_released(server, driver):
+    first = driver.new_context(server.url('/table/1'))
+    second = driver.new_context(server.url('/deep/1'))
+    assert second.title == 'deep 1'
+    first.release()
+    assert second.title == 'deep 1'
+    second.release()
+
+
+def test_map_tabs_keeps_at_most_max_tabs_open(server, driver):
+    urls = [server.url(f'/table/{rows}') for rows in range(1, 8)]
+    home = driver.current_window_handle
+    create_target = server.cdp['Target.createTarget']
+    peak = []
+
+    def counting_create_target(session, params):
+        result = create_target(session, params)
+        # open tabs besides the home one
+        peak.append(len(session.windows) - 1)
+        return result
+
+    server.cdp['Target.createTarget'] = counting_create_target
+    results = list(
+        driver.map_tabs(urls, lambda driver, url: driver.title, max_tabs=3)
+    )
+    assert len(results) == 7
+    assert max(peak) == 3
+    assert driver.current_window_handle == home
@@ -0,0 +1,105 @@
+import socket
+
+import pytest
+import requests
+
+pytest.importorskip('lxml')
+pytest.importorskip('cssselect')
+
+from selenium.common.exceptions import WebDriverException  # noqa: E402
+
+from weberist import ChromeDriver  # noqa: E402
+from weberist.benchmarks.fake import FakeWebDriverServer  # noqa: E402
+from weberist.utils.selenoid import HubSelector  # noqa: E402
+
+
+@pytest.fixture(name='servers')
+def fixture_servers():
+    with FakeWebDriverServer(limit=2) as first, \
+            FakeWebDriverServer(limit=3) as second:
+        yield first, second
+
+
+def dead_endpoint():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f'http://127.0.0.1:{port}'
+
+
+def open_session(server):
+    requests.post(
+        f'{server.hub_url}/session', json={'capabilities': {}}, timeout=5
+    ).raise_for_status()
+
+
+def test_least_loaded(servers):
+    first, second = servers
+    open_session(first)
+    hub = HubSelector([first.base_url, second.base_url], status_ttl=60)
+    # free shares 1/2 and 3/3, then the sessions placed count until the
+    # next status: 1/2 and 2/3, then 1/2 and 1/3
+    assert [hub.select() for _ in range(3)] == [
+        second.hub_url, second.hub_url, first.hub_url
+    ]
+
+
+def test_weighted_round_robin(servers):
+    first, second = servers
+    hub = HubSelector(
+        {first.base_url: 2, second.base_url: 1},
+        strategy='weighted-round-robin',
+    )
+    chosen = [hub.select() for _ in range(6)]
+    assert chosen.count(first.hub_url) == 4
+    assert chosen.count(second.hub_url) == 2
+    assert chosen[:3] == [first.hub_url, second.hub_url, first.hub_url]
+
+
+def test_profiles_stick_to_their_host(servers):
+    first, second = servers
+    hub = HubSelector(
+        [first.base_url, second.base_url], strategy='weighted-round-robin'
+    )
+    placed = hub.select('P')
+    assert [hub.select('P') for _ in range(3)] == [placed] * 3
+    assert hub.select('Q') != placed
+
+
+def test_failed_and_unreachable_hosts_are_skipped(servers):
+    first, second = servers
+    dead = dead_endpoint()
+    hub = HubSelector([dead, first.base_url, second.base_url])
+    placed = hub.select('P')
+    assert placed != f'{dead}/wd/hub'
+    assert not hub.is_healthy(dead)
+    hub.mark_failed(placed)
+    assert hub.select('P') not in (placed, f'{dead}/wd/hub')
+    hub.mark_failed(first.hub_url)
+    hub.mark_failed(second.hub_url)
+    with pytest.raises(RuntimeError):
+        hub.select()
+
+
+def test_session_fails_over_to_another_hub():
+    with FakeWebDriverServer(limit=0) as full, \
+            FakeWebDriverServer(limit=2) as free:
+        hub = HubSelector(
+            {full.base_url: 2, free.base_url: 1},
+            strategy='weighted-round-robin',
+        )
+        driver = ChromeDriver(remote=True, hub=hub, profile='P')
+        try:
+            assert len(free.sessions) == 1
+            assert not hub.is_healthy(full.base_url)
+            assert hub.sticky['P'] == free.base_url
+        finally:
+            driver.quit_driver()
+
+
+def test_failover_without_hosts_keeps_the_session_error():
+    with FakeWebDriverServer(limit=0) as full:
+        hub = HubSelector([full.base_url, dead_endpoint()])
+        with pytest.raises(RuntimeError) as error:
+            ChromeDriver(remote=True, hub=hub)
+        assert isinstance(error.value.__cause__, WebDriverException)
@@ -0,0 +1,49 @@
+import io
+import logging
+
+import pytest
+
+from weberist.base.logs import (
+    DeferredQueueHandler,
+    configure_logging,
+    stop_logging,
+)
+
+
+@pytest.fixture(autouse=True, name='restore_root')
+def fixture_restore_root():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    stop_logging()
+    root.handlers = handlers
+    root.setLevel(level)
+
+
+def queue_handlers():
+    return [
+        handler for handler in logging.getLogger().handlers
+        if isinstance(handler, DeferredQueueHandler)
+    ]
+
+
+def test_production_writes_json_and_samples():
+    stream = io.StringIO()
+    configure_logging('production', stream=stream, burst=2, period=60)
+    logger = logging.getLogger('weberist.tests')
+    for index in range(5):
+        logger.info('command %s', index)
+    logger.warning('kept %s', 1)
+    stop_logging()
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 3
+    assert '"message":"command 0"' in lines[0]
+    assert '"level":"WARNING"' in lines[2]
+
+
+@pytest.mark.parametrize('profile', ['none', 'dev'])
+def test_switching_profile_detaches_the_queue(profile):
+    configure_logging('production', stream=io.StringIO())
+    assert len(queue_handlers()) == 1
+    configure_logging(profile)
+    assert not queue_handlers()
@@ -0,0 +1,73 @@
+import time
+import threading
+
+import pytest
+
+pytest.importorskip('lxml')
+pytest.importorskip('cssselect')
+
+from weberist.benchmarks.fake import FakeWebDriverServer  # noqa: E402
+from weberist.utils.pool import RemoteSessionPool  # noqa: E402
+
+
+@pytest.fixture(name='server')
+def fixture_server():
+    with FakeWebDriverServer(limit=3) as server:
+        yield server
+
+
+def test_sessions_in_maintenance_count_toward_size(server):
+    pool = RemoteSessionPool(
+        size=1,
+        chrome_kwargs={'command_executor': server.hub_url},
+        session_timeout=0.0,
+        refresh_margin=0.0,
+    )
+    with pool:
+        driver = pool.acquire()
+        pool.release(driver)
+        pinging, resume = threading.Event(), threading.Event()
+        execute_script = driver.execute_script
+
+        def slow_ping(script, *args):
+            pinging.set()
+            resume.wait(5)
+            return execute_script(script, *args)
+
+        driver.execute_script = slow_ping
+        maintenance = threading.Thread(target=pool.maintain)
+        maintenance.start()
+        assert pinging.wait(5)
+        assert pool.total == 1
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.2)
+        resume.set()
+        maintenance.join()
+        assert pool.metrics['maintaining'] == 0
+        assert pool.acquire(timeout=1) is driver
+        pool.release(driver)
+    assert pool.stats['created'] == 1
+
+
+def test_replaced_session_keeps_its_profile(server, tmp_path):
+    pool = RemoteSessionPool(
+        size=1,
+        profiles=['P'],
+        chrome_kwargs={
+            'command_executor': server.hub_url, 'localstorage': tmp_path
+        },
+        max_age=0.01,
+    )
+    pool.warm()
+    try:
+        old = pool.acquire('P')
+        assert old.profile_volume is not None
+        pool.release(old)
+        time.sleep(0.02)
+        assert pool.maintain()["replaced"] == 1
+        new = pool.acquire('P', timeout=1)
+        assert new is not old
+        assert new.profile_volume is not None
+        pool.release(new)
+    finally:
+        pool.close()
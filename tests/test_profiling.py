@@ -0,0 +1,66 @@
+import pytest
+
+from weberist.base.profiling import StartupStats, StartupTrace
+
+
+def test_trace_nests_phases():
+    trace = StartupTrace()
+    with trace.phase('launch'):
+        pass
+    with trace.phase('stealth'):
+        with trace.phase('chrome_runtime'):
+            pass
+        with trace.phase('chrome_runtime'):
+            pass
+    timings = trace.as_dict()
+    assert list(timings) == ['launch', 'stealth/chrome_runtime', 'stealth']
+    assert trace.total == pytest.approx(timings['launch'] + timings['stealth'])
+    assert len(trace.phases) == 4
+
+
+def test_disabled_trace_records_nothing():
+    trace = StartupTrace(enabled=False)
+    with trace.phase('launch'):
+        pass
+    assert not trace
+    assert trace.phases == []
+    stats = StartupStats()
+    stats.record(trace)
+    assert stats.launches == 0
+
+
+def test_stats_aggregate_launches():
+    stats = StartupStats()
+    for duration in (1.0, 3.0):
+        trace = StartupTrace()
+        trace.phases = [('launch', duration), ('stealth/script', 0.5)]
+        stats.record(trace)
+    summary = stats.summary()
+    assert stats.launches == 2
+    assert summary['launch'] == {
+        "count": 2, "mean": 2.0, "min": 1.0, "max": 3.0, "last": 3.0
+    }
+    assert summary['total']['mean'] == 2.0
+    stats.reset()
+    assert stats.summary() == {}
+
+
+def test_driver_startup_is_traced():
+    pytest.importorskip('lxml')
+    pytest.importorskip('cssselect')
+    from weberist import ChromeDriver
+    from weberist.base.profiling import STARTUP_STATS
+    from weberist.benchmarks.fake import FakeWebDriverServer
+
+    STARTUP_STATS.reset()
+    with FakeWebDriverServer() as server:
+        driver = ChromeDriver(
+            remote=True, command_executor=server.hub_url, trace_startup=True
+        )
+        driver.quit_driver()
+    phases = driver.startup_trace.as_dict()
+    for phase in ('set_up', 'configure', 'launch', 'stealth', 'init'):
+        assert phase in phases
+    assert any(name.startswith('stealth/') for name in phases)
+    assert STARTUP_STATS.launches == 1
+    assert 'total' in STARTUP_STATS.summary()
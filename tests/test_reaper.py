@@ -0,0 +1,66 @@
+import sys
+import time
+import subprocess
+
+import pytest
+
+psutil = pytest.importorskip('psutil')
+
+from weberist.utils.reaper import (  # noqa: E402
+    ProcessRegistry,
+    Reaper,
+    kill_process_tree,
+    process_identity,
+)
+
+# a "browser": a process with a child of its own
+TREE = (
+    "import subprocess, sys, time;"
+    "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']);"
+    "time.sleep(60)"
+)
+
+
+def spawn(code):
+    return subprocess.Popen([sys.executable, '-c', code])
+
+
+def wait_children(process, count, timeout=10):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        children = psutil.Process(process.pid).children(recursive=True)
+        if len(children) >= count:
+            return children
+        time.sleep(0.05)
+    raise TimeoutError("The dummy process tree did not start.")
+
+
+def test_reaper_kills_trees_of_dead_owners(tmp_path):
+    registry = ProcessRegistry(tmp_path)
+    orphan = spawn(TREE)
+    owned = spawn(TREE)
+    owner = spawn("import time; time.sleep(60)")
+    try:
+        child = wait_children(orphan, 1)[0]
+        wait_children(owned, 1)
+        registry.register(pids=[orphan.pid], owner_pid=owner.pid)
+        kept = registry.register(pids=[owned.pid])
+        owner.kill()
+        owner.wait()
+
+        report = Reaper(registry).reap()
+
+        assert sorted(report["processes"]) == sorted([orphan.pid, child.pid])
+        assert report["entries"] == 1
+        assert orphan.wait(5) is not None
+        assert not psutil.pid_exists(child.pid) or (
+            psutil.Process(child.pid).status() == psutil.STATUS_ZOMBIE
+        )
+        assert owned.poll() is None
+        assert list(registry.entries()) == [kept]
+        assert Reaper(registry).reap()["entries"] == 0
+    finally:
+        for process in (orphan, owned, owner):
+            if process.poll() is None:
+                kill_process_tree(process_identity(process.pid))
+            process.wait()
@@ -0,0 +1,139 @@
+import json
+import socket
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from weberist.utils.selenoid import (
+    CapacityGate,
+    SelenoidProbe,
+    wait_selenoids,
+)
+
+STATUS = {"total": 5, "used": 1, "queued": 0, "pending": 0, "browsers": {}}
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        server = self.server
+        server.requests += 1
+        if self.path != '/status' or server.requests <= server.unready:
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = json.dumps(STATUS).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        pass
+
+
+class StatusServer(ThreadingHTTPServer):
+    """Stand-in Selenoid answering 503 to its first `unready` polls."""
+
+    def __init__(self, unready=0):
+        super().__init__(('127.0.0.1', 0), StatusHandler)
+        self.unready = unready
+        self.requests = 0
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+def dead_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f'http://127.0.0.1:{port}'
+
+
+def unreachable():
+    raise ConnectionRefusedError("connection refused")
+
+
+def test_gate_admits_while_slots_are_free():
+    status = {"total": 2, "used": 1, "pending": 0, "queued": 0}
+    gate = CapacityGate(fetch=lambda: status)
+    assert gate.acquire(timeout=0)
+    assert not gate.acquire(timeout=0.05)
+    gate.release()
+    assert gate.metrics["admitted"] == 1
+
+
+def test_gate_raises_when_status_is_unreachable():
+    gate = CapacityGate(refresh_interval=0.01, max_failures=3,
+                        fetch=unreachable)
+    with pytest.raises(ConnectionError):
+        gate.acquire()
+    assert gate.failures == 3
+
+
+def test_gate_fails_open_when_status_is_unreachable():
+    gate = CapacityGate(refresh_interval=0.01, max_failures=2,
+                        fail_open=True, fetch=unreachable)
+    assert gate.acquire()
+    assert gate.metrics["unreachable"] == 1
+
+
+def test_probe_reads_status():
+    with StatusServer() as server:
+        probe = SelenoidProbe(server.url + '/')
+        assert probe.check()
+        assert probe.ready.is_set()
+        assert probe.status == STATUS
+
+
+def test_probe_polls_until_ready():
+    with StatusServer(unready=3) as server:
+        probe = SelenoidProbe(server.url, initial_delay=0.01, max_delay=0.02)
+        assert probe.wait(deadline=5) == STATUS
+        assert server.requests == 4
+        assert probe.error is None
+
+
+def test_probe_deadline_and_liveness():
+    probe = SelenoidProbe(dead_url(), initial_delay=0.01, max_delay=0.02)
+    with pytest.raises(TimeoutError):
+        probe.wait(deadline=0.1)
+    assert probe.error is not None
+    with pytest.raises(RuntimeError):
+        probe.wait(deadline=5, alive=lambda: False)
+    assert not probe.ready.is_set()
+
+
+def test_probe_in_background_and_async():
+    with StatusServer(unready=1) as server:
+        probe = SelenoidProbe(server.url, initial_delay=0.01).start()
+        assert probe.ready.wait(5)
+        probe = SelenoidProbe(server.url, initial_delay=0.01)
+        assert asyncio.run(probe.wait_async(deadline=5)) == STATUS
+
+
+def test_wait_selenoids():
+    with StatusServer() as first, StatusServer(unready=2) as second:
+        probes = wait_selenoids(
+            [first.url, second.url], deadline=5, initial_delay=0.01
+        )
+        assert all(probe.ready.is_set() for probe in probes)
+        dead = dead_url()
+        with pytest.raises(TimeoutError, match=dead):
+            wait_selenoids([first.url, dead], deadline=0.2,
+                           initial_delay=0.01)
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip('lxml')
+pytest.importorskip('cssselect')
+
+from weberist import ChromeDriver  # noqa: E402
+from weberist.benchmarks.fake import FakeWebDriverServer  # noqa: E402
+from weberist.benchmarks.trace import (  # noqa: E402
+    CommandTrace,
+    compare_traces,
+    replay,
+)
+
+
+def crawl(driver, server):
+    texts = []
+    for path in ('/table/2', '/deep/3'):
+        driver.goto(server.url(path))
+        element = driver.find_elements('css selector', 'td, #leaf')[0]
+        texts.append(element.text)
+    return texts
+
+
+def test_record_and_replay_element_commands(tmp_path):
+    with FakeWebDriverServer(limit=2) as server:
+        driver = ChromeDriver(remote=True, command_executor=server.hub_url)
+        other = ChromeDriver(remote=True, command_executor=server.hub_url)
+        try:
+            trace = CommandTrace()
+            with trace.record(driver):
+                assert crawl(driver, server) == ['0-0', 'leaf']
+            path = trace.save(tmp_path / 'crawl.jsonl.gz')
+
+            recorded = CommandTrace.load(path)
+            finds = [
+                entry for entry in recorded.entries
+                if entry["command"] == 'findElements'
+            ]
+            assert finds and all(entry.get("elements") for entry in finds)
+
+            replayed = replay(recorded, other, stop_on_error=True)
+        finally:
+            driver.quit()
+            other.quit()
+
+    assert not any(entry["error"] for entry in replayed.entries)
+    texts = [
+        entry for entry in replayed.entries
+        if entry["command"] == 'getElementText'
+    ]
+    assert len(texts) == 2
+    report = compare_traces(recorded, replayed)
+    assert report["commands"]["getElementText"]["current_count"] == 2
+    assert [page["current_commands"] for page in report["pages"]] == [3, 3]
@@ -0,0 +1,70 @@
+import gc
+
+import pytest
+
+from selenium.webdriver import ChromeOptions
+
+from weberist.base.config import REMOTE_LOCALSTORAGE
+from weberist.base.volumes import mount_profile, unmount_profile
+
+
+def chrome_options(localstorage):
+    options = ChromeOptions()
+    options.add_argument(f'--user-data-dir={localstorage}')
+    options.set_capability('selenoid:options', {'enableVNC': True})
+    return options
+
+
+def test_profile_is_mounted_once(tmp_path):
+    first = chrome_options(tmp_path)
+    source = mount_profile(first, 'Profile 1')
+    assert source == str(tmp_path / 'remote' / 'Profile_1')
+    assert first.arguments == [f'--user-data-dir={REMOTE_LOCALSTORAGE}']
+    selenoid_options = first.capabilities['selenoid:options']
+    assert selenoid_options['volumes'] == [f'{source}:{REMOTE_LOCALSTORAGE}']
+    assert selenoid_options['enableVNC']
+
+    second = chrome_options(tmp_path)
+    assert mount_profile(second, 'Profile 1') is None
+    assert second.arguments == []
+    assert 'volumes' not in second.capabilities['selenoid:options']
+
+    other = chrome_options(tmp_path)
+    other_source = mount_profile(other, 'Profile 2')
+    assert other_source not in (None, source)
+    unmount_profile(other_source)
+
+    unmount_profile(source)
+    assert mount_profile(chrome_options(tmp_path), 'Profile 1') == source
+    unmount_profile(source)
+
+
+def test_collected_driver_keeps_the_lease_of_a_later_session(tmp_path):
+    pytest.importorskip('lxml')
+    pytest.importorskip('cssselect')
+    from weberist import ChromeDriver
+    from weberist.benchmarks.fake import FakeWebDriverServer
+
+    def driver(server):
+        return ChromeDriver(
+            remote=True,
+            command_executor=server.hub_url,
+            localstorage=tmp_path,
+            profile='P',
+        )
+
+    with FakeWebDriverServer(limit=3) as server:
+        first = driver(server)
+        assert first.profile_volume is not None
+        first.quit_driver()
+        second = driver(server)
+        assert second.profile_volume is not None
+        del first
+        gc.collect()
+        third = driver(server)
+        assert third.profile_volume is None
+        third.quit_driver()
+        second.quit_driver()
+        last = driver(server)
+        assert last.profile_volume is not None
+        last.quit_driver()